@@ -1,40 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, func
+from typing import List, Optional
 
-from app.database.database import get_session, Report, Company
-from app.models.schemas import ChartDataResponse
+from app.database.database import get_session, Company, IndustryAggregate
+from app.models.schemas import (
+    ChartDataResponse, DerivedMetricsResponse, ComparisonResponse,
+    IndustryAggregatesResponse, IndustryAggregateEntry
+)
 from app.services.chart_data_service import ChartDataService
+from app.services.container import ServiceContainer, get_services
+from app.services.industry_service import industry_key
+from app.services.periods import period_label
+from app.api.conditional import conditional_response, make_etag
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
-chart_service = ChartDataService()
 
-@router.get("/chart-data/{company_id}", response_model=ChartDataResponse)
-async def get_company_chart_data(
-    company_id: int,
-    db: AsyncSession = Depends(get_session)
-):
-    company_result = await db.execute(select(Company).where(Company.id == company_id))
-    company = company_result.scalar_one_or_none()
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    reports_result = await db.execute(select(Report).where(Report.company_id == company_id))
-    reports = reports_result.scalars().all()
-    
-    if not reports:
+
+def _build_chart_payload(chart_service: ChartDataService, company: Company, points: list) -> ChartDataResponse:
+    if not points:
         return ChartDataResponse(
-            company_id=company_id,
+            company_id=company.id,
             company_name=company.name,
             timeframe={"from": "-", "to": "-"},
             charts=[],
             available_metrics=[]
         )
     
+    # Serie grupowane raz i współdzielone przez wszystkie wykresy
+    periods, series = chart_service.collect_series(points)
     charts = []
     
-    revenue_chart = chart_service.prepare_chart_data(
-        reports, 
+    revenue_chart = chart_service.chart_from_series(
+        periods, series, 
         ["revenue"], 
         chart_type="line", 
         title="Przychody w czasie"
@@ -42,8 +40,8 @@ async def get_company_chart_data(
     if revenue_chart:
         charts.append(revenue_chart)
         
-    profit_chart = chart_service.prepare_chart_data(
-        reports, 
+    profit_chart = chart_service.chart_from_series(
+        periods, series, 
         ["net_income"], 
         chart_type="bar", 
         title="Zysk Netto"
@@ -51,8 +49,8 @@ async def get_company_chart_data(
     if profit_chart:
         charts.append(profit_chart)
         
-    combined_chart = chart_service.prepare_chart_data(
-        reports,
+    combined_chart = chart_service.chart_from_series(
+        periods, series,
         ["revenue", "net_income"],
         chart_type="line",
         title="Przychody vs Zysk Netto"
@@ -61,14 +59,209 @@ async def get_company_chart_data(
         combined_chart.chart_id = "revenue_vs_profit"
         charts.append(combined_chart)
 
-    sorted_reports = chart_service._sort_reports(reports)
-    start_period = f"{sorted_reports[0].report_year} Q{sorted_reports[0].report_quarter}" if sorted_reports else "-"
-    end_period = f"{sorted_reports[-1].report_year} Q{sorted_reports[-1].report_quarter}" if sorted_reports else "-"
-
     return ChartDataResponse(
-        company_id=company_id,
+        company_id=company.id,
+        company_name=company.name,
+        timeframe=chart_service.get_timeframe(points),
+        charts=charts,
+        available_metrics=sorted(series)
+    )
+
+
+@router.get("/chart-data/{company_id}", response_model=ChartDataResponse)
+async def get_company_chart_data(
+    company_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
+):
+    company_result = await db.execute(select(Company).where(Company.id == company_id))
+    company = company_result.scalar_one_or_none()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    # Wersja zbioru raportów jest w wierszu firmy - przy trafieniu w cache
+    # (lub 304) nie są czytane żadne metryki
+    cache_key = (company.id, company.reports_version or 0, company.name)
+    cached = services.chart_cache.get(cache_key)
+    if cached is None:
+        # Wszystkie punkty metryk firmy jednym zapytaniem po indeksie (company_id, metric_name, period_ordinal)
+        points = await services.metrics.get_company_points(db, company_id)
+        payload = _build_chart_payload(services.charts, company, points)
+        cached = services.chart_cache.put(cache_key, payload.model_dump_json().encode())
+    
+    body, etag = cached
+    response = Response(content=body, media_type="application/json")
+    return conditional_response(request, response, etag) or response
+
+
+# Wykresy metryk pochodnych: (metryki, typ, tytuł)
+DERIVED_CHARTS = [
+    (["revenue_ttm", "net_income_ttm"], "line", "Przychody i Zysk Netto (12M)"),
+    (["revenue_yoy", "net_income_yoy"], "bar", "Dynamika r/r"),
+    (["net_margin", "operating_margin"], "line", "Marże"),
+]
+
+
+@router.get("/derived/{company_id}", response_model=DerivedMetricsResponse)
+async def get_company_derived_metrics(
+    company_id: int,
+    request: Request,
+    response: Response,
+    window: int = Query(4, ge=2, le=20, description="Rolling statistics window (quarters)"),
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
+):
+    """QoQ/YoY growth, margins, TTM sums, rolling statistics and CAGR computed from stored metrics"""
+    company_result = await db.execute(select(Company).where(Company.id == company_id))
+    company = company_result.scalar_one_or_none()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    not_modified = conditional_response(
+        request, response, make_etag("derived", company.id, company.reports_version, window)
+    )
+    if not_modified:
+        return not_modified
+
+    panel = await services.timeseries.load_panel(db, [company_id])
+    derived = services.timeseries.company_series(panel, company_id, window)
+    periods, series = services.timeseries.chart_series(derived)
+
+    charts = []
+    for metric_keys, chart_type, title in DERIVED_CHARTS:
+        # Wspólna oś okresów - pierwszy rok r/r, pierwsze kwartały TTM i marże
+        # z zerowym mianownikiem są lukami (null), a nie zerem
+        chart = services.charts.chart_from_series(periods, series, metric_keys, chart_type, title, trim_empty=False)
+        if chart:
+            charts.append(chart)
+
+    return DerivedMetricsResponse(
+        company_id=company.id,
         company_name=company.name,
-        timeframe={"from": start_period, "to": end_period},
+        periods=[period_label(ordinal) for ordinal in derived["periods"]],
+        series=derived["series"],
+        summary=derived["summary"],
+        charts=charts
+    )
+
+
+# Porównanie firm: maksymalna liczba firm, wykresy (metryka, typ, tytuł) i rankingi
+COMPARE_MAX_COMPANIES = 200
+COMPARISON_CHARTS = [
+    ("revenue", "line", "Przychody"),
+    ("net_income", "bar", "Zysk Netto"),
+    ("net_margin", "line", "Marża Netto"),
+    ("revenue_yoy", "bar", "Dynamika przychodów r/r"),
+]
+COMPARISON_RANKINGS = ["revenue_ttm", "net_income_ttm", "net_margin", "revenue_yoy", "revenue_cagr"]
+
+
+@router.get("/compare", response_model=ComparisonResponse)
+async def compare_companies(
+    request: Request,
+    response: Response,
+    company_ids: Optional[List[int]] = Query(None, description="Repeat the parameter for several companies"),
+    industry: Optional[str] = Query(None, description="Compare all companies of an industry"),
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Peer comparison on a common quarter grid - one query for companies, one for all metrics"""
+    if not company_ids and not industry:
+        raise HTTPException(status_code=400, detail="Provide company_ids or industry")
+
+    query = select(Company).order_by(Company.id)
+    if company_ids:
+        query = query.where(Company.id.in_(company_ids))
+    if industry:
+        query = query.where(Company.industry_key == industry_key(industry))
+    companies = (await db.execute(query.limit(COMPARE_MAX_COMPANIES + 1))).scalars().all()
+    if not companies:
+        raise HTTPException(status_code=404, detail="No companies found")
+    if len(companies) > COMPARE_MAX_COMPANIES:
+        raise HTTPException(status_code=400, detail=f"Too many companies (max {COMPARE_MAX_COMPANIES})")
+
+    not_modified = conditional_response(
+        request, response, make_etag("compare", *(f"{c.id}:{c.reports_version}" for c in companies))
+    )
+    if not_modified:
+        return not_modified
+
+    names = {c.id: c.name for c in companies}
+    panel = await services.timeseries.load_panel(db, names)
+    comparison = services.timeseries.compare(
+        panel, [metric for metric, _, _ in COMPARISON_CHARTS], COMPARISON_RANKINGS
+    )
+
+    dataset_labels = {str(company_id): name for company_id, name in names.items()}
+    charts = []
+    for metric, chart_type, title in COMPARISON_CHARTS:
+        by_company = {str(cid): points for cid, points in comparison["series"].get(metric, {}).items()}
+        chart = services.charts.chart_from_series(
+            comparison["periods"], by_company, list(by_company), chart_type, title, dataset_labels
+        )
+        if chart:
+            chart.chart_id = f"compare_{metric}"
+            charts.append(chart)
+
+    rankings = {
+        name: [
+            {**entry, "rank": position, "company_name": names[entry["company_id"]],
+             "period": period_label(entry["period"]) if entry["period"] else None}
+            for position, entry in enumerate(entries, start=1)
+        ]
+        for name, entries in comparison["rankings"].items()
+    }
+
+    return ComparisonResponse(
+        companies=[{"id": c.id, "name": c.name, "industry": c.industry} for c in companies],
+        periods=[period_label(ordinal) for ordinal in comparison["periods"]],
         charts=charts,
-        available_metrics=chart_service.get_available_metrics(reports)
+        rankings=rankings
+    )
+
+
+@router.get("/industry/{industry}", response_model=IndustryAggregatesResponse)
+async def get_industry_aggregates(
+    industry: str,
+    request: Request,
+    response: Response,
+    metrics: Optional[List[str]] = Query(None, description="revenue, net_income, net_margin, operating_margin"),
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Precomputed industry statistics (mean, median, quartiles) per period and metric"""
+    key = industry_key(industry)
+    version = await db.execute(
+        select(func.count(IndustryAggregate.id), func.max(IndustryAggregate.updated_at))
+        .where(IndustryAggregate.industry == key)
+    )
+    cells, last_modified = version.one()
+    if not cells:
+        raise HTTPException(status_code=404, detail="No aggregates for this industry")
+
+    not_modified = conditional_response(
+        request, response,
+        make_etag("industry", key, cells, last_modified, *(sorted(metrics) if metrics else ())),
+        last_modified
+    )
+    if not_modified:
+        return not_modified
+
+    aggregates = await services.industry.get_aggregates(db, key, metrics)
+    return IndustryAggregatesResponse(
+        industry=key,
+        aggregates=[
+            IndustryAggregateEntry(
+                period=period_label(row.period_ordinal),
+                period_ordinal=row.period_ordinal,
+                metric_name=row.metric_name,
+                company_count=row.company_count,
+                mean=row.mean,
+                median=row.median,
+                p25=row.p25,
+                p75=row.p75
+            )
+            for row in aggregates
+        ]
     )
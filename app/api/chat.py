@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, and_, case, func, tuple_
+from sqlalchemy.orm import undefer
 from typing import List, Optional
 import uuid
 from datetime import datetime
@@ -10,129 +11,256 @@ from app.models.schemas import (
     ChatRequest, ChatResponse, ChatMessage, MessageRole, 
     AnalysisResponse, AnalysisRequest
 )
-from app.services.gemini_service import GeminiService
-from app.services.chart_data_service import ChartDataService
+from app.api.conditional import conditional_response, make_etag
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, set_next_cursor
+from app.api.serialization import CHAT_MESSAGE_COLUMNS, chat_message_row, fast_json
+from app.services.container import ServiceContainer, get_services
+from app.services.company_stats_service import CHAT_SESSIONS_COUNTER
+from app.services.intent_service import METRIC_LABELS
+from app.services.timeseries_service import MARGINS
+from app.services.metrics_service import format_metric_value, RATIO_METRICS
+from app.services.periods import period_label
+from app.config import settings
 
 router = APIRouter(tags=["chat"])
 
-gemini_service = GeminiService()
-chart_service = ChartDataService()
+# Ile najnowszych raportów (i ile znaków z każdego) trafia do kontekstu LLM
+CONTEXT_REPORTS = 3
+CONTEXT_CHARS_PER_REPORT = 10000
+# Strona historii czatu, gdy klient podał cursor bez limit
+HISTORY_PAGE_SIZE = 100
 
 
-@router.post("/", response_model=ChatResponse)
-async def chat(
-    request: ChatRequest,
-    db: AsyncSession = Depends(get_session)
-):
-    """Send a message to the chatbot"""
+async def _load_chat_context(
+    db: AsyncSession,
+    services: ServiceContainer,
+    session_id: Optional[str],
+    company_id: Optional[int]
+) -> dict:
+    """Resolve session, company and reports for a chat turn with minimal queries.
 
-    session_id = request.session_id
-    if not session_id:
-        session_id = str(uuid.uuid4())
-        new_session = ChatSession(
-            session_id=session_id,
-            company_id=request.company_id
-        )
-        db.add(new_session)
-        await db.commit()
-    else:
+    Nothing is committed here - new/changed rows are only added to the
+    session so that the whole turn is written in a single transaction.
+    """
+
+    session = None
+    if session_id:
         result = await db.execute(
             select(ChatSession).where(ChatSession.session_id == session_id)
         )
         session = result.scalar_one_or_none()
-        
-        if not session:
-            new_session = ChatSession(
-                session_id=session_id,
-                company_id=request.company_id
-            )
-            db.add(new_session)
-            await db.commit()
-            session = new_session
+    else:
+        session_id = str(uuid.uuid4())
 
-        if request.company_id and session.company_id != request.company_id:
-            session.company_id = request.company_id
-            await db.commit()
+    is_new_session = session is None
+    if is_new_session:
+        session = ChatSession(session_id=session_id, company_id=company_id)
+        db.add(session)
+        await services.stats.bump(db, CHAT_SESSIONS_COUNTER)
+    elif company_id and session.company_id != company_id:
+        session.company_id = company_id
+
+    target_company_id = company_id or session.company_id
 
+    # Firma i jej przetworzone raporty w jednym zapytaniu (LEFT JOIN).
+    # Kolejność wg okresu sprawozdawczego (nie daty uploadu). Pełny tekst nie
+    # jest ładowany - baza zwraca fragment tylko dla CONTEXT_REPORTS najnowszych.
     company_name = None
+    industry = None
+    reports = []
+    report_texts = {}
+    if target_company_id:
+        newest_first = (Report.period_ordinal.desc().nulls_last(), Report.upload_date.desc())
+        recent_rank = func.row_number().over(order_by=newest_first)
+        text_excerpt = case(
+            (recent_rank <= CONTEXT_REPORTS, func.substr(Report.extracted_text, 1, CONTEXT_CHARS_PER_REPORT)),
+            else_=None
+        )
+        rows = await db.execute(
+            select(Company.name, Company.industry, Report, text_excerpt)
+            .outerjoin(
+                Report,
+                and_(Report.company_id == Company.id, Report.status == "processed")
+            )
+            .where(Company.id == target_company_id)
+            .order_by(*newest_first)
+        )
+        for name, company_industry, report, excerpt in rows.all():
+            company_name, industry = name, company_industry
+            if report is not None:
+                reports.append(report)
+                if excerpt:
+                    report_texts[report.id] = excerpt
+
+    # Historia sesji (domyślnie cała; settings.chat_context_messages ogranicza
+    # ją do ostatnich wiadomości). Nowa sesja nie ma historii.
+    history_records = []
+    if not is_new_session:
+        history_query = (
+            select(ChatHistory)
+            .where(ChatHistory.session_id == session_id)
+            .order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc())
+        )
+        if settings.chat_context_messages > 0:
+            history_query = history_query.limit(settings.chat_context_messages)
+        history_result = await db.execute(history_query)
+        history_records = list(reversed(history_result.scalars().all()))
+
+    return {
+        "session_id": session_id,
+        "company_id": target_company_id,
+        "company_name": company_name,
+        "industry": industry,
+        "reports": reports,
+        "report_texts": report_texts,
+        "history": history_records,
+    }
+
+
+def _add_turn_messages(
+    db: AsyncSession,
+    session_id: str,
+    user_content: str,
+    user_timestamp: datetime,
+    assistant_content: str
+) -> None:
+    """Add the user and assistant messages of one turn (committed together)"""
+    db.add(ChatHistory(
+        session_id=session_id,
+        role=MessageRole.USER.value,
+        content=user_content,
+        timestamp=user_timestamp
+    ))
+    db.add(ChatHistory(
+        session_id=session_id,
+        role=MessageRole.ASSISTANT.value,
+        content=assistant_content,
+        timestamp=datetime.utcnow()
+    ))
+
+
+async def _answer_locally(
+    db: AsyncSession,
+    services: ServiceContainer,
+    intent: dict,
+    company_id: int,
+    company_name: str
+) -> Optional[dict]:
+    """Answer a recognized data question from stored metrics (no LLM call).
+
+    Returns None when the data is missing so that the question goes to the LLM.
+    """
+    metrics = intent["metrics"]
+
+    if intent["intent"] == "chart":
+        title = " i ".join(METRIC_LABELS[m] for m in metrics) + " w czasie"
+        if any(m in MARGINS for m in metrics):
+            panel = await services.timeseries.load_panel(db, [company_id])
+            periods, series = services.timeseries.chart_series(services.timeseries.company_series(panel, company_id))
+            chart = services.charts.chart_from_series(periods, series, metrics, intent["chart_type"], title)
+        else:
+            points = await services.metrics.get_company_points(db, company_id, metrics)
+            chart = services.charts.prepare_chart_data(points, metrics, intent["chart_type"], title)
+        if chart is None:
+            return None
+        labels = chart.data.labels
+        return {
+            "response": f"Oto wykres: {title} dla {company_name} ({labels[0]} – {labels[-1]}).",
+            "chart_data": chart
+        }
+
+    needed = set()
+    for metric in metrics:
+        needed.update(MARGINS.get(metric, (metric,)))
+    panel = await services.timeseries.load_panel(db, [company_id], needed)
+
+    lines = []
+    for metric in metrics:
+        if intent["period"] is None:
+            value, ordinal = panel.latest_value(company_id, metric)
+        else:
+            value, ordinal = panel.value_at(company_id, metric, intent["period"]), intent["period"]
+        if value is None:
+            return None
+        unit = "" if metric in RATIO_METRICS else " PLN"
+        lines.append(f"- {METRIC_LABELS[metric]} ({period_label(ordinal)}): {format_metric_value(metric, value)}{unit}")
+
+    return {
+        "response": f"Dane z raportów {company_name}:\n" + "\n".join(lines),
+        "chart_data": None
+    }
+
+
+@router.post("/", response_model=ChatResponse)
+async def chat(
+    request: ChatRequest,
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Send a message to the chatbot"""
+
+    user_timestamp = datetime.utcnow()
+    context = await _load_chat_context(db, services, request.session_id, request.company_id)
+    session_id = context["session_id"]
+    company_name = context["company_name"]
+    reports_for_charts = context["reports"]
+
     all_reports_text = []
     reports_used = []
-    reports_for_charts = []
+    for report in reports_for_charts[:CONTEXT_REPORTS]:
+        excerpt = context["report_texts"].get(report.id)
+        if excerpt:
+            all_reports_text.append({
+                "period": report.report_period or report.filename,
+                "text": excerpt
+            })
+            reports_used.append(f"{report.report_period} ({report.filename})")
 
-    target_company_id = request.company_id
-    if not target_company_id and session_id:
-        session_result = await db.execute(select(ChatSession).where(ChatSession.session_id == session_id))
-        session_rec = session_result.scalar_one_or_none()
-        if session_rec:
-            target_company_id = session_rec.company_id
-
-    if target_company_id:
-        company_res = await db.execute(select(Company).where(Company.id == target_company_id))
-        company = company_res.scalar_one_or_none()
-        if company:
-            company_name = company.name
-
-        report_res = await db.execute(
-            select(Report)
-            .where(Report.company_id == target_company_id)
-            .where(Report.status == "processed")
-            .order_by(Report.upload_date.desc())
-        )
-        all_reports = report_res.scalars().all()
-        reports_for_charts = all_reports
-
-        for report in all_reports[:3]:
-            if report.extracted_text:
-                all_reports_text.append({
-                    "period": report.report_period or report.filename,
-                    "text": report.extracted_text[:10000]
-                })
-                reports_used.append(f"{report.report_period} ({report.filename})")
-
-    history_result = await db.execute(
-        select(ChatHistory)
-        .where(ChatHistory.session_id == session_id)
-        .order_by(ChatHistory.timestamp.asc())
-    )
-    history_records = history_result.scalars().all()
-    
     chat_history = [
         ChatMessage(
             role=MessageRole(record.role),
             content=record.content,
             timestamp=record.timestamp
         )
-        for record in history_records
+        for record in context["history"]
     ]
 
-    user_message = ChatHistory(
-        session_id=session_id,
-        role=MessageRole.USER.value,
-        content=request.message
-    )
-    db.add(user_message)
-    await db.commit()
-
     try:
+        # Proste pytania o dane (wartość metryki, wykres) bez wywołania LLM
+        intent = services.intent.match(request.message) if settings.chat_local_answers else None
+        if intent and context["company_id"] and company_name:
+            local_answer = await _answer_locally(db, services, intent, context["company_id"], company_name)
+            if local_answer:
+                _add_turn_messages(db, session_id, request.message, user_timestamp, local_answer["response"])
+                await db.commit()
+                return ChatResponse(
+                    response=local_answer["response"],
+                    session_id=session_id,
+                    company_name=company_name or "",
+                    has_chart=local_answer["chart_data"] is not None,
+                    chart_data=local_answer["chart_data"],
+                    reports_used=0,
+                    suggestions=services.gemini.generate_suggestions(request.message, len(reports_for_charts))
+                )
+
+        # Statystyki branży (prekomputowane) jako zwięzłe tło do porównań
+        industry_context = await services.industry.context_for(db, context["industry"])
+
         context_message = request.message
         if company_name and not all_reports_text:
             context_message = f"[Pytanie dotyczy firmy: {company_name}] {request.message}"
 
-        gemini_response = await gemini_service.generate_response(
+        gemini_response = await services.gemini.generate_response(
             user_message=context_message,
             company_name=company_name or "Nieznana firma",
             all_reports_text=all_reports_text,
-            chat_history=chat_history
+            chat_history=chat_history,
+            industry_context=industry_context
         )
         
         if not gemini_response["success"]:
             error_msg = "Przepraszam, mam problem z połączeniem z AI."
-            assistant_message = ChatHistory(
-                session_id=session_id,
-                role=MessageRole.ASSISTANT.value,
-                content=error_msg
-            )
-            db.add(assistant_message)
+            _add_turn_messages(db, session_id, request.message, user_timestamp, error_msg)
             await db.commit()
             return ChatResponse(
                 response=error_msg, 
@@ -151,8 +279,11 @@ async def chat(
                 chart_type = chart_config.get("chart_type", "line")
                 title = chart_config.get("title", "Wykres finansowy")
                 
-                chart_data = chart_service.prepare_chart_data(
-                    reports=reports_for_charts,
+                points = await services.metrics.get_company_points(
+                    db, request.company_id or reports_for_charts[0].company_id, metrics
+                )
+                chart_data = services.charts.prepare_chart_data(
+                    points=points,
                     metric_keys=metrics,
                     chart_type=chart_type,
                     title=title
@@ -162,12 +293,10 @@ async def chat(
             except Exception as e:
                 print(f"Error generating chart: {e}")
 
-        assistant_message = ChatHistory(
-            session_id=session_id,
-            role=MessageRole.ASSISTANT.value,
-            content=gemini_response["response"]
+        # Jedna transakcja: sesja (jeśli nowa) + wiadomość użytkownika + odpowiedź
+        _add_turn_messages(
+            db, session_id, request.message, user_timestamp, gemini_response["response"]
         )
-        db.add(assistant_message)
         await db.commit()
         
         return ChatResponse(
@@ -181,6 +310,7 @@ async def chat(
         )
         
     except Exception as e:
+        await db.rollback()
         print(f"Error generation: {e}")
         raise HTTPException(status_code=500, detail=f"Error generating response: {str(e)}")
 
@@ -189,7 +319,8 @@ async def chat(
 async def analyze_company(
     company_id: int,
     request: Optional[AnalysisRequest] = None,
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Analyze company trends based on all reports"""
 
@@ -201,9 +332,10 @@ async def analyze_company(
 
     reports_res = await db.execute(
         select(Report)
+        .options(undefer(Report.summary))
         .where(Report.company_id == company_id)
         .where(Report.status == "processed")
-        .order_by(Report.upload_date.asc()) # Od najstarszego do najnowszego
+        .order_by(Report.period_ordinal.asc().nulls_last(), Report.upload_date.asc()) # Od najstarszego do najnowszego
     )
     reports = reports_res.scalars().all()
     
@@ -219,7 +351,7 @@ async def analyze_company(
 
     reports_data = []
     for report in reports:
-        if not report.extracted_text or len(report.extracted_text) < 100:
+        if (report.extracted_text_length or 0) < 100:
             continue
 
         reports_data.append({
@@ -228,7 +360,7 @@ async def analyze_company(
             "summary": report.summary or ""
         })
 
-    analysis_result = await gemini_service.analyze_company_trends(
+    analysis_result = await services.gemini.analyze_company_trends(
         company_name=company.name,
         all_reports_data=reports_data
     )
@@ -246,30 +378,60 @@ async def analyze_company(
 @router.get("/history/{session_id}", response_model=List[ChatMessage])
 async def get_chat_history(
     session_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Bez limit i cursor - cała historia"),
+    cursor: Optional[str] = Query(None, description=f"Wartość nagłówka {NEXT_CURSOR_HEADER} - starsze wiadomości"),
     db: AsyncSession = Depends(get_session)
 ):
-    """Get chat history for a session"""
-    result = await db.execute(
-        select(ChatHistory)
+    """Get chat history for a session in chronological order - all messages, or the newest
+    `limit` (with a cursor to older pages) when paginating"""
+    # Walidator: ostatnia wiadomość sesji (indeks session_id, timestamp, id)
+    latest = await db.execute(
+        select(ChatHistory.id, ChatHistory.timestamp)
         .where(ChatHistory.session_id == session_id)
-        .order_by(ChatHistory.timestamp.asc())
+        .order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc())
+        .limit(1)
     )
-    history = result.scalars().all()
+    latest_id, last_modified = latest.first() or (None, None)
+    not_modified = conditional_response(
+        request, response,
+        make_etag("history", session_id, latest_id, limit, cursor),
+        last_modified
+    )
+    if not_modified:
+        return not_modified
     
-    return [
-        ChatMessage(
-            role=MessageRole(record.role),
-            content=record.content,
-            timestamp=record.timestamp
+    # Stronicowanie tylko na życzenie klienta - domyślnie cała sesja, jak przed keysetem
+    if limit is None and cursor:
+        limit = HISTORY_PAGE_SIZE
+    query = (
+        select(*CHAT_MESSAGE_COLUMNS)
+        .where(ChatHistory.session_id == session_id)
+        .order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc())
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    if cursor:
+        before_timestamp, before_id = decode_cursor(cursor, 2)
+        query = query.where(
+            tuple_(ChatHistory.timestamp, ChatHistory.id) < tuple_(before_timestamp, before_id)
         )
-        for record in history
-    ]
+    
+    result = await db.execute(query)
+    history = result.all()
+    
+    if history and limit is not None:
+        set_next_cursor(response, history, limit, history[-1].timestamp, history[-1].id)
+    
+    return fast_json([chat_message_row(record) for record in reversed(history)], response)
 
 
 @router.delete("/session/{session_id}")
 async def delete_session(
     session_id: str,
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Delete session"""
     await db.execute(
@@ -279,5 +441,6 @@ async def delete_session(
     session = result.scalar_one_or_none()
     if session:
         await db.delete(session)
+        await services.stats.bump(db, CHAT_SESSIONS_COUNTER, -1)
         await db.commit()
     return {"message": "Session deleted"}
\ No newline at end of file
@@ -1,18 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List
+from sqlalchemy import select, delete
+from typing import List, Optional
 
-from app.database.database import get_session, Company, Report
+from app.database.database import get_session, AppCounter, Company, Report, ReportMetric
 from app.models.schemas import CompanyCreate, CompanyUpdate, CompanyResponse, CompanyDetail
+from app.api.conditional import conditional_response, make_etag
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, set_next_cursor
+from app.api.serialization import COMPANY_COLUMNS, REPORT_INFO_COLUMNS, company_row, company_object_row, report_info_row, fast_json
+from app.services.container import ServiceContainer, get_services
+from app.services.company_stats_service import COMPANIES_VERSION_COUNTER, REPORTS_COUNTER
+from app.services.industry_service import industry_key
 
 router = APIRouter(prefix="/api/companies", tags=["companies"])
 
 
+def _company_response(company: Company) -> CompanyResponse:
+    return CompanyResponse(**company_row(company_object_row(company)))
+
+
 @router.post("/", response_model=CompanyResponse, status_code=201)
 async def create_company(
     company: CompanyCreate,
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Utwórz nową firmę"""
 
@@ -32,62 +43,57 @@ async def create_company(
     )
     
     db.add(new_company)
+    await services.stats.companies_changed(db, 1)
     await db.commit()
     await db.refresh(new_company)
     
-    return CompanyResponse(
-        id=new_company.id,
-        name=new_company.name,
-        ticker=new_company.ticker,
-        description=new_company.description,
-        industry=new_company.industry,
-        created_at=new_company.created_at,
-        updated_at=new_company.updated_at,
-        reports_count=0
-    )
+    return _company_response(new_company)
 
 
 @router.get("/", response_model=List[CompanyResponse])
 async def get_companies(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Użyj `cursor` (stronicowanie keyset)"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description=f"Wartość nagłówka {NEXT_CURSOR_HEADER} z poprzedniej strony"),
     db: AsyncSession = Depends(get_session)
 ):
     """Pobierz listę wszystkich firm"""
     
-    # Pobierz firmy z liczbą raportów
-    result = await db.execute(
-        select(
-            Company,
-            func.count(Report.id).label('reports_count')
-        )
-        .outerjoin(Report)
-        .group_by(Company.id)
-        .order_by(Company.name)
-        .offset(skip)
-        .limit(limit)
+    # Walidator listy: licznik wersji z app_counters (odczyt po kluczu głównym,
+    # podbijany przez CompanyStatsService przy każdej zmianie listowanych kolumn)
+    version = await db.scalar(select(AppCounter.value).where(AppCounter.name == COMPANIES_VERSION_COUNTER))
+    not_modified = conditional_response(
+        request, response, make_etag("companies", version, skip, limit, cursor)
     )
+    if not_modified:
+        return not_modified
+    
+    # Pojedynczy odczyt po indeksie companies.name - liczniki są w wierszu firmy;
+    # krotki kolumn prosto do JSON (bez obiektów ORM i modeli pydantic)
+    query = select(*COMPANY_COLUMNS).order_by(Company.name).limit(limit)
+    
+    if cursor:
+        (last_name,) = decode_cursor(cursor, 1)
+        query = query.where(Company.name > last_name)
+    elif skip:
+        query = query.offset(skip)
     
-    companies_data = result.all()
+    result = await db.execute(query)
+    companies = result.all()
     
-    return [
-        CompanyResponse(
-            id=company.id,
-            name=company.name,
-            ticker=company.ticker,
-            description=company.description,
-            industry=company.industry,
-            created_at=company.created_at,
-            updated_at=company.updated_at,
-            reports_count=reports_count
-        )
-        for company, reports_count in companies_data
-    ]
+    if companies:
+        set_next_cursor(response, companies, limit, companies[-1].name)
+    
+    return fast_json([company_row(company) for company in companies], response)
 
 
 @router.get("/{company_id}", response_model=CompanyDetail)
 async def get_company(
     company_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_session)
 ):
     """Pobierz szczegóły firmy wraz z raportami"""
@@ -99,40 +105,26 @@ async def get_company(
     
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
+    
+    # Każda zmiana raportów podbija reports_version firmy - raporty nie są czytane przy 304
+    not_modified = conditional_response(
+        request, response,
+        make_etag("company", company.id, company.updated_at, company.reports_version),
+        company.updated_at
+    )
+    if not_modified:
+        return not_modified
 
     reports_result = await db.execute(
-        select(Report)
+        select(*REPORT_INFO_COLUMNS)
         .where(Report.company_id == company_id)
-        .order_by(Report.report_year.desc(), Report.report_quarter.desc())
+        .order_by(Report.period_ordinal.desc().nulls_last(), Report.upload_date.desc())
     )
-    reports = reports_result.scalars().all()
+    reports = [report_info_row(row) for row in reports_result]
     
-    from app.models.schemas import ReportInfo
-    
-    return CompanyDetail(
-        id=company.id,
-        name=company.name,
-        ticker=company.ticker,
-        description=company.description,
-        industry=company.industry,
-        created_at=company.created_at,
-        updated_at=company.updated_at,
-        reports_count=len(reports),
-        reports=[
-            ReportInfo(
-                id=r.id,
-                company_id=r.company_id,
-                filename=r.original_filename,
-                report_type=r.report_type,
-                report_period=r.report_period,
-                report_year=r.report_year,
-                report_quarter=r.report_quarter,
-                upload_date=r.upload_date,
-                file_size=r.file_size,
-                status=r.status
-            )
-            for r in reports
-        ]
+    return fast_json(
+        {**company_row(company_object_row(company)), "reports_count": len(reports), "reports": reports},
+        response
     )
 
 
@@ -140,7 +132,8 @@ async def get_company(
 async def update_company(
     company_id: int,
     company_update: CompanyUpdate,
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Zaktualizuj dane firmy"""
     
@@ -154,34 +147,28 @@ async def update_company(
     
     # Update tylko niepustych pól
     update_data = company_update.model_dump(exclude_unset=True)
+    previous_industry = company.industry
     for field, value in update_data.items():
         setattr(company, field, value)
     
+    # Zmiana branży przenosi metryki firmy między agregatami obu branż
+    if industry_key(previous_industry) != industry_key(company.industry):
+        await db.flush()
+        await services.industry.refresh(db, previous_industry)
+        await services.industry.refresh(db, company.industry)
+    
+    await services.stats.companies_changed(db)
     await db.commit()
     await db.refresh(company)
     
-    # Pobierz liczbę raportów
-    reports_result = await db.execute(
-        select(func.count(Report.id)).where(Report.company_id == company_id)
-    )
-    reports_count = reports_result.scalar()
-    
-    return CompanyResponse(
-        id=company.id,
-        name=company.name,
-        ticker=company.ticker,
-        description=company.description,
-        industry=company.industry,
-        created_at=company.created_at,
-        updated_at=company.updated_at,
-        reports_count=reports_count
-    )
+    return _company_response(company)
 
 
 @router.delete("/{company_id}")
 async def delete_company(
     company_id: int,
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
 ):
     """Usuń firmę (kaskadowo usuwa wszystkie raporty)"""
     
@@ -194,18 +181,23 @@ async def delete_company(
         raise HTTPException(status_code=404, detail="Company not found")
 
     import os
-    reports_result = await db.execute(
-        select(Report).where(Report.company_id == company_id)
+    paths_result = await db.execute(
+        select(Report.file_path).where(Report.company_id == company_id)
     )
-    reports = reports_result.scalars().all()
+    file_paths = paths_result.scalars().all()
     
-    for report in reports:
-        if os.path.exists(report.file_path):
-            os.remove(report.file_path)
+    for file_path in file_paths:
+        if os.path.exists(file_path):
+            os.remove(file_path)
 
+    await db.execute(delete(ReportMetric).where(ReportMetric.company_id == company_id))
     await db.delete(company)
+    await services.stats.companies_changed(db, -1)
+    await services.stats.bump(db, REPORTS_COUNTER, -len(file_paths))
+    await services.industry.refresh(db, company.industry)
     await db.commit()
+    services.chart_cache.invalidate(company_id)
     
     return {
-        "message": f"Company '{company.name}' and {len(reports)} report(s) deleted successfully"
+        "message": f"Company '{company.name}' and {len(file_paths)} report(s) deleted successfully"
     }
\ No newline at end of file
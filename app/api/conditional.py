@@ -0,0 +1,73 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Zasoby zmienne - klient może trzymać kopię, ale zawsze ją rewaliduje
+REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag derived from row versions (not from the serialized body)"""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers the given ETag (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Kolumny DateTime przechowują naiwny czas UTC (datetime.utcnow)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _not_modified_since(request: Request, last_modified: datetime) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return _as_utc(last_modified) <= since
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = REVALIDATE
+) -> Optional[Response]:
+    """Set validator headers; return a 304 response if the client copy is current.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    Call before building the body so that 304 skips serialization entirely.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    response.headers.update(headers)
+
+    if "if-none-match" in request.headers:
+        fresh = etag_matches(request, etag)
+    else:
+        fresh = last_modified is not None and _not_modified_since(request, last_modified)
+
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    return None
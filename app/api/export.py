@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import datetime
+
+from app.database.database import async_session_maker
+from app.services.container import ServiceContainer, get_services
+from app.services.export_service import ExportService, EXPORT_FORMATS
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+
+def _export_response(
+    export_service: ExportService,
+    dataset: str,
+    export_format: str,
+    company_id: Optional[int],
+    include_text: bool
+) -> StreamingResponse:
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if export_format == "parquet" and not export_service.parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires the optional 'pyarrow' package")
+
+    async def body():
+        # Własna sesja - odpowiedź jest wysyłana już po zakończeniu endpointu
+        async with async_session_maker() as db:
+            async for chunk in export_service.stream(db, dataset, export_format, company_id, include_text):
+                yield chunk
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"{dataset}_{datetime.utcnow():%Y%m%d_%H%M%S}.{extension}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/metrics")
+async def export_metrics(
+    format: str = Query("csv", description="csv, ndjson or parquet"),
+    company_id: Optional[int] = None,
+    services: ServiceContainer = Depends(get_services)
+):
+    """Stream all extracted metrics (one row per report metric)"""
+    return _export_response(services.exports, "metrics", format, company_id, False)
+
+
+@router.get("/reports")
+async def export_reports(
+    format: str = Query("csv", description="csv, ndjson or parquet"),
+    company_id: Optional[int] = None,
+    include_text: bool = Query(False, description="Include extracted report text"),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Stream report metadata (and optionally extracted text)"""
+    return _export_response(services.exports, "reports", format, company_id, include_text)
@@ -0,0 +1,41 @@
+import io
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.database.database import get_session
+from app.models.schemas import ImportResponse
+from app.services.container import ServiceContainer, get_services
+from app.services.import_service import IMPORT_FORMATS, read_rows
+
+router = APIRouter(prefix="/api/import", tags=["import"])
+
+
+@router.post("/metrics", response_model=ImportResponse)
+async def import_metrics(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson (default: from file extension)"),
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
+):
+    """Bulk import of historical metrics without PDFs.
+
+    Rows: company, period ("Q1 2024" / "2024" or year + quarter), optional
+    industry/ticker, and either metric + value or one column per metric.
+    """
+    import_format = format or (file.filename or "").rsplit(".", 1)[-1].lower()
+    if import_format == "jsonl":
+        import_format = "ndjson"
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(IMPORT_FORMATS)}")
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        result = await services.imports.import_rows(db, read_rows(stream, import_format))
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
+    finally:
+        stream.detach()
+
+    return ImportResponse(**result)
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from typing import List
+
+from app.config import settings
+from app.monitoring.profiling import PROFILE_TOKEN_HEADER, token_matches
+from app.services.container import ServiceContainer, get_services
+
+router = APIRouter(prefix="/api/profiles", tags=["profiling"])
+
+
+def require_profiling_access(request: Request) -> None:
+    """Profiles reveal code paths and queries - token required whenever one is configured"""
+    if settings.profiling_token:
+        if not token_matches(settings.profiling_token, request.headers.get(PROFILE_TOKEN_HEADER)):
+            raise HTTPException(status_code=403, detail="Invalid profiling token")
+    elif not settings.profile_all_requests:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+
+@router.get("/", response_model=List[dict], dependencies=[Depends(require_profiling_access)])
+async def list_profiles(services: ServiceContainer = Depends(get_services)):
+    """Stored request profiles, newest first"""
+    return await run_in_threadpool(services.profiles.list)
+
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profiling_access)])
+async def get_profile(profile_id: str, services: ServiceContainer = Depends(get_services)):
+    """Profile summary: wall/CPU/awaiting/blocked time and top hotspots"""
+    summary = await run_in_threadpool(services.profiles.get, profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return summary
+
+
+@router.get("/{profile_id}/raw", dependencies=[Depends(require_profiling_access)])
+async def download_profile(profile_id: str, services: ServiceContainer = Depends(get_services)):
+    """Raw cProfile dump (python -m pstats / snakeviz)"""
+    path = await run_in_threadpool(services.profiles.raw_path, profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
@@ -1,21 +1,37 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import select, delete, tuple_, update
+from sqlalchemy.orm import undefer
+from typing import AsyncIterator, List, Optional
 import os
 import uuid
 from datetime import datetime
 
-from app.database.database import get_session, Report, Company
+from app.database.database import get_session, Report, Company, ReportMetric
 from app.models.schemas import ReportUploadResponse, ReportInfo, ReportDetail
-from app.services.pdf_processor import PDFProcessor
-from app.services.gemini_service import GeminiService
+from app.api.conditional import conditional_response, make_etag
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, set_next_cursor
+from app.api.serialization import REPORT_INFO_COLUMNS, report_info_row, fast_json
+from app.services.container import ServiceContainer, get_services
+from app.services.company_stats_service import REPORTS_COUNTER
+from app.services.periods import period_ordinal
 from app.config import settings
+from app.monitoring.ingestion import IngestionTrace, ingestion_trace, summarize_traces
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
-pdf_processor = PDFProcessor()
-gemini_service = GeminiService()
+
+async def traced_ingestion(db: AsyncSession = Depends(get_session)) -> AsyncIterator[IngestionTrace]:
+    """Trace of one upload, stored on the report after the handler's last stage and commit"""
+    with ingestion_trace() as trace:
+        yield trace
+    if trace.report_id is not None:
+        await db.execute(
+            update(Report).where(Report.id == trace.report_id)
+            .values(ingestion_trace=trace.as_dict())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
 
 
 @router.post("/upload", response_model=ReportUploadResponse)
@@ -23,7 +39,9 @@ async def upload_report(
     file: UploadFile = File(...),
     company_id: int = Form(...),
     report_type: str = Form("quarterly"),
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services),
+    trace: IngestionTrace = Depends(traced_ingestion)
 ):
     """Upload and process a financial report PDF"""
 
@@ -50,14 +68,14 @@ async def upload_report(
             content = await file.read()
             buffer.write(content)
 
-        processing_result = pdf_processor.process_report(file_path)
+        processing_result = services.pdf_processor.process_report(file_path)
         
         if not processing_result["success"]:
             os.remove(file_path)
             raise HTTPException(status_code=500, detail=processing_result.get("error"))
 
         text_sample = processing_result.get("text", "")[:5000]
-        company_info = await gemini_service.extract_company_info(text_sample)
+        company_info = await services.gemini.extract_company_info(text_sample)
         
         report_period = processing_result.get("report_period")
         report_year = None
@@ -76,16 +94,21 @@ async def upload_report(
                 report_type = "annual"
 
         print("Extracting metrics with AI...")
-        metrics = processing_result.get("metrics", {})
+        ai_metrics = {}
         try:
-            ai_metrics = await gemini_service.extract_financial_metrics_ai(processing_result.get("text", ""))
-            for key, value in ai_metrics.items():
-                if value is not None:
-                    metrics[key] = value
+            ai_metrics = await services.gemini.extract_financial_metrics_ai(processing_result.get("text", ""))
         except Exception as e:
             print(f"AI extraction failed: {e}")
+        metrics, metric_sources = services.metrics.merge_metrics(processing_result.get("metrics", {}), ai_metrics)
             
         processing_result["metrics"] = metrics
+        stored_text = processing_result.get("text", "")[:50000]
+        trace.inputs = {
+            "file_bytes": file_size,
+            "text_chars": len(processing_result.get("text", "")),
+            "stored_text_chars": len(stored_text),
+            "tables": processing_result.get("tables_count", 0),
+        }
 
         new_report = Report(
             filename=unique_filename,
@@ -96,25 +119,34 @@ async def upload_report(
             report_year=report_year,
             report_quarter=report_quarter,
             report_type=report_type,
+            period_ordinal=period_ordinal(report_year, report_quarter, report_type),
             file_size=file_size,
             file_path=file_path,
-            extracted_text=processing_result.get("text", "")[:50000],
+            extracted_text=stored_text,
+            extracted_text_length=len(stored_text),
             key_metrics=processing_result.get("metrics"),
             status="processing"
         )
         
         db.add(new_report)
+        await db.flush()
+        db.add_all(services.metrics.build_rows(new_report, metric_sources))
+        await services.stats.refresh_company(db, new_report.company_id)
+        await services.industry.refresh_for_company(db, new_report.company_id, new_report.period_ordinal)
+        await services.stats.bump(db, REPORTS_COUNTER)
         await db.commit()
         await db.refresh(new_report)
 
         try:
-            summary = await gemini_service.generate_summary(processing_result.get("text", ""))
+            summary = await services.gemini.generate_summary(processing_result.get("text", ""))
             new_report.summary = summary
             new_report.status = "processed"
         except Exception:
             new_report.status = "processed_no_summary"
         
+        await services.stats.touch_company(db, new_report.company_id)
         await db.commit()
+        trace.report_id = new_report.id
         
         return ReportUploadResponse(
             id=new_report.id,
@@ -137,7 +169,9 @@ async def upload_report(
 @router.post("/auto-upload", response_model=ReportUploadResponse)
 async def auto_upload_report(
     file: UploadFile = File(...),
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services),
+    trace: IngestionTrace = Depends(traced_ingestion)
 ):
     """Automatycznie rozpoznaj firmę z PDF i przypisz raport"""
     
@@ -160,14 +194,14 @@ async def auto_upload_report(
             content = await file.read()
             buffer.write(content)
 
-        processing_result = pdf_processor.process_report(file_path)
+        processing_result = services.pdf_processor.process_report(file_path)
         
         if not processing_result["success"]:
             os.remove(file_path)
             raise HTTPException(status_code=500, detail=processing_result.get("error"))
 
         text_sample = processing_result.get("text", "")[:5000]
-        company_info = await gemini_service.extract_company_info(text_sample)
+        company_info = await services.gemini.extract_company_info(text_sample)
         
         if not company_info or not company_info.get("name"):
             os.remove(file_path)
@@ -186,20 +220,27 @@ async def auto_upload_report(
                 description=company_info.get("description")
             )
             db.add(company)
+            await services.stats.companies_changed(db, 1)
             await db.commit()
             await db.refresh(company)
 
         print("Extracting metrics with AI...")
-        metrics = processing_result.get("metrics", {})
+        ai_metrics = {}
         try:
-            ai_metrics = await gemini_service.extract_financial_metrics_ai(processing_result.get("text", ""))
-            for key, value in ai_metrics.items():
-                if value is not None:
-                    metrics[key] = value
+            ai_metrics = await services.gemini.extract_financial_metrics_ai(processing_result.get("text", ""))
         except Exception as e:
             print(f"AI extraction failed: {e}")
+        metrics, metric_sources = services.metrics.merge_metrics(processing_result.get("metrics", {}), ai_metrics)
             
         processing_result["metrics"] = metrics
+        stored_text = processing_result.get("text", "")[:50000]
+        trace.inputs = {
+            "file_bytes": file_size,
+            "text_chars": len(processing_result.get("text", "")),
+            "stored_text_chars": len(stored_text),
+            "tables": processing_result.get("tables_count", 0),
+        }
+        report_type = "quarterly" if company_info.get("report_quarter") else "annual"
 
         new_report = Report(
             filename=unique_filename,
@@ -209,26 +250,35 @@ async def auto_upload_report(
             report_period=company_info.get("report_period") or processing_result.get("report_period"),
             report_year=company_info.get("report_year"),
             report_quarter=company_info.get("report_quarter"),
-            report_type="quarterly" if company_info.get("report_quarter") else "annual",
+            report_type=report_type,
+            period_ordinal=period_ordinal(company_info.get("report_year"), company_info.get("report_quarter"), report_type),
             file_size=file_size,
             file_path=file_path,
-            extracted_text=processing_result.get("text", "")[:50000],
+            extracted_text=stored_text,
+            extracted_text_length=len(stored_text),
             key_metrics=processing_result.get("metrics"),
             status="processing"
         )
         
         db.add(new_report)
+        await db.flush()
+        db.add_all(services.metrics.build_rows(new_report, metric_sources))
+        await services.stats.refresh_company(db, new_report.company_id)
+        await services.industry.refresh_for_company(db, new_report.company_id, new_report.period_ordinal)
+        await services.stats.bump(db, REPORTS_COUNTER)
         await db.commit()
         await db.refresh(new_report)
 
         try:
-            summary = await gemini_service.generate_summary(processing_result.get("text", ""))
+            summary = await services.gemini.generate_summary(processing_result.get("text", ""))
             new_report.summary = summary
             new_report.status = "processed"
         except Exception:
             new_report.status = "processed_no_summary"
         
+        await services.stats.touch_company(db, new_report.company_id)
         await db.commit()
+        trace.report_id = new_report.id
         
         return ReportUploadResponse(
             id=new_report.id,
@@ -253,56 +303,100 @@ async def auto_upload_report(
 
 @router.get("/", response_model=List[ReportInfo])
 async def get_reports(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Użyj `cursor` (stronicowanie keyset)"),
+    limit: int = Query(100, ge=1, le=1000),
     company_id: Optional[int] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description=f"Wartość nagłówka {NEXT_CURSOR_HEADER} z poprzedniej strony"),
     db: AsyncSession = Depends(get_session)
 ):
-    """Get list of reports, optionally filtered by company"""
-    query = select(Report).order_by(Report.upload_date.desc()).offset(skip).limit(limit)
+    """Get list of reports, optionally filtered by company and status (newest uploads first)"""
+    query = select(*REPORT_INFO_COLUMNS).order_by(Report.upload_date.desc(), Report.id.desc()).limit(limit)
     
     if company_id:
         query = query.where(Report.company_id == company_id)
+    if status:
+        query = query.where(Report.status == status)
+    
+    if cursor:
+        last_upload_date, last_id = decode_cursor(cursor, 2)
+        query = query.where(tuple_(Report.upload_date, Report.id) < tuple_(last_upload_date, last_id))
+    elif skip:
+        query = query.offset(skip)
         
     result = await db.execute(query)
-    reports = result.scalars().all()
+    reports = result.all()
     
-    return [
-        ReportInfo(
-            id=report.id,
-            filename=report.original_filename,
-            report_period=report.report_period,
-            report_type=report.report_type,
-            upload_date=report.upload_date,
-            status=report.status
-        )
-        for report in reports
-    ]
+    if reports:
+        set_next_cursor(response, reports, limit, reports[-1].upload_date, reports[-1].id)
+    
+    return fast_json([report_info_row(report) for report in reports], response)
+
+@router.get("/ingestion-stats")
+async def get_ingestion_stats(
+    company_id: Optional[int] = None,
+    limit: int = Query(1000, ge=1, le=10000, description="Liczba najnowszych raportów"),
+    db: AsyncSession = Depends(get_session)
+):
+    """Per-stage ingestion latency (mean/p50/p95/max) and LLM token volume across recent reports"""
+    query = (
+        select(Report.ingestion_trace)
+        .where(Report.ingestion_trace.isnot(None))
+        .order_by(Report.upload_date.desc(), Report.id.desc())
+        .limit(limit)
+    )
+    if company_id:
+        query = query.where(Report.company_id == company_id)
+    
+    result = await db.execute(query)
+    return summarize_traces(result.scalars())
 
 @router.get("/{report_id}", response_model=ReportDetail)
-async def get_report(report_id: int, db: AsyncSession = Depends(get_session)):
-    result = await db.execute(select(Report).where(Report.id == report_id))
+async def get_report(
+    report_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_session)
+):
+    result = await db.execute(
+        select(Report).where(Report.id == report_id).options(undefer(Report.summary), undefer(Report.ingestion_trace))
+    )
     report = result.scalar_one_or_none()
     
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     
+    last_modified = report.updated_at or report.upload_date
+    not_modified = conditional_response(
+        request, response, make_etag("report", report.id, last_modified), last_modified
+    )
+    if not_modified:
+        return not_modified
+    
     return ReportDetail(
         id=report.id,
+        company_id=report.company_id,
         filename=report.original_filename,
-        company_name=report.company_name,
-        report_period=report.report_period,
         report_type=report.report_type,
+        report_period=report.report_period,
+        report_year=report.report_year,
+        report_quarter=report.report_quarter,
         upload_date=report.upload_date,
         file_size=report.file_size,
         status=report.status,
-        extracted_text_length=len(report.extracted_text) if report.extracted_text else 0,
+        extracted_text_length=report.extracted_text_length or 0,
         key_metrics=report.key_metrics,
-        summary=report.summary
+        summary=report.summary,
+        ingestion_trace=report.ingestion_trace
     )
 
 @router.delete("/{report_id}")
-async def delete_report(report_id: int, db: AsyncSession = Depends(get_session)):
+async def delete_report(
+    report_id: int,
+    db: AsyncSession = Depends(get_session),
+    services: ServiceContainer = Depends(get_services)
+):
     result = await db.execute(select(Report).where(Report.id == report_id))
     report = result.scalar_one_or_none()
     
@@ -315,6 +409,10 @@ async def delete_report(report_id: int, db: AsyncSession = Depends(get_session))
         except OSError:
             pass
     
+    await db.execute(delete(ReportMetric).where(ReportMetric.report_id == report_id))
     await db.delete(report)
+    await services.stats.refresh_company(db, report.company_id)
+    await services.industry.refresh_for_company(db, report.company_id, report.period_ordinal)
+    await services.stats.bump(db, REPORTS_COUNTER, -1)
     await db.commit()
     return {"message": "Report deleted"}
\ No newline at end of file
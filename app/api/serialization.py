@@ -0,0 +1,97 @@
+import json
+from datetime import datetime
+from typing import Any, Dict
+
+from fastapi import Response
+
+from app.database.database import Company, Report, ChatHistory
+from app.services.periods import period_label
+
+try:
+    import orjson
+except ImportError:  # opcjonalna zależność - wolniejszy fallback na json
+    orjson = None
+
+# Kolumny czytane bez obiektów ORM; etykiety = nazwy pól schematów odpowiedzi
+COMPANY_COLUMNS = (
+    Company.id, Company.name, Company.ticker, Company.description, Company.industry,
+    Company.created_at, Company.updated_at, Company.reports_count, Company.latest_period_ordinal,
+    Company.latest_key_metrics, Company.last_upload_at,
+)
+REPORT_INFO_COLUMNS = (
+    Report.id, Report.company_id, Report.original_filename.label("filename"), Report.report_type,
+    Report.report_period, Report.report_year, Report.report_quarter, Report.upload_date,
+    Report.file_size, Report.status,
+)
+REPORT_INFO_FIELDS = tuple(column.key for column in REPORT_INFO_COLUMNS)
+CHAT_MESSAGE_COLUMNS = (ChatHistory.id, ChatHistory.role, ChatHistory.content, ChatHistory.timestamp)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes; datetimes as ISO 8601 like pydantic's JSON mode"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered straight from dicts/lists (no pydantic round-trip)"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_json(content: Any, response: Response, status_code: int = 200) -> FastJSONResponse:
+    """Wrap content, keeping headers set on the injected Response (ETag, cursor).
+
+    FastAPI ignores the injected Response when an endpoint returns a Response
+    itself; response_model still documents the shape in OpenAPI, so content
+    must match it.
+    """
+    fast = FastJSONResponse(content, status_code=status_code)
+    fast.raw_headers.extend(
+        (name, value) for name, value in response.headers.raw if name != b"content-length"
+    )
+    return fast
+
+
+def company_row(row) -> Dict[str, Any]:
+    """CompanyResponse fields from a COMPANY_COLUMNS row (unpacked - attribute access on Row is slow)"""
+    (company_id, name, ticker, description, industry, created_at, updated_at,
+     reports_count, latest_period_ordinal, latest_key_metrics, last_upload_at) = row
+    return {
+        "id": company_id,
+        "name": name,
+        "ticker": ticker,
+        "description": description,
+        "industry": industry,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "reports_count": reports_count or 0,
+        "latest_period": period_label(latest_period_ordinal) if latest_period_ordinal else None,
+        "latest_key_metrics": latest_key_metrics,
+        "last_upload_at": last_upload_at,
+    }
+
+
+def company_object_row(company: Company) -> tuple:
+    """COMPANY_COLUMNS values of a loaded Company object"""
+    return tuple(getattr(company, column.key) for column in COMPANY_COLUMNS)
+
+
+def report_info_row(row) -> Dict[str, Any]:
+    """ReportInfo fields from a REPORT_INFO_COLUMNS row"""
+    return dict(zip(REPORT_INFO_FIELDS, row))
+
+
+def chat_message_row(row) -> Dict[str, Any]:
+    """ChatMessage fields from a CHAT_MESSAGE_COLUMNS row"""
+    _, role, content, timestamp = row
+    return {"role": role, "content": content, "timestamp": timestamp}
@@ -0,0 +1,94 @@
+"""
+Narzędzia wiersza poleceń.
+
+    python -m app.cli export metrics --format csv --output metrics.csv
+    python -m app.cli export reports --format ndjson --include-text --output -
+    python -m app.cli import history.csv
+"""
+import argparse
+import asyncio
+import sys
+
+from app.config import settings
+from app.database.database import init_db, async_session_maker
+from app.services.export_service import ExportService, EXPORT_FORMATS
+from app.services.import_service import ImportService, IMPORT_FORMATS, read_rows
+
+
+async def run_export(args: argparse.Namespace) -> None:
+    service = ExportService(args.batch_size)
+    if args.format == "parquet" and not service.parquet_available():
+        raise SystemExit("Parquet export requires the optional 'pyarrow' package")
+
+    await init_db()
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    written = 0
+    try:
+        async with async_session_maker() as db:
+            async for chunk in service.stream(db, args.dataset, args.format, args.company_id, args.include_text):
+                output.write(chunk)
+                written += len(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    if args.output != "-":
+        print(f"✓ Exported {args.dataset} to {args.output} ({written} bytes)", file=sys.stderr)
+
+
+async def run_import(args: argparse.Namespace) -> None:
+    import_format = args.format or args.input.rsplit(".", 1)[-1].lower()
+    if import_format == "jsonl":
+        import_format = "ndjson"
+    if import_format not in IMPORT_FORMATS:
+        raise SystemExit(f"Format must be one of: {', '.join(IMPORT_FORMATS)} (use --format)")
+
+    await init_db()
+    service = ImportService(args.batch_size)
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8-sig", newline="")
+    try:
+        async with async_session_maker() as db:
+            # Jak przy starcie aplikacji - bez wierszy liczników bump() niczego nie zmienia
+            await service.stats.ensure_counters(db)
+            result = await service.import_rows(db, read_rows(stream, import_format))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    for error in result["errors"]:
+        print(error, file=sys.stderr)
+    print(
+        f"✓ Imported {result['values_imported']} values from {result['rows_read']} rows "
+        f"({result['companies_created']} new companies, {result['reports_created']} new periods)",
+        file=sys.stderr
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=settings.app_name)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Stream metrics or report metadata to a file")
+    export.add_argument("dataset", choices=["metrics", "reports"])
+    export.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+    export.add_argument("--output", "-o", default="-", help="Output file ('-' = stdout)")
+    export.add_argument("--company-id", type=int, default=None)
+    export.add_argument("--include-text", action="store_true", help="Include extracted text (reports only)")
+    export.add_argument("--batch-size", type=int, default=settings.export_batch_size)
+    export.set_defaults(handler=run_export)
+
+    importer = commands.add_parser("import", help="Bulk import historical metrics (CSV / NDJSON)")
+    importer.add_argument("input", help="Input file ('-' = stdin)")
+    importer.add_argument("--format", choices=list(IMPORT_FORMATS), default=None, help="Default: from file extension")
+    importer.add_argument("--batch-size", type=int, default=settings.import_batch_size)
+    importer.set_defaults(handler=run_import)
+
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
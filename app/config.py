@@ -1,21 +1,78 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 
 class Settings(BaseSettings):
     # Gemini API
-    gemini_api_key: str
+    gemini_api_key: Optional[str] = None  # wymagany dopiero przy pierwszym wywołaniu LLM
     gemini_model: str = "gemini-2.5-flash"
+    llm_backend: str = "gemini"  # gemini / stub (deterministyczne odpowiedzi - testy obciążeniowe)
+    llm_stub_latency_ms: float = 0  # symulowany czas odpowiedzi backendu stub
     
     # Database
     database_url: str = "sqlite+aiosqlite:///./financial_chatbot.db"
+    database_echo: bool = False  # logowanie każdego zapytania SQL (tylko do debugowania; patrz sql_slow_query_ms)
+    
+    # SQLite - pragmy ustawiane na każdym nowym połączeniu
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size: int = -64000  # wartość ujemna = KiB (tu 64 MB)
+    sqlite_busy_timeout: int = 5000  # ms
+    
+    # PostgreSQL (asyncpg) - pula połączeń
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30  # s
+    db_pool_recycle: int = 1800  # s
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 500  # cache przygotowanych zapytań asyncpg
     
     # File Upload
     upload_folder: str = "./data/reports"
     max_upload_size: int = 10485760  # 10MB
     allowed_extensions: List[str] = ["pdf"]
     
+    # Cache
+    chart_cache_entries: int = 512  # gotowe odpowiedzi /api/analytics/chart-data (LRU)
+    
+    # Export / import
+    export_batch_size: int = 1000  # wiersze pobierane z kursora na paczkę
+    import_batch_size: int = 1000  # wiersze wejściowe na jeden executemany
+    
+    # Compression (gzip / brotli, jeśli zainstalowany)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024  # bajty - mniejsze odpowiedzi bez kompresji
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4  # 0-11; 4 - dobry stosunek do czasu CPU
+    compression_content_types: List[str] = [
+        "application/json", "text/csv", "application/x-ndjson", "text/plain", "text/html"
+    ]
+    
+    # Monitoring - /metrics w formacie Prometheus
+    metrics_enabled: bool = True
+    
+    # Watchdog pętli zdarzeń - stos kodu blokującego pętlę dłużej niż próg
+    loop_watchdog_enabled: bool = True
+    loop_watchdog_interval_ms: float = 50
+    loop_block_threshold_ms: float = 250
+    
+    # SQL per żądanie - nagłówki X-DB-Queries / X-DB-Time-Ms, wolne zapytania, N+1
+    sql_accounting_enabled: bool = True
+    sql_slow_query_ms: float = 200  # zapytania wolniejsze są logowane z parametrami; 0 - wyłączone
+    sql_n_plus_one_threshold: int = 5  # ten sam SELECT powtórzony w jednym żądaniu; 0 - wyłączone
+    
+    # Profilowanie żądań (cProfile) - nagłówek X-Profile-Token: <token> albo wszystkie żądania
+    profiling_token: Optional[str] = None
+    profile_all_requests: bool = False  # tylko do debugowania - spowalnia każde żądanie
+    profiling_dir: str = "./data/profiles"
+    profiling_max_profiles: int = 50  # starsze profile są usuwane
+    profiling_top: int = 25  # liczba funkcji w podsumowaniu
+    
+    # Chat
+    chat_local_answers: bool = True  # proste pytania o metryki/wykresy bez wywołania LLM
+    chat_context_messages: int = 0  # ostatnie wiadomości sesji w kontekście tury; 0 - cała historia
+    
     # CORS
     cors_origins: List[str] = ["http://localhost:4200", "http://localhost:3000"]
     
@@ -31,5 +88,7 @@ class Settings(BaseSettings):
 # Create settings instance
 settings = Settings()
 
-# Ensure upload folder exists
-os.makedirs(settings.upload_folder, exist_ok=True)
\ No newline at end of file
+
+def ensure_directories() -> None:
+    """Create the upload folder (called at startup, not on import)"""
+    os.makedirs(settings.upload_folder, exist_ok=True)
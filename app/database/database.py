@@ -1,14 +1,64 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, JSON, ForeignKey
+from sqlalchemy.orm import declarative_base, relationship, deferred, validates
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Text, Float, JSON, ForeignKey, Index, UniqueConstraint,
+    event, inspect, text
+)
+from sqlalchemy.engine import make_url
 from datetime import datetime
+from typing import Optional
 from app.config import settings
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=True,
-    future=True
-)
+
+def _normalize_database_url(url: str) -> str:
+    """Map plain PostgreSQL URLs onto the asyncpg driver"""
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+def _engine_options(url: str) -> dict:
+    """Engine arguments for the configured backend (SQLite or PostgreSQL/asyncpg)"""
+    options = {"echo": settings.database_echo, "future": True}
+    backend = make_url(url).get_backend_name()
+    
+    if backend == "postgresql":
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+            connect_args={
+                "prepared_statement_cache_size": settings.db_statement_cache_size,
+                "server_settings": {"application_name": settings.app_name},
+            },
+        )
+    
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL + tuning pragmas applied to every new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        if make_url(DATABASE_URL).database not in (None, "", ":memory:"):  # WAL wymaga pliku
+            cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+DATABASE_URL = _normalize_database_url(settings.database_url)
+
+engine = create_async_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -19,6 +69,13 @@ async_session_maker = async_sessionmaker(
 Base = declarative_base()
 
 
+def industry_key(industry: Optional[str]) -> Optional[str]:
+    """Normalized industry name used as the aggregate key ("Tech " == "tech")"""
+    if not industry or not industry.strip():
+        return None
+    return industry.strip().lower()
+
+
 class Company(Base):
     """Tabela firm - główna jednostka organizacyjna"""
     __tablename__ = "companies"
@@ -28,12 +85,26 @@ class Company(Base):
     ticker = Column(String, nullable=True, index=True)
     description = Column(Text, nullable=True)
     industry = Column(String, nullable=True)
+    industry_key = Column(String, nullable=True, index=True)  # industry_key(industry) - ustawiane przy zapisie
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    
+    # Zdenormalizowany stan raportów - utrzymywany przez CompanyStatsService
+    # przy ingestii i usuwaniu raportów
+    reports_count = Column(Integer, nullable=False, default=0, server_default="0")
+    latest_period_ordinal = Column(Integer, nullable=True)
+    latest_key_metrics = Column(JSON, nullable=True)
+    last_upload_at = Column(DateTime, nullable=True)
+    reports_version = Column(Integer, nullable=False, default=0, server_default="0")  # zmiana zbioru raportów/metryk
     
     # Relacje
     reports = relationship("Report", back_populates="company", cascade="all, delete-orphan")
 
+    @validates("industry")
+    def _set_industry_key(self, key, industry):
+        self.industry_key = industry_key(industry)
+        return industry
+
 
 class Report(Base):
     """Tabela raportów - pliki PDF przypisane do firm"""
@@ -49,18 +120,79 @@ class Report(Base):
     report_period = Column(String, nullable=True)
     report_year = Column(Integer, nullable=True, index=True)
     report_quarter = Column(Integer, nullable=True)
+    # Kanoniczny klucz okresu (app.services.periods) - liczony raz przy ingestii
+    period_ordinal = Column(Integer, nullable=True, index=True)
     
     upload_date = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     file_size = Column(Integer, nullable=False)
     file_path = Column(String, nullable=False)
     
-    extracted_text = Column(Text, nullable=True)
+    # Duże kolumny tekstowe ładowane tylko na żądanie (undefer) - listy i
+    # metadane nigdy ich nie pobierają; długość tekstu trzymana osobno
+    extracted_text = deferred(Column(Text, nullable=True), raiseload=True)
+    extracted_text_length = Column(Integer, nullable=True)
     key_metrics = Column(JSON, nullable=True)
-    summary = Column(Text, nullable=True)
+    summary = deferred(Column(Text, nullable=True), raiseload=True)
     status = Column(String, default="uploaded")
+    # Czasy etapów, rozmiary wejścia i tokeny LLM ingestii (app.monitoring.ingestion)
+    ingestion_trace = deferred(Column(JSON, nullable=True), raiseload=True)
     
     # Relacje
     company = relationship("Company", back_populates="reports")
+    
+    __table_args__ = (
+        Index("ix_reports_company_period", "company_id", "period_ordinal"),
+        Index("ix_reports_company_status_upload", "company_id", "status", "upload_date"),
+        Index("ix_reports_upload_date", "upload_date", "id"),
+    )
+
+
+class ReportMetric(Base):
+    """Tabela wskaźników finansowych - jeden wiersz na metrykę raportu"""
+    __tablename__ = "report_metrics"
+    
+    id = Column(Integer, primary_key=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    period_ordinal = Column(Integer, nullable=True)  # patrz app.services.periods
+    metric_name = Column(String, nullable=False)
+    value = Column(Float, nullable=False)
+    source = Column(String, nullable=False)  # regex / ai / legacy / import
+    
+    __table_args__ = (
+        UniqueConstraint("report_id", "metric_name", name="uq_report_metrics_report_metric"),
+        Index("ix_report_metrics_company_metric_period", "company_id", "metric_name", "period_ordinal"),
+        Index("ix_report_metrics_metric_period", "metric_name", "period_ordinal"),
+    )
+
+
+class IndustryAggregate(Base):
+    """Tabela statystyk branżowych - jeden wiersz na (branża, okres, metryka)"""
+    __tablename__ = "industry_aggregates"
+    
+    id = Column(Integer, primary_key=True)
+    industry = Column(String, nullable=False)  # znormalizowana nazwa (małe litery)
+    period_ordinal = Column(Integer, nullable=False)
+    metric_name = Column(String, nullable=False)
+    company_count = Column(Integer, nullable=False)
+    mean = Column(Float, nullable=False)
+    median = Column(Float, nullable=False)
+    p25 = Column(Float, nullable=False)
+    p75 = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("industry", "period_ordinal", "metric_name", name="uq_industry_aggregates_cell"),
+    )
+
+
+class AppCounter(Base):
+    """Tabela liczników globalnych (firmy, raporty, sesje) dla /stats"""
+    __tablename__ = "app_counters"
+    
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
 
 
 class ChatSession(Base):
@@ -88,11 +220,100 @@ class ChatHistory(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     session = relationship("ChatSession", back_populates="messages")
+    
+    __table_args__ = (
+        Index("ix_chat_history_session_timestamp", "session_id", "timestamp", "id"),
+    )
+
+
+def _backfill_industry_key(conn):
+    """Python normalization - SQLite lower() folds ASCII letters only"""
+    rows = conn.execute(text("SELECT id, industry FROM companies WHERE industry IS NOT NULL")).all()
+    keys = [{"id": company_id, "key": industry_key(industry)} for company_id, industry in rows]
+    if keys:
+        conn.execute(text("UPDATE companies SET industry_key = :key WHERE id = :id"), keys)
+
+
+# Uzupełnienie danych dla kolumn dodanych do istniejących tabel (kolejność ma znaczenie);
+# zapytanie SQL albo funkcja wywoływana z połączeniem
+SCHEMA_BACKFILLS = {
+    ("reports", "extracted_text_length"): (
+        "UPDATE reports SET extracted_text_length = length(extracted_text) "
+        "WHERE extracted_text IS NOT NULL"
+    ),
+    ("reports", "period_ordinal"): (
+        "UPDATE reports SET period_ordinal = CASE "
+        "WHEN report_year IS NULL OR report_year = 0 THEN NULL "
+        "WHEN report_quarter BETWEEN 1 AND 4 THEN report_year * 10 + report_quarter "
+        "WHEN report_type = 'annual' THEN report_year * 10 + 5 "
+        "ELSE report_year * 10 END"
+    ),
+    ("reports", "updated_at"): (
+        "UPDATE reports SET updated_at = upload_date"
+    ),
+    ("companies", "reports_count"): (
+        "UPDATE companies SET reports_count = "
+        "(SELECT count(*) FROM reports WHERE reports.company_id = companies.id)"
+    ),
+    ("companies", "latest_period_ordinal"): (
+        "UPDATE companies SET latest_period_ordinal = "
+        "(SELECT max(period_ordinal) FROM reports WHERE reports.company_id = companies.id)"
+    ),
+    ("companies", "latest_key_metrics"): (
+        "UPDATE companies SET latest_key_metrics = "
+        "(SELECT key_metrics FROM reports WHERE reports.company_id = companies.id "
+        "ORDER BY period_ordinal IS NULL, period_ordinal DESC, upload_date DESC LIMIT 1)"
+    ),
+    ("companies", "last_upload_at"): (
+        "UPDATE companies SET last_upload_at = "
+        "(SELECT max(upload_date) FROM reports WHERE reports.company_id = companies.id)"
+    ),
+    ("companies", "industry_key"): _backfill_industry_key,
+}
+
+
+def _upgrade_schema(conn):
+    """Add columns/indexes missing from an existing database (create_all only creates tables)"""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    added_columns = set()
+    
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        
+        existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+            conn.execute(text(ddl))
+            added_columns.add((table.name, column.name))
+            print(f"✓ Added column {table.name}.{column.name}")
+        
+        existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(conn)
+    
+    # Uzupełnienia mogą odwoływać się do kolumn innych tabel - wykonywane po
+    # wszystkich ALTER-ach, w kolejności deklaracji w SCHEMA_BACKFILLS
+    for key, backfill in SCHEMA_BACKFILLS.items():
+        if key in added_columns:
+            if callable(backfill):
+                backfill(conn)
+            else:
+                conn.execute(text(backfill))
 
 
 async def init_db():
     """Inicjalizacja bazy danych"""
     async with engine.begin() as conn:
+        await conn.run_sync(_upgrade_schema)
         await conn.run_sync(Base.metadata.create_all)
     print("✓ Database initialized with new schema")
 
@@ -1,20 +1,51 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
 from contextlib import asynccontextmanager
 
-from app.config import settings
-from app.database.database import init_db
-from app.api import chat, reports, companies, analytics
+from app.config import settings, ensure_directories
+from app.database.database import init_db, async_session_maker, engine
+from app.services.container import services
+from app.api import chat, reports, companies, analytics, export, imports, profiles
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.middleware.compression import CompressionMiddleware
+from app.monitoring.db import instrument_engine, pool_samples
+from app.monitoring.metrics import registry, cache_samples, event_loop_samples
+from app.monitoring.middleware import (
+    MetricsMiddleware, SQLAccountingMiddleware, DB_QUERIES_HEADER, DB_COMMITS_HEADER, DB_TIME_HEADER
+)
+from app.monitoring.profiling import ProfilingMiddleware, PROFILE_ID_HEADER
+from app.monitoring.watchdog import LoopWatchdog
+from app.monitoring.registry import CONTENT_TYPE
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Initialize database
+    ensure_directories()
     await init_db()
+    async with async_session_maker() as db:
+        backfilled = await services.metrics.backfill(db)
+        await services.stats.ensure_counters(db)
+        industries = await services.industry.backfill(db)
+    if backfilled:
+        print(f"✓ Back-filled {backfilled} report metrics")
+    if industries:
+        print(f"✓ Computed aggregates for {industries} industries")
     print("✓ Database initialized with company-based schema")
     print(f"✓ Upload folder: {settings.upload_folder}")
+    watchdog = None
+    if settings.loop_watchdog_enabled:
+        watchdog = LoopWatchdog(
+            interval=settings.loop_watchdog_interval_ms / 1000,
+            threshold=settings.loop_block_threshold_ms / 1000
+        )
+        watchdog.start()
     yield
     # Shutdown: cleanup if needed
+    if watchdog is not None:
+        watchdog.stop()
     print("Shutting down...")
 
 
@@ -32,13 +63,54 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER, "ETag", "Last-Modified", PROFILE_ID_HEADER,
+        DB_QUERIES_HEADER, DB_COMMITS_HEADER, DB_TIME_HEADER,
+    ],
 )
 
+# Czas zapytań/commitów, log wolnych zapytań i liczniki SQL per żądanie
+instrument_engine(engine, slow_query_ms=settings.sql_slow_query_ms)
+if settings.sql_accounting_enabled:
+    app.add_middleware(SQLAccountingMiddleware, n_plus_one_threshold=settings.sql_n_plus_one_threshold)
+
+# Profilowanie na żądanie - dodane przed kompresją i metrykami, więc nie mierzy ich narzutu
+if settings.profiling_token or settings.profile_all_requests:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=services.profiles,
+        token=settings.profiling_token,
+        profile_all=settings.profile_all_requests,
+        top=settings.profiling_top,
+    )
+
+# Kompresja odpowiedzi (historie czatu, wykresy, eksport) - SSE nigdy
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        content_types=settings.compression_content_types,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
+# Metryki - dodane po kompresji, więc mierzą także czas kompresji odpowiedzi
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    registry.add_collector(lambda: [
+        *cache_samples("chart_cache", services.chart_cache),
+        *pool_samples(engine),
+        *event_loop_samples(),
+    ])
+
 # Include routers
 app.include_router(companies.router)
 app.include_router(reports.router)
 app.include_router(chat.router, prefix="/api/chat") # ADDED PREFIX HERE
 app.include_router(analytics.router)
+app.include_router(export.router)
+app.include_router(imports.router)
+app.include_router(profiles.router)
 
 
 @app.get("/")
@@ -61,6 +133,14 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unhealthy", "version": settings.app_version, "database": str(e)}
+        )
     return {
         "status": "healthy",
         "version": settings.app_version,
@@ -68,29 +148,29 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Metryki w formacie tekstowym Prometheus"""
+    if not settings.metrics_enabled:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/stats")
 async def get_stats():
     """Statystyki systemu"""
-    from app.database.database import async_session_maker, Company, Report, ChatSession
-    from sqlalchemy import select, func
+    from app.services.company_stats_service import (
+        COMPANIES_COUNTER, REPORTS_COUNTER, CHAT_SESSIONS_COUNTER
+    )
     
+    # Jeden odczyt tabeli liczników zamiast trzech pełnych COUNT
     async with async_session_maker() as db:
-        # Liczba firm
-        companies_count = await db.execute(select(func.count(Company.id)))
-        companies = companies_count.scalar()
-        
-        # Liczba raportów
-        reports_count = await db.execute(select(func.count(Report.id)))
-        reports = reports_count.scalar()
-        
-        # Liczba sesji
-        sessions_count = await db.execute(select(func.count(ChatSession.id)))
-        sessions = sessions_count.scalar()
+        counters = await services.stats.get_counters(db)
     
     return {
-        "companies": companies,
-        "reports": reports,
-        "chat_sessions": sessions,
+        "companies": counters.get(COMPANIES_COUNTER, 0),
+        "reports": counters.get(REPORTS_COUNTER, 0),
+        "chat_sessions": counters.get(CHAT_SESSIONS_COUNTER, 0),
         "status": "operational"
     }
 
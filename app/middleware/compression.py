@@ -0,0 +1,184 @@
+import zlib
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # opcjonalna zależność - bez niej tylko gzip
+    brotli = None
+
+# Zawsze bez kompresji: SSE musi wychodzić zdarzenie po zdarzeniu, a formaty
+# binarne (Parquet, PDF, obrazy) są już skompresowane
+NEVER_COMPRESSED = ("text/event-stream",)
+SKIPPED_STATUSES = (204, 206, 304)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """{coding: q} from an Accept-Encoding header ("gzip, br;q=0.8" -> {"gzip": 1.0, "br": 0.8})"""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding] = q
+    return codings
+
+
+class _Encoder:
+    """Streaming gzip/brotli encoder; every chunk is flushed so clients see data immediately"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """Kompresja odpowiedzi gzip / brotli (czysty ASGI, bezpieczna dla strumieni).
+
+    Kompresowane są tylko typy z listy `content_types` o rozmiarze co najmniej
+    `minimum_size`; odpowiedzi strumieniowe (eksport) są kompresowane kawałek
+    po kawałku bez buforowania całości, a text/event-stream nigdy.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = ("application/json",),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        enable_brotli: bool = True
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(t.lower() for t in content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.enable_brotli = enable_brotli and brotli is not None
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Best supported coding accepted by the client; brotli wins ties"""
+        codings = parse_accept_encoding(accept_encoding)
+        wildcard = codings.get("*", 0.0)
+        candidates = [("br", codings.get("br", wildcard))] if self.enable_brotli else []
+        candidates.append(("gzip", codings.get("gzip", wildcard)))
+        encoding, q = max(candidates, key=lambda candidate: candidate[1])
+        return encoding if q > 0 else None
+
+    def compressible(self, headers: Headers, status: int) -> bool:
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return (
+            content_type in self.content_types
+            and content_type not in NEVER_COMPRESSED
+            and status not in SKIPPED_STATUSES
+            and "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await _CompressionResponder(self, encoding, send).run(self.app, scope, receive)
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    """Encoded body is a different representation - a strong validator must not be shared with identity"""
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = "W/" + etag
+
+
+class _CompressionResponder:
+    """Per-request send wrapper: holds http.response.start until the first body chunk"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    async def run(self, app: ASGIApp, scope: Scope, receive: Receive) -> None:
+        await app(scope, receive, self.wrapped_send)
+
+    async def wrapped_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=list(message["headers"]))
+            message["headers"] = headers.raw
+            if self.middleware.compressible(headers, message["status"]):
+                # Treść zależy od Accept-Encoding niezależnie od rozmiaru tej odpowiedzi
+                # i od tego, czy ten klient przyjmuje kompresję
+                headers.add_vary_header("Accept-Encoding")
+                self.start_message = message
+                return
+            if message["status"] == 304 and "content-encoding" not in headers:
+                # 304 niesie te same Vary i walidator co odpowiedź 200, którą potwierdza
+                headers.add_vary_header("Accept-Encoding")
+                if self.encoding is not None:
+                    _weaken_etag(headers)
+            self.passthrough = True
+            await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is not None:
+            data = self.encoder.chunk(body) if more_body else self.encoder.finish(body)
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        # Pierwszy kawałek treści - decyzja o kompresji całej odpowiedzi
+        start = self.start_message
+        headers = MutableHeaders(raw=start["headers"])
+        self.passthrough = True
+        if self.encoding is None or (not more_body and len(body) < self.middleware.minimum_size):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        encoder = _Encoder(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        headers["Content-Encoding"] = self.encoding
+        _weaken_etag(headers)
+        if not more_body:
+            data = encoder.finish(body)
+            headers["Content-Length"] = str(len(data))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": data})
+            return
+
+        del headers["Content-Length"]
+        self.encoder = encoder
+        self.passthrough = False
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": encoder.chunk(body), "more_body": True})
@@ -52,6 +52,9 @@ class CompanyResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     reports_count: int = 0
+    latest_period: Optional[str] = None
+    latest_key_metrics: Optional[dict] = None
+    last_upload_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -97,6 +100,7 @@ class ReportDetail(ReportInfo):
     key_metrics: Optional[dict] = None
     summary: Optional[str] = None
     extracted_text_length: Optional[int] = None
+    ingestion_trace: Optional[dict] = None
 
 
 # ============================================================================
@@ -127,6 +131,54 @@ class ChartDataResponse(BaseModel):
     available_metrics: List[str]
 
 
+class DerivedMetricsResponse(BaseModel):
+    company_id: int
+    company_name: str
+    periods: List[str]
+    series: Dict[str, List[Optional[float]]]
+    summary: Dict[str, Optional[float]]
+    charts: List[Chart]
+
+
+class RankingEntry(BaseModel):
+    rank: int
+    company_id: int
+    company_name: str
+    value: Optional[float] = None
+    period: Optional[str] = None
+
+
+class IndustryAggregateEntry(BaseModel):
+    period: str
+    period_ordinal: int
+    metric_name: str
+    company_count: int
+    mean: float
+    median: float
+    p25: float
+    p75: float
+
+
+class IndustryAggregatesResponse(BaseModel):
+    industry: str
+    aggregates: List[IndustryAggregateEntry]
+
+
+class ImportResponse(BaseModel):
+    rows_read: int
+    values_imported: int
+    companies_created: int
+    reports_created: int
+    errors: List[str] = []
+
+
+class ComparisonResponse(BaseModel):
+    companies: List[Dict[str, Any]]
+    periods: List[str]
+    charts: List[Chart]
+    rankings: Dict[str, List[RankingEntry]]
+
+
 # ============================================================================
 # CHAT SCHEMAS (MODIFIED)
 # ============================================================================
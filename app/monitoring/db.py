@@ -0,0 +1,136 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.monitoring.ingestion import current_trace
+from app.monitoring.metrics import STAGE_LATENCY, SLOW_QUERIES
+
+logger = logging.getLogger(__name__)
+
+_QUERY_START = "metrics_query_start"
+_COMMIT_START = "metrics_commit_start"
+_MAX_LOGGED_PARAMETERS = 500  # znaki
+
+# Próg logowania wolnych zapytań (sekundy) - ustawiany w instrument_engine
+_slow_query_seconds: Optional[float] = None
+
+
+class SQLStats:
+    """Zapytania i commity jednego żądania (zbierane przez zdarzenia SQLAlchemy)"""
+
+    __slots__ = ("queries", "seconds", "commits", "selects")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.commits = 0
+        self.selects: Counter = Counter()
+
+    def repeated_selects(self, threshold: int) -> List[Tuple[str, int]]:
+        """Identical SELECTs issued at least `threshold` times - likely an N+1 loop"""
+        return [(statement, count) for statement, count in self.selects.most_common() if count >= threshold]
+
+
+# Obiekt jest współdzielony przez zadania uruchomione w ramach żądania
+# (kopie kontekstu), więc liczniki trafiają do jednego miejsca
+_request_stats: ContextVar[Optional[SQLStats]] = ContextVar("request_sql_stats", default=None)
+
+
+@contextmanager
+def request_sql_stats() -> Iterator[SQLStats]:
+    """Collect SQL statements and commits issued inside the block"""
+    stats = SQLStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def _format_parameters(parameters, executemany: bool) -> str:
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    text = repr(parameters)
+    return text if len(text) <= _MAX_LOGGED_PARAMETERS else text[:_MAX_LOGGED_PARAMETERS] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_QUERY_START, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_QUERY_START)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    STAGE_LATENCY.observe(elapsed, stage="db_query")
+    trace = current_trace()
+    if trace is not None:
+        trace.record_stage("db_query", elapsed, False)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+        if statement.lstrip()[:6].upper() == "SELECT":
+            stats.selects[statement] += 1
+
+    if _slow_query_seconds is not None and elapsed >= _slow_query_seconds:
+        SLOW_QUERIES.inc()
+        logger.warning(
+            "Slow query (%.1f ms): %s | parameters: %s",
+            elapsed * 1000, " ".join(statement.split()), _format_parameters(parameters, executemany)
+        )
+
+
+def _before_commit(session):
+    session.info[_COMMIT_START] = time.perf_counter()
+
+
+def _after_commit(session):
+    start = session.info.pop(_COMMIT_START, None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.observe(elapsed, stage="db_commit")
+        trace = current_trace()
+        if trace is not None:
+            trace.record_stage("db_commit", elapsed, False)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.commits += 1
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_ms: Optional[float] = None) -> None:
+    """Time every SQL statement (db_query) and ORM commit (db_commit), count them per
+    request and log statements slower than slow_query_ms together with their parameters"""
+    global _slow_query_seconds
+    _slow_query_seconds = slow_query_ms / 1000 if slow_query_ms else None
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    # AsyncSession deleguje do synchronicznej Session - zdarzenia commitu są na niej;
+    # nasłuch jest wspólny dla wszystkich silników, więc rejestrowany tylko raz
+    if not event.contains(Session, "before_commit", _before_commit):
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
+
+
+def pool_samples(engine: AsyncEngine) -> list:
+    """Connection pool occupancy (QueuePool only - SQLite uses pools without counters)"""
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return []
+    return [
+        ("db_pool_size", "gauge", "Configured connection pool size", [("db_pool_size", {}, pool.size())]),
+        ("db_pool_checked_out", "gauge", "Connections currently in use",
+         [("db_pool_checked_out", {}, pool.checkedout())]),
+        ("db_pool_overflow", "gauge", "Connections opened beyond pool size",
+         [("db_pool_overflow", {}, max(pool.overflow(), 0))]),
+    ]
@@ -0,0 +1,130 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# Przybliżenie liczby tokenów, gdy backend LLM nie podaje usage_metadata
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(chars: int) -> int:
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class IngestionTrace:
+    """Przebieg ingestii jednego raportu - zapisywany w Report.ingestion_trace.
+
+    Etapy zbiera metrics.stage() (pdf_parse, regex_extract, pdf_tables,
+    gemini_<wywołanie>) oraz zdarzenia SQL (db_query, db_commit), rozmiary
+    wywołań LLM - GeminiService. report_id ustawia handler po ostatnim
+    commicie; ślad zapisuje dopiero zależność traced_ingestion.
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self.report_id: Optional[int] = None
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.llm: Dict[str, Dict[str, Any]] = {}
+        self.inputs: Dict[str, int] = {}
+
+    def record_stage(self, name: str, seconds: float, failed: bool) -> None:
+        entry = self.stages.setdefault(name, {"ms": 0.0, "calls": 0, "errors": 0})
+        entry["ms"] += seconds * 1000
+        entry["calls"] += 1
+        entry["errors"] += failed
+
+    def record_llm(self, call: str, prompt_chars: int, response_chars: int, usage=None) -> None:
+        """Sizes of one LLM call; token counts from usage metadata when the backend reports them"""
+        prompt_tokens = getattr(usage, "prompt_token_count", None)
+        response_tokens = getattr(usage, "candidates_token_count", None)
+        entry = self.llm.setdefault(call, {
+            "prompt_chars": 0, "response_chars": 0, "prompt_tokens": 0, "response_tokens": 0,
+            "tokens_estimated": False,
+        })
+        entry["prompt_chars"] += prompt_chars
+        entry["response_chars"] += response_chars
+        if prompt_tokens is None or response_tokens is None:
+            prompt_tokens, response_tokens = estimate_tokens(prompt_chars), estimate_tokens(response_chars)
+            entry["tokens_estimated"] = True
+        entry["prompt_tokens"] += prompt_tokens
+        entry["response_tokens"] += response_tokens
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 1),
+            "stages": {
+                name: {**entry, "ms": round(entry["ms"], 1)} for name, entry in self.stages.items()
+            },
+            "llm": self.llm,
+            "inputs": self.inputs,
+        }
+
+
+# Jak w app.monitoring.db - obiekt współdzielony przez kopie kontekstu
+_current_trace: ContextVar[Optional[IngestionTrace]] = ContextVar("ingestion_trace", default=None)
+
+
+@contextmanager
+def ingestion_trace() -> Iterator[IngestionTrace]:
+    """Collect stages and LLM calls of one report ingestion"""
+    trace = IngestionTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace() -> Optional[IngestionTrace]:
+    return _current_trace.get()
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _distribution(values: list) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 1),
+        "p50_ms": round(_percentile(values, 50), 1),
+        "p95_ms": round(_percentile(values, 95), 1),
+        "max_ms": round(values[-1], 1),
+    }
+
+
+def summarize_traces(traces: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-stage latency distribution and LLM volume across stored traces"""
+    totals, stage_ms, errors, llm = [], {}, {}, {}
+    for trace in traces:
+        totals.append(trace.get("total_ms", 0.0))
+        for name, entry in trace.get("stages", {}).items():
+            stage_ms.setdefault(name, []).append(entry["ms"])
+            errors[name] = errors.get(name, 0) + entry.get("errors", 0)
+        for call, entry in trace.get("llm", {}).items():
+            summary = llm.setdefault(call, {"reports": 0, "prompt_tokens": 0, "response_tokens": 0, "prompt_chars": 0})
+            summary["reports"] += 1
+            for key in ("prompt_tokens", "response_tokens", "prompt_chars"):
+                summary[key] += entry.get(key, 0)
+
+    if not totals:
+        return {"reports": 0, "total": None, "stages": {}, "llm": {}}
+    return {
+        "reports": len(totals),
+        "total": _distribution(totals),
+        "stages": {
+            name: {**_distribution(values), "errors": errors[name]}
+            for name, values in sorted(stage_ms.items(), key=lambda item: -sum(item[1]))
+        },
+        "llm": {
+            call: {
+                "reports": s["reports"],
+                "avg_prompt_tokens": round(s["prompt_tokens"] / s["reports"]),
+                "avg_response_tokens": round(s["response_tokens"] / s["reports"]),
+                "avg_prompt_chars": round(s["prompt_chars"] / s["reports"]),
+            }
+            for call, s in llm.items()
+        },
+    }
@@ -0,0 +1,113 @@
+import asyncio
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from app.monitoring.ingestion import current_trace
+from app.monitoring.registry import Registry
+
+registry = Registry()
+
+# Żądania HTTP - etykieta route to szablon ścieżki ("/api/companies/{company_id}"),
+# nie konkretny URL, żeby liczba serii była ograniczona
+REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests being processed")
+
+# Etapy przetwarzania: pdf_parse, pdf_tables, regex_extract, gemini_<wywołanie>, db_query, db_commit
+STAGE_LATENCY = registry.histogram(
+    "stage_duration_seconds", "Duration of processing stages (PDF, regex, LLM, DB)", ("stage",)
+)
+STAGE_ERRORS = registry.counter("stage_errors_total", "Processing stages that raised", ("stage",))
+STAGES_IN_FLIGHT = registry.gauge("stage_in_flight", "Stages currently running (LLM / DB queue depth)", ("stage",))
+
+# Pętla zdarzeń (app.monitoring.watchdog) - location to najgłębsza ramka kodu aplikacji
+LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds", "Delay of the event loop heartbeat behind schedule",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+LOOP_BLOCKS = registry.counter(
+    "event_loop_blocked_total", "Event loop stalls longer than LOOP_BLOCK_THRESHOLD_MS", ("location",)
+)
+
+# SQL per żądanie (app.monitoring.db)
+REQUEST_QUERIES = registry.histogram(
+    "db_queries_per_request", "SQL statements issued by one request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+REQUEST_DB_TIME = registry.histogram(
+    "db_time_per_request_seconds", "Total SQL time of one request", ("route",)
+)
+SLOW_QUERIES = registry.counter("db_slow_queries_total", "SQL statements slower than SQL_SLOW_QUERY_MS")
+N_PLUS_ONE = registry.counter(
+    "db_n_plus_one_total", "Requests repeating an identical SELECT (likely N+1)", ("route",)
+)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as a processing stage (histogram + in-flight gauge + errors)"""
+    STAGES_IN_FLIGHT.inc(stage=name)
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_LATENCY.observe(seconds, stage=name)
+        STAGES_IN_FLIGHT.dec(stage=name)
+        trace = current_trace()
+        if trace is not None:
+            trace.record_stage(name, seconds, failed)
+
+
+def timed_stage(name: str) -> Callable:
+    """Decorator version of stage() for sync and async functions"""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cache_samples(name: str, cache) -> list:
+    """Hit/miss counters, hit ratio and size of a cache exposing hits, misses and len()"""
+    lookups = cache.hits + cache.misses
+    return [
+        (f"{name}_hits_total", "counter", f"{name} lookups served from cache",
+         [(f"{name}_hits_total", {}, cache.hits)]),
+        (f"{name}_misses_total", "counter", f"{name} lookups that missed",
+         [(f"{name}_misses_total", {}, cache.misses)]),
+        (f"{name}_hit_ratio", "gauge", f"{name} hits / lookups since start",
+         [(f"{name}_hit_ratio", {}, cache.hits / lookups if lookups else 0.0)]),
+        (f"{name}_entries", "gauge", f"{name} entries currently held",
+         [(f"{name}_entries", {}, len(cache))]),
+    ]
+
+
+def event_loop_samples() -> list:
+    """Number of pending asyncio tasks (requests, streams, background work)"""
+    try:
+        tasks = len(asyncio.all_tasks())
+    except RuntimeError:  # scrape poza pętlą zdarzeń
+        return []
+    return [("asyncio_tasks", "gauge", "Pending asyncio tasks", [("asyncio_tasks", {}, tasks)])]
@@ -0,0 +1,107 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.monitoring.db import SQLStats, request_sql_stats
+from app.monitoring.metrics import (
+    REQUESTS, REQUEST_LATENCY, REQUESTS_IN_FLIGHT, REQUEST_QUERIES, REQUEST_DB_TIME, N_PLUS_ONE
+)
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "unmatched"
+DB_QUERIES_HEADER = "X-DB-Queries"
+DB_TIME_HEADER = "X-DB-Time-Ms"
+DB_COMMITS_HEADER = "X-DB-Commits"
+
+
+def route_label(scope: Scope) -> str:
+    """Path template of the matched route - the router stores it in the scope"""
+    # Trasy dołączone przez include_router(prefix=...) trzymają pełną ścieżkę
+    # (z prefiksem, np. /api/chat) w kontekście FastAPI, a nie w scope["route"]
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Licznik, histogram opóźnień i liczba żądań w toku per szablon ścieżki.
+
+    Czas liczony do końca odpowiedzi (także strumieniowego eksportu danych).
+    """
+
+    def __init__(self, app: ASGIApp, excluded_paths=("/metrics",)):
+        self.app = app
+        self.excluded_paths = tuple(excluded_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            method, route = scope["method"], route_label(scope)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, method=method, route=route)
+            REQUESTS.inc(method=method, route=route, status=str(status_code))
+
+
+class SQLAccountingMiddleware:
+    """Liczba zapytań SQL, commitów i łączny czas bazy per żądanie.
+
+    Nagłówki X-DB-Queries / X-DB-Commits / X-DB-Time-Ms opisują stan w chwili wysłania
+    nagłówków odpowiedzi (dla strumieni - bez zapytań wykonanych później);
+    metryki i wykrywanie N+1 obejmują całe żądanie.
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_sql_stats() as stats:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers[DB_QUERIES_HEADER] = str(stats.queries)
+                    headers[DB_COMMITS_HEADER] = str(stats.commits)
+                    headers[DB_TIME_HEADER] = f"{stats.seconds * 1000:.1f}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self._report(scope, stats)
+
+    def _report(self, scope: Scope, stats: SQLStats) -> None:
+        route = route_label(scope)
+        REQUEST_QUERIES.observe(stats.queries, route=route)
+        REQUEST_DB_TIME.observe(stats.seconds, route=route)
+        if not self.n_plus_one_threshold:
+            return
+        repeated = stats.repeated_selects(self.n_plus_one_threshold)
+        if repeated:
+            N_PLUS_ONE.inc(route=route)
+        for statement, count in repeated:
+            logger.warning(
+                "Possible N+1 in %s %s: identical SELECT issued %d times: %s",
+                scope["method"], route, count, " ".join(statement.split())[:300]
+            )
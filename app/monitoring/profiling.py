@@ -0,0 +1,207 @@
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import re
+import sysconfig
+import time
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{16}$")
+# Wbudowane funkcje selektora - czas w nich to pętla zdarzeń czekająca na I/O
+# (zapytania aiosqlite/asyncpg, odczyt uploadu), a nie obliczenia
+_SELECTOR_CALL = re.compile(r"^<method '(poll|select|control)' of 'select\.")
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+def _function_label(func: tuple) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        return name
+    if "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[-1]
+    elif filename.startswith(_STDLIB):
+        filename = filename[len(_STDLIB):]
+    elif filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    return f"{filename}:{lineno}({name})"
+
+
+def summarize(stats: pstats.Stats, top: int) -> dict:
+    """Top functions by own and cumulative time + time spent waiting in the selector"""
+    rows, awaiting = [], 0.0
+    for func, (_, calls, own, cumulative, _) in stats.stats.items():
+        if func[0] == "~" and _SELECTOR_CALL.match(func[2]):
+            awaiting += own
+            continue
+        rows.append({
+            "function": _function_label(func),
+            "calls": calls,
+            "own_seconds": round(own, 6),
+            "cumulative_seconds": round(cumulative, 6),
+        })
+    return {
+        "awaiting_seconds": awaiting,
+        "hotspots": sorted(rows, key=lambda row: row["own_seconds"], reverse=True)[:top],
+        "cumulative": sorted(rows, key=lambda row: row["cumulative_seconds"], reverse=True)[:top],
+    }
+
+
+class ProfileStore:
+    """Profile żądań na dysku: <id>.prof (pstats / snakeviz) + <id>.json (podsumowanie).
+
+    Metody są synchroniczne - z kodu async wywoływane przez run_in_threadpool.
+    """
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex[:16]
+
+    def _path(self, profile_id: str, extension: str) -> Optional[str]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def save(self, profile_id: str, profiler: cProfile.Profile, summary: dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(self._path(profile_id, "prof"))
+        with open(self._path(profile_id, "json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False)
+        self._prune()
+
+    def _prune(self) -> None:
+        summaries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True,
+        )
+        for entry in summaries[self.max_profiles:]:
+            profile_id = entry.name[:-len(".json")]
+            for extension in ("json", "prof"):
+                try:
+                    os.remove(self._path(profile_id, extension))
+                except OSError:
+                    pass
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        path = self._path(profile_id, "json")
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def raw_path(self, profile_id: str) -> Optional[str]:
+        path = self._path(profile_id, "prof")
+        return path if path is not None and os.path.exists(path) else None
+
+    def list(self) -> List[dict]:
+        """Summaries without the hotspot tables, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                summary = self.get(entry.name[:-len(".json")])
+                if summary:
+                    profiles.append({k: v for k, v in summary.items() if k not in ("hotspots", "cumulative")})
+        return sorted(profiles, key=lambda summary: summary["created_at"], reverse=True)
+
+
+def token_matches(token: Optional[str], candidate: Optional[str]) -> bool:
+    return bool(token) and candidate is not None and hmac.compare_digest(token, candidate)
+
+
+class ProfilingMiddleware:
+    """cProfile pojedynczego żądania - na żądanie (nagłówek X-Profile-Token) lub dla wszystkich.
+
+    Profiler działa w wątku pętli zdarzeń, więc czas, w którym żądanie czeka
+    (await), spędza ona w selektorze - stąd podział na:
+      awaiting  - pętla czeka na I/O (baza, sieć),
+      computing - CPU wątku pętli (parsowanie PDF, regex, serializacja),
+      blocked   - reszta czasu: synchroniczne I/O w wątku pętli (np. wywołania Gemini).
+    Naraz profilowane jest jedno żądanie; w tym czasie profil obejmuje też
+    inne współbieżne żądania obsługiwane przez tę samą pętlę.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        token: Optional[str] = None,
+        profile_all: bool = False,
+        top: int = 25,
+        excluded_prefixes=("/api/profiles", "/metrics"),
+    ):
+        self.app = app
+        self.store = store
+        self.token = token
+        self.profile_all = profile_all
+        self.top = top
+        self.excluded_prefixes = tuple(excluded_prefixes)
+        self._active = False
+
+    def _requested(self, scope: Scope) -> bool:
+        if scope["path"].startswith(self.excluded_prefixes):
+            return False
+        return self.profile_all or token_matches(self.token, Headers(scope=scope).get(PROFILE_TOKEN_HEADER))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._active or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profile_id = self.store.new_id()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile_id
+            await send(message)
+
+        profiler = cProfile.Profile()
+        wall, cpu, process_cpu = time.perf_counter(), time.thread_time(), time.process_time()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            process_cpu = time.process_time() - process_cpu
+            self._active = False
+
+            stats = summarize(pstats.Stats(profiler), self.top)
+            awaiting = stats.pop("awaiting_seconds")
+            summary = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status_code,
+                "created_at": datetime.utcnow().isoformat(),
+                "wall_seconds": round(wall, 6),
+                "process_cpu_seconds": round(process_cpu, 6),  # z wątkami roboczymi (np. aiosqlite)
+                "awaiting_seconds": round(awaiting, 6),
+                "computing_seconds": round(cpu, 6),
+                "blocked_seconds": round(max(wall - awaiting - cpu, 0.0), 6),
+                **stats,
+            }
+            # Zapis i czyszczenie katalogu poza pętlą zdarzeń
+            await run_in_threadpool(self.store.save, profile_id, profiler, summary)
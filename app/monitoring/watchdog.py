@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.monitoring.metrics import LOOP_LAG, LOOP_BLOCKS
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_PROJECT_DIR = os.path.dirname(_APP_DIR.rstrip(os.sep)) + os.sep
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+# Warstwy opakowujące każde żądanie - nigdy nie są przyczyną blokady
+_INSTRUMENTATION = (_APP_DIR + "monitoring" + os.sep, _APP_DIR + "middleware" + os.sep)
+
+
+def _is_library(filename: str) -> bool:
+    return (
+        filename.startswith(_STDLIB) or "site-packages" in filename or filename.startswith("<frozen")
+        or filename.startswith(_INSTRUMENTATION)
+    )
+
+
+def blocking_location(frame) -> str:
+    """Innermost frame of our own code in a stack (falls back to the innermost frame)"""
+    innermost = frame
+    while frame is not None and _is_library(frame.f_code.co_filename):
+        frame = frame.f_back
+    frame = frame or innermost
+    filename = frame.f_code.co_filename
+    if filename.startswith(_PROJECT_DIR):
+        filename = filename[len(_PROJECT_DIR):]
+    return f"{filename}:{frame.f_lineno}({frame.f_code.co_name})"
+
+
+class LoopWatchdog:
+    """Wykrywanie blokowania pętli zdarzeń.
+
+    Pętla co `interval` sekund zapisuje "puls" (call_later); osobny wątek
+    sprawdza, kiedy był ostatni. Jeśli pętla nie odpowiada dłużej niż
+    `threshold`, wątek zrzuca stos wątku pętli (sys._current_frames) - czyli
+    dokładnie ten synchroniczny kod, który ją w tej chwili blokuje (parsowanie
+    PDF, wywołanie Gemini, zapis pliku) - i zapisuje go w logu oraz metrykach.
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.25):
+        self.interval = interval
+        self.threshold = threshold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_beat = 0.0
+        self._expected = 0.0
+        self._reported_beat = 0.0
+
+    def start(self) -> None:
+        """Start watching the running event loop (call from inside it)"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._last_beat = time.monotonic()
+        self._expected = self._last_beat + self.interval
+        self._handle = self._loop.call_later(self.interval, self._beat)
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        lag = max(now - self._expected, 0.0)
+        LOOP_LAG.observe(lag)
+        if self._reported_beat == self._last_beat:
+            # Koniec zgłoszonej blokady - podaj jej pełny czas
+            logger.warning("Event loop unblocked after %.0f ms", (now - self._last_beat) * 1000)
+        self._last_beat = now
+        self._expected = now + self.interval
+        if not self._stop.is_set():
+            self._handle = self._loop.call_later(self.interval, self._beat)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            last_beat = self._last_beat
+            stalled = time.monotonic() - last_beat - self.interval
+            if stalled < self.threshold or self._reported_beat == last_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None or self._last_beat != last_beat:  # pętla zdążyła ruszyć
+                continue
+            self._reported_beat = last_beat
+            location = blocking_location(frame)
+            LOOP_BLOCKS.inc(location=location)
+            logger.warning(
+                "Event loop blocked for over %.0f ms at %s\n%s",
+                stalled * 1000, location, "".join(traceback.format_stack(frame))
+            )
@@ -0,0 +1,51 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+class ChartCache:
+    """LRU cache gotowych odpowiedzi wykresów (bajty JSON + silny ETag).
+
+    Klucz zaczyna się od company_id i zawiera wersję zbioru raportów firmy,
+    więc każda zmiana raportów/metryk automatycznie trafia w nowy wpis.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes) -> Tuple[bytes, str]:
+        entry = (body, self.make_etag(body))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, company_id: int) -> None:
+        """Drop all cached payloads of a company"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == company_id]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,52 +1,49 @@
 from typing import List, Dict, Any, Optional
-from app.database.database import Report
 from app.models.schemas import Chart, ChartData, ChartDataset
+from app.services.periods import period_label
 
 class ChartDataService:
     def __init__(self):
         pass
 
-    def _sort_reports(self, reports: List[Report]) -> List[Report]:
-        """Sort reports chronologically by year and quarter"""
-        def get_sort_key(report):
-            year = report.report_year or 0
-            quarter = report.report_quarter or 0
-            if not quarter and report.report_type == 'annual':
-                quarter = 4
-            return (year, quarter)
-        
-        return sorted(reports, key=get_sort_key)
+    def collect_series(self, points: List[Any]) -> tuple:
+        """Group (period_ordinal, metric_name, value) points into a period grid.
 
-    def _extract_metric_series(self, reports: List[Report], metric_key: str) -> Dict[str, Any]:
-        """Extract a specific metric series from sorted reports"""
-        labels = []
-        data = []
-        
-        for report in reports:
-            if not report.key_metrics:
-                continue
-                
-            val = report.key_metrics.get(metric_key)
-            if val is not None:
-                # Create label like "Q1 2024" or "2024"
-                if report.report_quarter:
-                    label = f"Q{report.report_quarter} {report.report_year}"
-                else:
-                    label = f"{report.report_year}"
-                
-                labels.append(label)
-                data.append(val)
-        
-        return {"labels": labels, "data": data}
+        Points are expected in chronological order; for duplicated periods
+        the value of the later report wins.
+        """
+        periods = []
+        series: Dict[str, Dict[int, float]] = {}
+        for ordinal, metric_name, value in points:
+            if not periods or periods[-1] != ordinal:
+                periods.append(ordinal)
+            series.setdefault(metric_name, {})[ordinal] = value
+        return periods, series
 
-    def prepare_chart_data(self, reports: List[Report], metric_keys: List[str], chart_type: str = "line", title: str = "") -> Optional[Chart]:
-        """Prepare chart data structure for frontend"""
-        if not reports:
+    def get_timeframe(self, points: List[Any]) -> Dict[str, str]:
+        """First and last period covered by the points"""
+        if not points:
+            return {"from": "-", "to": "-"}
+        return {"from": period_label(points[0][0]), "to": period_label(points[-1][0])}
+
+    def prepare_chart_data(self, points: List[Any], metric_keys: List[str], chart_type: str = "line", title: str = "") -> Optional[Chart]:
+        """Prepare chart data structure for frontend from chronological metric points"""
+        periods, series = self.collect_series(points)
+        return self.chart_from_series(periods, series, metric_keys, chart_type, title)
+
+    def chart_from_series(self, periods: List[int], series: Dict[str, Dict[int, float]], metric_keys: List[str], chart_type: str = "line", title: str = "", dataset_labels: Optional[Dict[str, str]] = None, trim_empty: bool = True) -> Optional[Chart]:
+        """Build a chart from series grouped once by collect_series (reused for several charts).
+
+        Missing points are null (a gap in the chart), never 0. dataset_labels
+        overrides dataset names (e.g. company names in peer comparison);
+        trim_empty=False keeps periods without data for any of the metrics.
+        """
+        with_data = [p for p in periods if any(p in series.get(key, {}) for key in metric_keys)]
+        if not with_data:
             return None
-            
-        sorted_reports = self._sort_reports(reports)
+        if trim_empty:
+            periods = with_data
 
-        chart_labels = []
         datasets = []
 
         colors = [
@@ -56,19 +53,11 @@ class ChartDataService:
             {"border": "rgb(255, 206, 86)", "bg": "rgba(255, 206, 86, 0.2)"},
         ]
 
-
-        for report in sorted_reports:
-            if report.report_quarter:
-                label = f"Q{report.report_quarter} {report.report_year}"
-            else:
-                label = f"{report.report_year}"
-            chart_labels.append(label)
+        chart_labels = [period_label(ordinal) for ordinal in periods]
 
         for idx, key in enumerate(metric_keys):
-            data_points = []
-            for report in sorted_reports:
-                val = report.key_metrics.get(key) if report.key_metrics else None
-                data_points.append(val if val is not None else 0) # Use 0 or None for missing? Recharts handles null ok usually.
+            values = series.get(key, {})
+            data_points = [values.get(ordinal) for ordinal in periods]
             
             color = colors[idx % len(colors)]
             
@@ -77,6 +66,14 @@ class ChartDataService:
             if key == "revenue": readable_label = "Przychody"
             elif key == "net_income": readable_label = "Zysk Netto"
             elif key == "total_assets": readable_label = "Aktywa Razem"
+            elif key == "net_margin": readable_label = "Marża Netto"
+            elif key == "operating_margin": readable_label = "Marża Operacyjna"
+            elif key == "revenue_ttm": readable_label = "Przychody (12M)"
+            elif key == "net_income_ttm": readable_label = "Zysk Netto (12M)"
+            elif key == "revenue_yoy": readable_label = "Przychody r/r"
+            elif key == "net_income_yoy": readable_label = "Zysk Netto r/r"
+            if dataset_labels and key in dataset_labels:
+                readable_label = dataset_labels[key]
             
             datasets.append(ChartDataset(
                 label=readable_label,
@@ -95,10 +92,6 @@ class ChartDataService:
             )
         )
 
-    def get_available_metrics(self, reports: List[Report]) -> List[str]:
-        """Scan reports to see which metrics are available"""
-        metrics = set()
-        for report in reports:
-            if report.key_metrics:
-                metrics.update(report.key_metrics.keys())
-        return list(metrics)
+    def get_available_metrics(self, points: List[Any]) -> List[str]:
+        """Metrics present in the given points"""
+        return sorted({p[1] for p in points})
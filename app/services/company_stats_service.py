@@ -0,0 +1,97 @@
+from typing import Dict
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import AppCounter, Company, Report, ChatSession
+
+# Nazwy liczników w tabeli app_counters
+COMPANIES_COUNTER = "companies"
+REPORTS_COUNTER = "reports"
+CHAT_SESSIONS_COUNTER = "chat_sessions"
+# Wersja listy firm (ETag GET /api/companies/) - rośnie przy każdej zmianie
+# kolumn z COMPANY_COLUMNS: utworzenie, edycja, usunięcie, odświeżenie migawki
+COMPANIES_VERSION_COUNTER = "companies_version"
+
+
+class CompanyStatsService:
+    """Zdenormalizowane liczniki i migawka najnowszego raportu firmy"""
+
+    def __init__(self):
+        pass
+
+    async def refresh_company(self, db: AsyncSession, company_id: int) -> None:
+        """Recompute reports count, latest period/metrics and last upload of a company and
+        bump its reports_version (no commit)"""
+        await db.flush()
+
+        aggregates = await db.execute(
+            select(func.count(Report.id), func.max(Report.upload_date))
+            .where(Report.company_id == company_id)
+        )
+        reports_count, last_upload_at = aggregates.one()
+
+        latest = await db.execute(
+            select(Report.period_ordinal, Report.key_metrics)
+            .where(Report.company_id == company_id)
+            .order_by(Report.period_ordinal.desc().nulls_last(), Report.upload_date.desc())
+            .limit(1)
+        )
+        latest_row = latest.first()
+
+        await db.execute(
+            update(Company)
+            .where(Company.id == company_id)
+            .values(
+                reports_count=reports_count,
+                last_upload_at=last_upload_at,
+                latest_period_ordinal=latest_row[0] if latest_row else None,
+                latest_key_metrics=latest_row[1] if latest_row else None,
+                reports_version=Company.reports_version + 1,
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+        await self.bump(db, COMPANIES_VERSION_COUNTER)
+
+    async def touch_company(self, db: AsyncSession, company_id: int) -> None:
+        """Bump reports_version after an in-place report change (status, summary) - no commit"""
+        await db.execute(
+            update(Company)
+            .where(Company.id == company_id)
+            .values(reports_version=Company.reports_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        # onupdate zmienia też updated_at, widoczne na liście firm
+        await self.companies_changed(db)
+
+    async def bump(self, db: AsyncSession, name: str, delta: int = 1) -> None:
+        """Atomically change a global counter (no commit)"""
+        await db.execute(
+            update(AppCounter)
+            .where(AppCounter.name == name)
+            .values(value=AppCounter.value + delta)
+        )
+
+    async def companies_changed(self, db: AsyncSession, delta: int = 0) -> None:
+        """Bump the company list version and, for created/deleted companies, the companies counter (no commit)"""
+        if delta:
+            await self.bump(db, COMPANIES_COUNTER, delta)
+        await self.bump(db, COMPANIES_VERSION_COUNTER)
+
+    async def get_counters(self, db: AsyncSession) -> Dict[str, int]:
+        result = await db.execute(select(AppCounter.name, AppCounter.value))
+        return dict(result.all())
+
+    async def ensure_counters(self, db: AsyncSession) -> None:
+        """Create missing counters from a one-off COUNT (first start on an existing database)"""
+        existing = await self.get_counters(db)
+        sources = {
+            COMPANIES_COUNTER: Company.id,
+            REPORTS_COUNTER: Report.id,
+            CHAT_SESSIONS_COUNTER: ChatSession.id,
+            COMPANIES_VERSION_COUNTER: None,
+        }
+        for name, column in sources.items():
+            if name not in existing:
+                count = await db.scalar(select(func.count(column))) if column is not None else 0
+                db.add(AppCounter(name=name, value=count or 0))
+        await db.commit()
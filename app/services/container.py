@@ -0,0 +1,81 @@
+from functools import cached_property
+
+from app.config import settings
+from app.monitoring.profiling import ProfileStore
+from app.services.chart_cache import ChartCache
+from app.services.chart_data_service import ChartDataService
+from app.services.company_stats_service import CompanyStatsService
+from app.services.export_service import ExportService
+from app.services.gemini_service import GeminiService
+from app.services.import_service import ImportService
+from app.services.industry_service import IndustryAggregatesService
+from app.services.intent_service import IntentService
+from app.services.metrics_service import MetricsService
+from app.services.pdf_processor import PDFProcessor
+from app.services.timeseries_service import TimeSeriesService
+
+
+class ServiceContainer:
+    """Jeden zestaw serwisów na proces, każdy tworzony przy pierwszym użyciu.
+
+    Endpointy dostają kontener przez Depends(get_services) - w testach można
+    go podmienić przez app.dependency_overrides.
+    """
+
+    @cached_property
+    def gemini(self) -> GeminiService:
+        return GeminiService()
+
+    @cached_property
+    def pdf_processor(self) -> PDFProcessor:
+        return PDFProcessor()
+
+    @cached_property
+    def metrics(self) -> MetricsService:
+        return MetricsService()
+
+    @cached_property
+    def stats(self) -> CompanyStatsService:
+        return CompanyStatsService()
+
+    @cached_property
+    def industry(self) -> IndustryAggregatesService:
+        return IndustryAggregatesService()
+
+    @cached_property
+    def intent(self) -> IntentService:
+        return IntentService()
+
+    @cached_property
+    def timeseries(self) -> TimeSeriesService:
+        return TimeSeriesService()
+
+    @cached_property
+    def charts(self) -> ChartDataService:
+        return ChartDataService()
+
+    @cached_property
+    def chart_cache(self) -> ChartCache:
+        return ChartCache(settings.chart_cache_entries)
+
+    @cached_property
+    def exports(self) -> ExportService:
+        return ExportService(settings.export_batch_size)
+
+    @cached_property
+    def imports(self) -> ImportService:
+        return ImportService(settings.import_batch_size)
+
+    @cached_property
+    def profiles(self) -> ProfileStore:
+        return ProfileStore(settings.profiling_dir, settings.profiling_max_profiles)
+
+
+services = ServiceContainer()
+
+
+async def get_services() -> ServiceContainer:
+    """FastAPI dependency - the process-wide service container"""
+    # async def - zależność def FastAPI wywołuje w puli wątków (przeskok wątku
+    # na każde żądanie, a cached_property mogłoby zbudować serwis dwa razy)
+    return services
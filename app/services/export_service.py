@@ -0,0 +1,234 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import Company, Report, ReportMetric
+from app.services.periods import period_label
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# (kolumna, typ) - typ wyznacza schemat Parquet i serializację JSON w CSV
+METRIC_COLUMNS = [
+    ("report_id", "int"),
+    ("company_id", "int"),
+    ("company_name", "str"),
+    ("period", "str"),
+    ("period_ordinal", "int"),
+    ("metric_name", "str"),
+    ("value", "float"),
+    ("source", "str"),
+]
+REPORT_COLUMNS = [
+    ("id", "int"),
+    ("company_id", "int"),
+    ("company_name", "str"),
+    ("filename", "str"),
+    ("report_type", "str"),
+    ("report_period", "str"),
+    ("report_year", "int"),
+    ("report_quarter", "int"),
+    ("period_ordinal", "int"),
+    ("upload_date", "datetime"),
+    ("file_size", "int"),
+    ("status", "str"),
+    ("extracted_text_length", "int"),
+    ("key_metrics", "json"),
+]
+TEXT_COLUMN = ("extracted_text", "str")
+
+
+class ExportUnavailable(Exception):
+    """Requested export format needs an optional dependency that is not installed"""
+
+
+class _DrainingSink:
+    """Write-only file object handing written bytes out between row groups.
+
+    Keeps its own position so that Parquet footer offsets stay correct
+    while the buffer is emptied after every batch.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ExportService:
+    """Strumieniowy eksport metryk i metadanych raportów (CSV / NDJSON / Parquet).
+
+    Wiersze są czytane kursorem po stronie serwera w paczkach `batch_size`
+    i serializowane paczka po paczce - pamięć nie zależy od rozmiaru bazy.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+
+    def columns(self, dataset: str, include_text: bool = False) -> List[Tuple[str, str]]:
+        if dataset == "metrics":
+            return METRIC_COLUMNS
+        return REPORT_COLUMNS + ([TEXT_COLUMN] if include_text else [])
+
+    def _query(self, dataset: str, company_id: Optional[int], include_text: bool):
+        if dataset == "metrics":
+            query = (
+                select(
+                    ReportMetric.report_id, ReportMetric.company_id, Company.name, ReportMetric.period_ordinal,
+                    ReportMetric.metric_name, ReportMetric.value, ReportMetric.source
+                )
+                .join(Company, Company.id == ReportMetric.company_id)
+                .order_by(ReportMetric.id)
+            )
+            if company_id is not None:
+                query = query.where(ReportMetric.company_id == company_id)
+            return query
+
+        columns = [
+            Report.id, Report.company_id, Company.name, Report.original_filename, Report.report_type,
+            Report.report_period, Report.report_year, Report.report_quarter, Report.period_ordinal,
+            Report.upload_date, Report.file_size, Report.status, Report.extracted_text_length, Report.key_metrics
+        ]
+        if include_text:
+            columns.append(Report.extracted_text)
+        query = select(*columns).join(Company, Company.id == Report.company_id).order_by(Report.id)
+        if company_id is not None:
+            query = query.where(Report.company_id == company_id)
+        return query
+
+    async def iter_batches(
+        self,
+        db: AsyncSession,
+        dataset: str,
+        company_id: Optional[int] = None,
+        include_text: bool = False
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield lists of row dicts (at most batch_size each) from a server-side cursor"""
+        names = [name for name, _ in self.columns(dataset, include_text)]
+        query = self._query(dataset, company_id, include_text).execution_options(yield_per=self.batch_size)
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            batch = []
+            for row in partition:
+                if dataset == "metrics":
+                    report_id, cid, name, ordinal, metric_name, value, source = row
+                    values = (report_id, cid, name, period_label(ordinal) if ordinal else None,
+                              ordinal, metric_name, value, source)
+                else:
+                    values = tuple(row)
+                batch.append(dict(zip(names, values)))
+            yield batch
+
+    async def stream(
+        self,
+        db: AsyncSession,
+        dataset: str,
+        export_format: str,
+        company_id: Optional[int] = None,
+        include_text: bool = False
+    ) -> AsyncIterator[bytes]:
+        """Encoded export chunks, one per database batch"""
+        columns = self.columns(dataset, include_text)
+        batches = self.iter_batches(db, dataset, company_id, include_text)
+        if export_format == "csv":
+            encoder = self._csv(columns, batches)
+        elif export_format == "ndjson":
+            encoder = self._ndjson(batches)
+        elif export_format == "parquet":
+            encoder = self._parquet(columns, batches)
+        else:
+            raise ValueError(f"Unknown export format: {export_format}")
+        async for chunk in encoder:
+            yield chunk
+
+    @staticmethod
+    def _plain(value: Any, kind: str) -> Any:
+        if value is None:
+            return None
+        if kind == "json":
+            return json.dumps(value, ensure_ascii=False)
+        if kind == "datetime" and isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    async def _csv(self, columns, batches) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([name for name, _ in columns])
+        async for batch in batches:
+            for row in batch:
+                writer.writerow([self._plain(row[name], kind) for name, kind in columns])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _json_default(value: Any) -> str:
+        return value.isoformat() if isinstance(value, datetime) else str(value)
+
+    async def _ndjson(self, batches) -> AsyncIterator[bytes]:
+        async for batch in batches:
+            lines = [json.dumps(row, ensure_ascii=False, default=self._json_default) for row in batch]
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    @staticmethod
+    def parquet_available() -> bool:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    async def _parquet(self, columns, batches) -> AsyncIterator[bytes]:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportUnavailable("Parquet export requires the optional 'pyarrow' package")
+
+        types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(),
+                 "json": pa.string(), "datetime": pa.timestamp("us")}
+        schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        sink = _DrainingSink()
+        writer = pq.ParquetWriter(sink, schema)
+        try:
+            async for batch in batches:
+                data = {
+                    name: [row[name] if kind == "datetime" else self._plain(row[name], kind) for row in batch]
+                    for name, kind in columns
+                }
+                writer.write_table(pa.Table.from_pydict(data, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
@@ -1,15 +1,17 @@
-import google.generativeai as genai
 from typing import List, Dict, Optional
 import json
 import re
 from app.config import settings
+from app.monitoring.ingestion import current_trace
+from app.monitoring.metrics import stage
+from app.services.llm_stub import StubLLM
 from app.models.schemas import ChatMessage, MessageRole
 
 
 class GeminiService:
     def __init__(self):
-        genai.configure(api_key=settings.gemini_api_key)
-        self.model = genai.GenerativeModel(settings.gemini_model)
+        self._model = None
+        self._stub = None
         
         self.system_prompt = """Jesteś asystentem AI specjalizującym się w analizie raportów finansowych polskich spółek giełdowych.
 
@@ -56,11 +58,42 @@ Styl odpowiedzi:
 - Używaj danych z wielu okresów do analizy trendów
 """
     
+    @property
+    def model(self):
+        """Gemini model created on first use - google.generativeai is a slow import"""
+        if self._model is None:
+            if not settings.gemini_api_key:
+                raise RuntimeError("GEMINI_API_KEY is not set")
+            import google.generativeai as genai
+            genai.configure(api_key=settings.gemini_api_key)
+            self._model = genai.GenerativeModel(settings.gemini_model)
+        return self._model
+    
+    @property
+    def stub(self) -> StubLLM:
+        """Deterministic offline backend used when LLM_BACKEND=stub"""
+        if self._stub is None:
+            self._stub = StubLLM(latency=settings.llm_stub_latency_ms / 1000)
+        return self._stub
+    
+    def _generate(self, call: str, prompt: str):
+        """generate_content timed as the gemini_<call> stage and recorded in the ingestion trace"""
+        with stage(f"gemini_{call}"):
+            if settings.llm_backend == "stub":
+                response = self.stub.generate(call, prompt)
+            else:
+                response = self.model.generate_content(prompt)
+        trace = current_trace()
+        if trace is not None:
+            trace.record_llm(call, len(prompt), len(response.text), getattr(response, "usage_metadata", None))
+        return response
+    
     def _prepare_context(
         self, 
         company_name: str,
         all_reports_text: List[Dict[str, str]], 
-        chat_history: List[ChatMessage]
+        chat_history: List[ChatMessage],
+        industry_context: Optional[str] = None
     ) -> str:
         """Przygotuj kontekst z WSZYSTKICH raportów firmy"""
         
@@ -79,6 +112,12 @@ Styl odpowiedzi:
                 context_parts.append(text[:8000])  # Limit na raport
                 context_parts.append("### KONIEC RAPORTU ###\n")
         
+        # Statystyki branży do porównań z konkurencją
+        if industry_context:
+            context_parts.append("\n--- TŁO BRANŻOWE ---")
+            context_parts.append(industry_context)
+            context_parts.append("--- KONIEC TŁA BRANŻOWEGO ---\n")
+        
         # Dodaj historię konwersacji
         if chat_history:
             context_parts.append("\n--- HISTORIA KONWERSACJI ---")
@@ -94,7 +133,8 @@ Styl odpowiedzi:
         user_message: str,
         company_name: str,
         all_reports_text: List[Dict[str, str]] = None,
-        chat_history: List[ChatMessage] = None
+        chat_history: List[ChatMessage] = None,
+        industry_context: Optional[str] = None
     ) -> Dict[str, any]:
         """Generuj odpowiedź na podstawie WSZYSTKICH raportów firmy"""
         
@@ -104,10 +144,10 @@ Styl odpowiedzi:
             if all_reports_text is None:
                 all_reports_text = []
             
-            context = self._prepare_context(company_name, all_reports_text, chat_history)
+            context = self._prepare_context(company_name, all_reports_text, chat_history, industry_context)
             full_prompt = f"{context}\n\nUżytkownik: {user_message}\n\nAsystent:"
             
-            response = self.model.generate_content(full_prompt)
+            response = self._generate("response", full_prompt)
             response_text = response.text
             
             # Extract chart config if present
@@ -126,7 +166,7 @@ Styl odpowiedzi:
                 "success": True,
                 "response": response_text,
                 "chart_config": chart_config,
-                "suggestions": self._generate_suggestions(user_message, len(all_reports_text))
+                "suggestions": self.generate_suggestions(user_message, len(all_reports_text))
             }
             
         except Exception as e:
@@ -136,7 +176,7 @@ Styl odpowiedzi:
                 "suggestions": []
             }
     
-    def _generate_suggestions(self, last_question: str, reports_count: int) -> List[str]:
+    def generate_suggestions(self, last_question: str, reports_count: int) -> List[str]:
         """Generuj sugestie pytań uwzględniając dostępność wielu raportów"""
         
         # Jeśli jest więcej niż 1 raport, sugeruj analizy trendów
@@ -199,7 +239,7 @@ RAPORT:
 
 PODSUMOWANIE:"""
             
-            response = self.model.generate_content(prompt)
+            response = self._generate("summary", prompt)
             return response.text
             
         except Exception as e:
@@ -235,7 +275,7 @@ Podaj:
 
 ANALIZA TRENDÓW:"""
             
-            response = self.model.generate_content(prompt)
+            response = self._generate("trends", prompt)
             
             return {
                 "success": True,
@@ -269,7 +309,7 @@ ANALIZA TRENDÓW:"""
             }}
             """
             
-            response = self.model.generate_content(prompt)
+            response = self._generate("company_info", prompt)
             
             # Clean response to ensure valid JSON
             json_str = response.text.strip()
@@ -311,7 +351,7 @@ ANALIZA TRENDÓW:"""
             }}
             """
             
-            response = self.model.generate_content(prompt)
+            response = self._generate("metrics", prompt)
             
             # Clean response
             json_str = response.text.strip()
@@ -0,0 +1,277 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, TextIO
+
+from sqlalchemy import select, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import Company, Report, ReportMetric
+from app.services.company_stats_service import CompanyStatsService, REPORTS_COUNTER
+from app.services.industry_service import IndustryAggregatesService, industry_key
+from app.services.periods import period_ordinal, parse_period_label, period_label, split_period_ordinal
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_SOURCE = "import"
+IMPORTED_STATUS = "imported"
+# Kolumny opisujące wiersz - pozostałe (w formacie szerokim) to metryki
+RESERVED_COLUMNS = {
+    "company", "company_name", "ticker", "industry", "period", "year", "quarter",
+    "report_type", "metric", "metric_name", "value",
+}
+MAX_REPORTED_ERRORS = 50
+
+
+def read_rows(stream: TextIO, import_format: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(line number, row dict) pairs read lazily from a CSV or NDJSON text stream"""
+    if import_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, {"__error__": "invalid JSON"}
+
+
+def _parse_value(raw: Any) -> Optional[float]:
+    """Number from JSON or CSV text ("1 234,5" / "1.234,5" / "1,234.5" / "1234.5"); None for empty cells"""
+    if raw is None or isinstance(raw, bool):
+        return None
+    if isinstance(raw, (int, float)):
+        return float(raw)
+    text = str(raw).strip().replace("\u00a0", "").replace(" ", "")
+    if not text:
+        return None
+    if "," in text and "." in text:
+        # Separator dziesiętny to ten, który występuje ostatni; drugi grupuje tysiące
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif text.count(",") == 1:
+        text = text.replace(",", ".")
+    elif text.count(",") > 1 or text.count(".") > 1:
+        # "1.234.567" / "1,234,567" - same separatory tysięcy
+        text = text.replace(",", "").replace(".", "")
+    return float(text)
+
+
+class ImportService:
+    """Import historycznych metryk (CSV / NDJSON) bez PDF.
+
+    Wartości (firma, okres) trafiają do istniejącego raportu za ten okres
+    (PDF, a w drugiej kolejności wcześniejszy import); syntetyczny raport
+    o statusie "imported" powstaje tylko, gdy firma nie ma raportu za okres.
+    Metryki zapisywane są w report_metrics przez upsert wykonywany paczkami
+    (executemany). Firmy są tworzone w razie potrzeby.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.stats = CompanyStatsService()
+        self.industries = IndustryAggregatesService()
+
+    def _parse_row(self, raw: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any], int, str, float]]:
+        """(company name, company fields, period ordinal, metric, value) entries of one input row"""
+        if "__error__" in raw:
+            raise ValueError(raw["__error__"])
+        row = {str(k).strip().lower(): v for k, v in raw.items() if k is not None}
+
+        name = str(row.get("company") or row.get("company_name") or "").strip()
+        if not name:
+            raise ValueError("missing company")
+
+        ordinal = parse_period_label(str(row["period"])) if row.get("period") else None
+        if ordinal is None and row.get("year"):
+            quarter = row.get("quarter") or None
+            ordinal = period_ordinal(row["year"], quarter, "quarterly" if quarter else "annual")
+        if ordinal is None or ordinal % 10 == 0:
+            raise ValueError("missing or invalid period (use 'Q1 2024' / '2024' or year + quarter)")
+
+        company_fields = {
+            field: str(row[field]).strip()
+            for field in ("ticker", "industry")
+            if row.get(field) not in (None, "")
+        }
+
+        if row.get("metric") or row.get("metric_name"):
+            metric_values = {str(row.get("metric") or row.get("metric_name")).strip(): row.get("value")}
+        else:
+            metric_values = {key: value for key, value in row.items() if key not in RESERVED_COLUMNS}
+
+        entries = []
+        for metric, raw_value in metric_values.items():
+            try:
+                value = _parse_value(raw_value)
+            except ValueError:
+                raise ValueError(f"invalid value for {metric}: {raw_value!r}")
+            if value is not None:
+                entries.append((name, company_fields, ordinal, metric, value))
+        if not entries:
+            raise ValueError("no metric values")
+        return entries
+
+    async def _resolve_companies(self, db: AsyncSession, entries, companies: Dict[str, Company], result: Dict[str, Any]) -> None:
+        missing = {name: fields for name, fields, _, _, _ in entries if name not in companies}
+        if not missing:
+            return
+        existing = await db.execute(select(Company).where(Company.name.in_(list(missing))))
+        for company in existing.scalars():
+            companies[company.name] = company
+
+        created = [
+            Company(name=name, ticker=fields.get("ticker"), industry=fields.get("industry"))
+            for name, fields in missing.items() if name not in companies
+        ]
+        if created:
+            db.add_all(created)
+            await db.flush()
+            await self.stats.companies_changed(db, len(created))
+            result["companies_created"] += len(created)
+            for company in created:
+                companies[company.name] = company
+
+    async def _resolve_reports(self, db: AsyncSession, entries, companies: Dict[str, Company],
+                               reports: Dict[Tuple[int, int], Dict[str, Any]], result: Dict[str, Any]) -> None:
+        """Find the report of every (company, period) in the batch - an uploaded PDF first,
+        then an earlier import - and bulk-create synthetic reports only for the rest"""
+        missing = {(companies[name].id, ordinal) for name, _, ordinal, _, _ in entries} - set(reports)
+        if not missing:
+            return
+        existing = await db.execute(
+            select(Report.id, Report.company_id, Report.period_ordinal, Report.key_metrics)
+            .where(Report.company_id.in_({company_id for company_id, _ in missing}))
+            .where(Report.period_ordinal.in_({ordinal for _, ordinal in missing}))
+            .order_by(Report.status == IMPORTED_STATUS, Report.upload_date.desc(), Report.id.desc())
+        )
+        for report_id, company_id, ordinal, key_metrics in existing.all():
+            if (company_id, ordinal) in missing and (company_id, ordinal) not in reports:
+                reports[(company_id, ordinal)] = {"id": report_id, "key_metrics": key_metrics or {}}
+
+        to_create = sorted(missing - set(reports))
+        if not to_create:
+            return
+        # Wartości z tej paczki od razu w key_metrics - bez osobnego UPDATE po INSERT
+        initial_metrics: Dict[Tuple[int, int], Dict[str, float]] = {}
+        for name, _, ordinal, metric, value in entries:
+            initial_metrics.setdefault((companies[name].id, ordinal), {})[metric] = value
+        names = {company.id: company.name for company in companies.values()}
+        now = datetime.utcnow()
+
+        rows = []
+        for company_id, ordinal in to_create:
+            year, quarter = split_period_ordinal(ordinal)
+            rows.append({
+                "company_id": company_id,
+                "company_name": names[company_id],
+                "filename": f"import_{company_id}_{ordinal}",
+                "original_filename": "import",
+                "report_type": "quarterly" if quarter else "annual",
+                "report_period": period_label(ordinal),
+                "report_year": year,
+                "report_quarter": quarter,
+                "period_ordinal": ordinal,
+                "upload_date": now,
+                "updated_at": now,
+                "file_size": 0,
+                "file_path": "",
+                "extracted_text_length": 0,
+                "key_metrics": initial_metrics.get((company_id, ordinal), {}),
+                "status": IMPORTED_STATUS,
+            })
+        created = await db.execute(
+            insert(Report).returning(Report.id, Report.company_id, Report.period_ordinal, Report.key_metrics),
+            rows
+        )
+        for report_id, company_id, ordinal, key_metrics in created.all():
+            reports[(company_id, ordinal)] = {"id": report_id, "key_metrics": key_metrics or {}}
+        result["reports_created"] += len(rows)
+
+    async def _upsert_metrics(self, db: AsyncSession, entries, companies: Dict[str, Company],
+                              reports: Dict[Tuple[int, int], Dict[str, Any]]) -> int:
+        values: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        report_metrics: Dict[Tuple[int, int], Dict[str, float]] = {}
+        for name, _, ordinal, metric, value in entries:
+            key = (companies[name].id, ordinal)
+            report_id = reports[key]["id"]
+            values[(report_id, metric)] = {
+                "report_id": report_id,
+                "company_id": key[0],
+                "period_ordinal": ordinal,
+                "metric_name": metric,
+                "value": value,
+                "source": IMPORT_SOURCE,
+            }
+            report_metrics.setdefault(key, {})[metric] = value
+
+        if db.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(ReportMetric)
+        statement = statement.on_conflict_do_update(
+            index_elements=["report_id", "metric_name"],
+            set_={"value": statement.excluded.value, "source": statement.excluded.source}
+        )
+        # Lista parametrów -> executemany po stronie sterownika
+        await db.execute(statement, list(values.values()))
+
+        # key_metrics raportu okresu (migawka firmy, stare ścieżki wykresów)
+        changed = []
+        for key, new_values in report_metrics.items():
+            report = reports[key]
+            merged = {**report["key_metrics"], **new_values}
+            if merged != report["key_metrics"]:
+                report["key_metrics"] = merged
+                changed.append({"id": report["id"], "key_metrics": merged})
+        if changed:
+            await db.execute(update(Report), changed)
+        return len(values)
+
+    async def import_rows(self, db: AsyncSession, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Import rows in batches and commit once; returns counters and row errors"""
+        result = {"rows_read": 0, "values_imported": 0, "companies_created": 0, "reports_created": 0, "errors": []}
+        companies: Dict[str, Company] = {}
+        reports: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.batch_size))
+            if not chunk:
+                break
+            entries = []
+            for line_number, raw in chunk:
+                result["rows_read"] += 1
+                try:
+                    entries.extend(self._parse_row(raw))
+                except (ValueError, TypeError) as e:
+                    if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                        result["errors"].append(f"Wiersz {line_number}: {e}")
+            if not entries:
+                continue
+            await self._resolve_companies(db, entries, companies, result)
+            await self._resolve_reports(db, entries, companies, reports, result)
+            result["values_imported"] += await self._upsert_metrics(db, entries, companies, reports)
+
+        # Migawki firm, agregaty branżowe i liczniki - raz na firmę / branżę
+        years_by_company: Dict[int, set] = {}
+        for company_id, ordinal in reports:
+            years_by_company.setdefault(company_id, set()).add(ordinal // 10)
+        years_by_industry: Dict[str, set] = {}
+        for company in companies.values():
+            if company.id not in years_by_company:
+                continue
+            await self.stats.refresh_company(db, company.id)
+            key = industry_key(company.industry)
+            if key:
+                years_by_industry.setdefault(key, set()).update(years_by_company[company.id])
+        for key, years in years_by_industry.items():
+            await self.industries.refresh(db, key, years)
+        await self.stats.bump(db, REPORTS_COUNTER, result["reports_created"])
+        await db.commit()
+        return result
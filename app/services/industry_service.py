@@ -0,0 +1,181 @@
+from typing import List, Dict, Any, Optional, Iterable
+from datetime import datetime
+import numpy as np
+from sqlalchemy import select, delete, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import Company, IndustryAggregate, industry_key
+from app.services.timeseries_service import TimeSeriesService, TimeSeriesPanel
+from app.services.metrics_service import format_metric_value
+from app.services.periods import ANNUAL_SLOT, period_label
+
+AGGREGATE_METRICS = ("revenue", "net_income", "net_margin", "operating_margin")
+BASE_METRICS = ("revenue", "net_income", "operating_income")
+CONTEXT_LABELS = {
+    "revenue": "przychody",
+    "net_income": "zysk netto",
+    "net_margin": "marża netto",
+    "operating_margin": "marża operacyjna",
+}
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator != 0, numerator / denominator, np.nan)
+
+
+def _cell_stats(values: np.ndarray, ordinals: List[int]) -> List[Dict[str, Any]]:
+    """Per-column statistics across companies (rows) - columns without data are skipped"""
+    if not values.size:
+        return []
+    counts = (~np.isnan(values)).sum(axis=0)
+    columns = np.flatnonzero(counts)
+    if not columns.size:
+        return []
+    cells = values[:, columns]
+    mean = np.nanmean(cells, axis=0)
+    p25, median, p75 = np.nanpercentile(cells, [25, 50, 75], axis=0)
+    return [
+        {
+            "period_ordinal": ordinals[column],
+            "company_count": int(counts[column]),
+            "mean": float(mean[i]),
+            "median": float(median[i]),
+            "p25": float(p25[i]),
+            "p75": float(p75[i]),
+        }
+        for i, column in enumerate(columns)
+    ]
+
+
+class IndustryAggregatesService:
+    """Statystyki branżowe (średnia, mediana, kwartyle) per okres i metryka,
+    przeliczane przyrostowo dla lat, których dotyczy zmiana raportów"""
+
+    def __init__(self):
+        self.timeseries = TimeSeriesService()
+
+    def compute(self, panel: TimeSeriesPanel) -> Dict[str, List[Dict[str, Any]]]:
+        """Aggregate cells of a panel: quarterly (with derived Q4) and annual periods"""
+        quarterly = {m: panel.values(m) for m in BASE_METRICS}
+        quarterly["net_margin"] = _ratio(quarterly["net_income"], quarterly["revenue"])
+        quarterly["operating_margin"] = _ratio(quarterly["operating_income"], quarterly["revenue"])
+
+        empty = np.full((len(panel.company_ids), panel.n_years), np.nan)
+        annual = {m: panel.annual.get(m, empty) for m in BASE_METRICS}
+        annual["net_margin"] = _ratio(annual["net_income"], annual["revenue"])
+        annual["operating_margin"] = _ratio(annual["operating_income"], annual["revenue"])
+
+        return {
+            metric: _cell_stats(quarterly[metric], panel.quarter_ordinals)
+            + _cell_stats(annual[metric], panel.year_ordinals)
+            for metric in AGGREGATE_METRICS
+        }
+
+    async def refresh(self, db: AsyncSession, industry: Optional[str], years: Optional[Iterable[int]] = None) -> None:
+        """Recompute aggregates of an industry - only the given years if provided (no commit)"""
+        key = industry_key(industry)
+        if key is None:
+            return
+        years = sorted(set(years)) if years is not None else None
+
+        company_ids = (await db.execute(
+            select(Company.id).where(Company.industry_key == key)
+        )).scalars().all()
+
+        rows = []
+        if company_ids:
+            panel = await self.timeseries.load_panel(db, company_ids, BASE_METRICS, years)
+            now = datetime.utcnow()
+            rows = [
+                {"industry": key, "metric_name": metric, "updated_at": now, **cell}
+                for metric, cells in self.compute(panel).items()
+                for cell in cells
+            ]
+
+        # Bez "usuń wszystko i wstaw": dwie równoległe ingestie tej samej branży
+        # (PostgreSQL) wstawiałyby te same komórki i łamały uq_industry_aggregates_cell.
+        # Usuwane są tylko komórki, które zniknęły, reszta - upsert.
+        stale = delete(IndustryAggregate).where(IndustryAggregate.industry == key)
+        if years is not None:
+            stale = stale.where(or_(*(
+                IndustryAggregate.period_ordinal.between(year * 10, year * 10 + 9) for year in years
+            )))
+        if rows:
+            stale = stale.where(tuple_(IndustryAggregate.period_ordinal, IndustryAggregate.metric_name).not_in(
+                [(row["period_ordinal"], row["metric_name"]) for row in rows]
+            ))
+        await db.execute(stale)
+        if rows:
+            await self._upsert(db, rows)
+
+    async def _upsert(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        if db.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(IndustryAggregate)
+        statement = statement.on_conflict_do_update(
+            index_elements=["industry", "period_ordinal", "metric_name"],
+            set_={
+                column: statement.excluded[column]
+                for column in ("company_count", "mean", "median", "p25", "p75", "updated_at")
+            }
+        )
+        await db.execute(statement, rows)
+
+    async def refresh_for_company(self, db: AsyncSession, company_id: int, period_ordinal: Optional[int]) -> None:
+        """Refresh the year of the company's industry touched by a report of the given period (no commit)"""
+        if period_ordinal is None:
+            return
+        industry = await db.scalar(select(Company.industry).where(Company.id == company_id))
+        await self.refresh(db, industry, [period_ordinal // 10])
+
+    async def get_aggregates(self, db: AsyncSession, industry: str, metrics: Optional[Iterable[str]] = None) -> List[IndustryAggregate]:
+        query = (
+            select(IndustryAggregate)
+            .where(IndustryAggregate.industry == industry_key(industry))
+            .order_by(IndustryAggregate.metric_name, IndustryAggregate.period_ordinal)
+        )
+        if metrics:
+            query = query.where(IndustryAggregate.metric_name.in_(list(metrics)))
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def context_for(self, db: AsyncSession, industry: Optional[str]) -> Optional[str]:
+        """Compact text for the LLM prompt: latest quarter and year of every aggregated metric"""
+        if industry_key(industry) is None:
+            return None
+        aggregates = await self.get_aggregates(db, industry)
+        latest: Dict[tuple, IndustryAggregate] = {}
+        for row in aggregates:
+            annual = row.period_ordinal % 10 == ANNUAL_SLOT
+            latest[(row.metric_name, annual)] = row  # rosnąco po okresie - ostatni wygrywa
+        if not latest:
+            return None
+
+        lines = [f"Branża: {industry.strip()}"]
+        for metric in AGGREGATE_METRICS:
+            for annual in (False, True):
+                row = latest.get((metric, annual))
+                if row is None:
+                    continue
+                lines.append(
+                    f"- {CONTEXT_LABELS[metric]} {period_label(row.period_ordinal)} "
+                    f"({row.company_count} firm): mediana {format_metric_value(metric, row.median)}, "
+                    f"kwartyle {format_metric_value(metric, row.p25)} - {format_metric_value(metric, row.p75)}, "
+                    f"średnia {format_metric_value(metric, row.mean)}"
+                )
+        return "\n".join(lines)
+
+    async def backfill(self, db: AsyncSession) -> int:
+        """Compute all industries once if the table is empty (first start after upgrade)"""
+        if await db.scalar(select(IndustryAggregate.id).limit(1)) is not None:
+            return 0
+        keys = (await db.execute(
+            select(Company.industry_key).where(Company.industry_key.is_not(None)).distinct()
+        )).scalars().all()
+        for key in keys:
+            await self.refresh(db, key)
+        await db.commit()
+        return len(keys)
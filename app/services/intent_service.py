@@ -0,0 +1,123 @@
+import re
+import unicodedata
+from typing import List, Dict, Any, Optional
+
+from app.services.periods import period_ordinal
+
+# Wzorce po normalizacji (małe litery, bez polskich znaków); kolejność ma
+# znaczenie - dopasowany fragment jest wycinany przed kolejnymi wzorcami
+METRIC_PATTERNS = [
+    ("net_margin", r"marz\w*\s+(?:zysku\s+)?netto|rentownosc\w*\s+netto|net margin"),
+    ("operating_margin", r"marz\w*\s+operacyjn\w*|operating margin"),
+    ("net_income", r"(?:zysk\w*|wynik\w*|strat\w*)\s+netto|net (?:income|profit)"),
+    ("operating_income", r"(?:zysk\w*|wynik\w*)\s+operacyjn\w*|\bebit\b|operating income"),
+    ("revenue", r"przychod\w*|(?<!zysk ze )(?<!zysku ze )\bsprzedaz\w*|\bobrot(?!ow\w)\w*|revenues?|\bsales\b"),
+    ("total_assets", r"aktyw\w*|sum\w*\s+bilansow\w*|total assets"),
+    ("total_liabilities", r"zobowiazan\w*|liabilities"),
+    ("equity", r"kapital\w*\s+wlasn\w*|\bequity\b"),
+]
+# Nazwy innych pozycji zbudowane z nazwy metryki ("zysk ze sprzedaży" to nie
+# przychody, "aktywa obrotowe" to nie aktywa razem) - takie pytania idą do LLM
+METRIC_MODIFIER_PATTERN = re.compile(
+    r"\b(?:zysk\w*|strat\w*|wynik\w*)\s+(?:ze?\s+|na\s+)?sprzedaz\w*|"
+    r"\b(?:aktyw\w*|kapital\w*|majat\w*|srodk\w*)\s+obrotow\w*"
+)
+
+METRIC_LABELS = {
+    "revenue": "Przychody",
+    "net_income": "Zysk netto",
+    "operating_income": "Zysk operacyjny",
+    "total_assets": "Aktywa razem",
+    "total_liabilities": "Zobowiązania razem",
+    "equity": "Kapitał własny",
+    "net_margin": "Marża netto",
+    "operating_margin": "Marża operacyjna",
+}
+
+ROMAN_QUARTERS = {"i": 1, "ii": 2, "iii": 3, "iv": 4}
+YEAR = r"((?:19|20)\d{2})"
+QUARTER_PATTERNS = [
+    re.compile(r"\bq\s*([1-4])\s*[/\-]?\s*" + YEAR),
+    re.compile(r"\b([1-4])\s*(?:q|kw\w*\.?)\s*" + YEAR),
+    re.compile(r"\b(iv|i{1,3})\s*(?:q|kw\w*\.?)\s*" + YEAR),
+]
+YEAR_PATTERN = re.compile(r"\b" + YEAR + r"\b")
+LATEST_PATTERN = re.compile(r"\b(?:ostatni\w*|najnowsz\w*|aktualn\w*|obecn\w*|biezac\w*)\b")
+
+CHART_PATTERN = re.compile(r"\b(?:wykres\w*|narysuj\w*|zwizualizuj\w*|chart)\b")
+BAR_PATTERN = re.compile(r"\b(?:slupk\w*|slupkow\w*|bar)\b")
+VALUE_PATTERN = re.compile(r"\b(?:jak\w*|ile|podaj\w*|wartosc\w*|wynosil\w*|wynios\w*|wynosi|byl\w*|what)\b|\?")
+# Pytania wymagające interpretacji - zawsze do LLM
+ANALYTICAL_PATTERN = re.compile(
+    r"\b(?:dlaczego|czemu|porown\w*|ocen\w*|analiz\w*|wyjasn\w*|prognoz\w*|przewid\w*|ryzyk\w*|"
+    r"branz\w*|konkuren\w*|rekomend\w*|czy|wzrosl\w*|spadl\w*|zmienil\w*|wplyw\w*|why|compare)\b"
+)
+MAX_MESSAGE_LENGTH = 160
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip Polish diacritics ("Zysk Netto w II kw." -> "zysk netto w ii kw.")"""
+    text = text.lower().replace("ł", "l")
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+class IntentService:
+    """Lokalne rozpoznawanie prostych pytań o dane (wartość metryki w okresie, wykres metryki).
+
+    Zwraca intencję tylko przy pełnym dopasowaniu - w każdym innym
+    przypadku None, a pytanie trafia do LLM.
+    """
+
+    def __init__(self):
+        pass
+
+    def _metrics(self, text: str) -> tuple:
+        metrics = []
+        for name, pattern in METRIC_PATTERNS:
+            text, found = re.subn(pattern, " ", text)
+            if found and name not in metrics:
+                metrics.append(name)
+        return metrics, text
+
+    def _periods(self, text: str) -> List[int]:
+        periods = []
+        for pattern in QUARTER_PATTERNS:
+            for quarter, year in pattern.findall(text):
+                periods.append(period_ordinal(int(year), ROMAN_QUARTERS.get(quarter) or int(quarter), "quarterly"))
+            text = pattern.sub(" ", text)
+        for year in YEAR_PATTERN.findall(text):
+            periods.append(period_ordinal(int(year), None, "annual"))
+        return list(dict.fromkeys(periods))
+
+    def match(self, message: str) -> Optional[Dict[str, Any]]:
+        """Recognize a metric lookup or chart request; None when not confident"""
+        text = normalize(message.strip())
+        if not text or len(text) > MAX_MESSAGE_LENGTH or ANALYTICAL_PATTERN.search(text):
+            return None
+        if METRIC_MODIFIER_PATTERN.search(text):
+            return None
+
+        # Jedna metryka na pytanie - kilka nazw to zwykle jedna pozycja spoza listy
+        metrics, rest = self._metrics(text)
+        if len(metrics) != 1:
+            return None
+
+        if CHART_PATTERN.search(rest):
+            return {
+                "intent": "chart",
+                "metrics": metrics,
+                "chart_type": "bar" if BAR_PATTERN.search(rest) else "line",
+            }
+
+        if not VALUE_PATTERN.search(rest):
+            return None
+        periods = self._periods(rest)
+        latest = bool(LATEST_PATTERN.search(rest))
+        # Dokładnie jeden okres (lub "ostatni") - kilka okresów to już porównanie
+        if len(periods) > 1 or (not periods and not latest) or (periods and latest):
+            return None
+        return {
+            "intent": "value",
+            "metrics": metrics,
+            "period": periods[0] if periods else None,
+        }
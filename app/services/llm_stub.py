@@ -0,0 +1,78 @@
+import json
+import re
+import time
+from dataclasses import dataclass
+
+_COMPANY_PATTERNS = (
+    re.compile(r"(?:Spółka|Firma|Company):\s*([^\n]+)"),
+    re.compile(r"Raport\s+(?:roczny|kwartalny|okresowy)\s+([^\n]+)"),
+)
+_QUARTER = re.compile(r"Q([1-4])\s*(\d{4})")
+_YEAR = re.compile(r"\b(20\d{2})\b")
+
+
+@dataclass
+class StubResponse:
+    text: str
+
+
+class StubLLM:
+    """Deterministyczne odpowiedzi zamiast Gemini (LLM_BACKEND=stub).
+
+    Do testów obciążeniowych i pracy bez klucza API. Opóźnienie jest
+    symulowane przez time.sleep - tak jak synchroniczne wywołanie SDK Gemini,
+    blokuje wątek wywołujący.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def generate(self, call: str, prompt: str) -> StubResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        handler = getattr(self, f"_{call}", self._response)
+        return StubResponse(handler(prompt))
+
+    def _response(self, prompt: str) -> str:
+        question = prompt.rsplit("Użytkownik:", 1)[-1].split("Asystent:", 1)[0].strip()
+        answer = f"Odpowiedź testowa na pytanie: {question[:200]}"
+        if "wykres" in question.lower():
+            chart = {"needs_chart": True, "chart_config": {
+                "chart_type": "line", "metrics": ["revenue"], "title": "Przychody w czasie"
+            }}
+            answer += "\n```json_chart\n" + json.dumps(chart) + "\n```"
+        return answer
+
+    def _summary(self, prompt: str) -> str:
+        return f"Podsumowanie testowe raportu ({len(prompt)} znaków zapytania)."
+
+    def _trends(self, prompt: str) -> str:
+        return "Trend przychodów: stabilny. Rentowność: bez istotnych zmian. Ocena ogólna: neutralna."
+
+    def _company_info(self, prompt: str) -> str:
+        name = None
+        for pattern in _COMPANY_PATTERNS:
+            match = pattern.search(prompt)
+            if match:
+                name = match.group(1).strip()
+                break
+        quarter_match = _QUARTER.search(prompt)
+        year_match = _YEAR.search(prompt)
+        year = int(quarter_match.group(2)) if quarter_match else int(year_match.group(1)) if year_match else None
+        quarter = int(quarter_match.group(1)) if quarter_match else None
+        return json.dumps({
+            "name": name or "Spółka testowa S.A.",
+            "ticker": None,
+            "industry": "Przemysł",
+            "description": "Spółka wygenerowana przez testowy backend LLM.",
+            "report_period": f"Q{quarter} {year}" if quarter else (str(year) if year else None),
+            "report_year": year,
+            "report_quarter": quarter,
+        }, ensure_ascii=False)
+
+    def _metrics(self, prompt: str) -> str:
+        # Bez wartości - wskaźniki pochodzą z ekstrakcji regex
+        return json.dumps({
+            "revenue": None, "net_income": None, "total_assets": None,
+            "total_liabilities": None, "equity": None,
+        })
@@ -0,0 +1,112 @@
+from typing import List, Dict, Any, Optional, Iterable
+from sqlalchemy import select, delete, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import Report, ReportMetric
+from app.services.periods import period_ordinal
+
+# Wskaźniki będące ułamkami (formatowane jako %)
+RATIO_METRICS = ("net_margin", "operating_margin")
+
+
+def format_metric_value(metric_name: str, value: float) -> str:
+    """Human readable value: ratios as percent, amounts scaled to tys./mln/mld"""
+    if metric_name in RATIO_METRICS:
+        return f"{value * 100:.1f}%"
+    for divisor, unit in ((1e9, "mld"), (1e6, "mln"), (1e3, "tys.")):
+        if abs(value) >= divisor:
+            return f"{value / divisor:.2f} {unit}"
+    return f"{value:.2f}"
+
+
+class MetricsService:
+    """Znormalizowane wskaźniki finansowe (tabela report_metrics)"""
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def _to_float(value: Any) -> Optional[float]:
+        if value is None or isinstance(value, bool):
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def merge_metrics(self, regex_metrics: Dict[str, Any], ai_metrics: Dict[str, Any]) -> tuple:
+        """Merge regex and AI metrics (AI wins); returns (metrics, sources)"""
+        metrics = dict(regex_metrics or {})
+        sources = {key: "regex" for key, value in metrics.items() if value is not None}
+        for key, value in (ai_metrics or {}).items():
+            if value is not None:
+                metrics[key] = value
+                sources[key] = "ai"
+        return metrics, sources
+
+    def build_rows(self, report: Report, sources: Optional[Dict[str, str]] = None, default_source: str = "legacy") -> List[ReportMetric]:
+        """Metric rows for a report's key_metrics (report must already have an id)"""
+        ordinal = report.period_ordinal
+        if ordinal is None:
+            ordinal = period_ordinal(report.report_year, report.report_quarter, report.report_type)
+        rows = []
+        for name, raw_value in (report.key_metrics or {}).items():
+            value = self._to_float(raw_value)
+            if value is None:
+                continue
+            rows.append(ReportMetric(
+                report_id=report.id,
+                company_id=report.company_id,
+                period_ordinal=ordinal,
+                metric_name=name,
+                value=value,
+                source=(sources or {}).get(name, default_source)
+            ))
+        return rows
+
+    async def replace_report_metrics(self, db: AsyncSession, report: Report, sources: Optional[Dict[str, str]] = None) -> None:
+        """Replace metric rows of a report (no commit)"""
+        await db.execute(delete(ReportMetric).where(ReportMetric.report_id == report.id))
+        db.add_all(self.build_rows(report, sources))
+
+    async def get_company_points(self, db: AsyncSession, company_id: int, metric_names: Optional[Iterable[str]] = None) -> List[Any]:
+        """Dated metric points of a company ordered chronologically (index scan)"""
+        query = (
+            select(ReportMetric.period_ordinal, ReportMetric.metric_name, ReportMetric.value)
+            .where(ReportMetric.company_id == company_id)
+            .where(ReportMetric.period_ordinal.is_not(None))
+            .order_by(ReportMetric.period_ordinal, ReportMetric.report_id)
+        )
+        if metric_names is not None:
+            query = query.where(ReportMetric.metric_name.in_(list(metric_names)))
+        result = await db.execute(query)
+        return result.all()
+
+    async def backfill(self, db: AsyncSession, batch_size: int = 500) -> int:
+        """Fill report_metrics from Report.key_metrics when the table is still empty"""
+        if await db.scalar(select(exists().select_from(ReportMetric))):
+            return 0
+
+        created = 0
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(Report)
+                .where(Report.id > last_id)
+                .where(Report.key_metrics.is_not(None))
+                .order_by(Report.id)
+                .limit(batch_size)
+            )
+            reports = result.scalars().all()
+            if not reports:
+                break
+            for report in reports:
+                rows = self.build_rows(report)
+                db.add_all(rows)
+                created += len(rows)
+            last_id = reports[-1].id
+            await db.flush()
+            db.expunge_all()
+
+        await db.commit()
+        return created
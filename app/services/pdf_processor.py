@@ -1,8 +1,8 @@
-import PyPDF2
-import pdfplumber
 import re
 from typing import Dict, Optional, List
 
+from app.monitoring.metrics import stage
+
 
 class PDFProcessor:
     def __init__(self):
@@ -10,6 +10,9 @@ class PDFProcessor:
     
     def extract_text(self, file_path: str) -> str:
         """Extract text from PDF using PyPDF2 as primary method"""
+        # Biblioteki PDF importowane przy pierwszym użyciu (szybszy start aplikacji)
+        import PyPDF2
+        
         try:
             text = ""
             with open(file_path, 'rb') as file:
@@ -24,6 +27,8 @@ class PDFProcessor:
     
     def _extract_with_pdfplumber(self, file_path: str) -> str:
         """Fallback method using pdfplumber"""
+        import pdfplumber
+        
         try:
             text = ""
             with pdfplumber.open(file_path) as pdf:
@@ -38,6 +43,8 @@ class PDFProcessor:
     
     def extract_tables(self, file_path: str) -> List[List]:
         """Extract tables from PDF using pdfplumber"""
+        import pdfplumber
+        
         tables = []
         try:
             with pdfplumber.open(file_path) as pdf:
@@ -101,18 +108,19 @@ class PDFProcessor:
         # Patterns for financial data
         # Supports: 1 234 567, 1.234.567, 1,234,567
         # Supports units: tys, mln, mld
+        # Słowa między etykietą a liczbą bez cyfr - inaczej "1 234,5" traci grupę tysięcy
         patterns = {
             "revenue": [
-                r"(?:przychody|revenues?)[\s:]+(?:ze\s+sprzedaży\s+)?[\s\w]*?[\s:]+([\d\s\.,]+)\s*(?:mln|mld|tys)?\s*(?:PLN|zł)",
-                r"(?:sprzedaż|sales)[\s:]+[\s\w]*?[\s:]+([\d\s\.,]+)\s*(?:mln|mld|tys)?"
+                r"(?:przychody|revenues?)[\s:]+(?:ze\s+sprzedaży\s+)?(?:[^\W\d]|\s)*?[\s:]+([\d\s\.,]+)\s*(?:mln|mld|tys)?\s*(?:PLN|zł)",
+                r"(?:sprzedaż|sales)[\s:]+(?:[^\W\d]|\s)*?[\s:]+([\d\s\.,]+)\s*(?:mln|mld|tys)?"
             ],
             "net_income": [
-                r"(?:zysk|wynik)\s+(?:netto|net)[\s:]+[\s\w]*?[\s:]+([\d\s\.,\-]+)\s*(?:mln|mld|tys)?",
-                r"(?:profit|net\s+income)[\s:]+[\s\w]*?[\s:]+([\d\s\.,\-]+)\s*(?:mln|mld|tys)?"
+                r"(?:zysk|wynik)\s+(?:netto|net)[\s:]+(?:[^\W\d]|\s)*?[\s:]+([\d\s\.,\-]+)\s*(?:mln|mld|tys)?",
+                r"(?:profit|net\s+income)[\s:]+(?:[^\W\d]|\s)*?[\s:]+([\d\s\.,\-]+)\s*(?:mln|mld|tys)?"
             ],
             "total_assets": [
-                r"(?:aktywa|assets)\s+(?:razem|total)[\s:]+[\s\w]*?[\s:]+([\d\s\.,]+)\s*(?:mln|mld|tys)?",
-                r"(?:suma|total)\s+aktywów[\s:]+[\s\w]*?[\s:]+([\d\s\.,]+)\s*(?:mln|mld|tys)?"
+                r"(?:aktywa|assets)\s+(?:razem|total)[\s:]+(?:[^\W\d]|\s)*?[\s:]+([\d\s\.,]+)\s*(?:mln|mld|tys)?",
+                r"(?:suma|total)\s+aktywów[\s:]+(?:[^\W\d]|\s)*?[\s:]+([\d\s\.,]+)\s*(?:mln|mld|tys)?"
             ],
         }
         
@@ -173,22 +181,25 @@ class PDFProcessor:
         
         try:
             # Extract text
-            text = self.extract_text(file_path)
+            with stage("pdf_parse"):
+                text = self.extract_text(file_path)
             if not text:
                 result["error"] = "Failed to extract text from PDF"
                 return result
             
             result["text"] = text
             
-            # Extract metadata
-            result["company_name"] = self.extract_company_name(text)
-            result["report_period"] = self.extract_report_period(text)
-            
-            # Extract metrics
-            result["metrics"] = self.extract_financial_metrics(text)
+            with stage("regex_extract"):
+                # Extract metadata
+                result["company_name"] = self.extract_company_name(text)
+                result["report_period"] = self.extract_report_period(text)
+                
+                # Extract metrics
+                result["metrics"] = self.extract_financial_metrics(text)
             
             # Count tables
-            tables = self.extract_tables(file_path)
+            with stage("pdf_tables"):
+                tables = self.extract_tables(file_path)
             result["tables_count"] = len(tables)
             
             result["success"] = True
@@ -0,0 +1,57 @@
+import re
+from typing import Optional, Tuple
+
+# Kanoniczny klucz okresu: rok * 10 + slot
+#   slot 1-4 - kwartał, slot 5 - raport roczny (po Q4 tego samego roku),
+#   slot 0 - znany tylko rok (bez kwartału i typu rocznego)
+ANNUAL_SLOT = 5
+
+_QUARTER_LABEL = re.compile(r"^(?:Q([1-4])[\s/\-]*(\d{4})|(\d{4})[\s/\-]*Q([1-4]))$", re.IGNORECASE)
+_YEAR_LABEL = re.compile(r"^(?:FY\s*)?(\d{4})$", re.IGNORECASE)
+
+
+def period_ordinal(year: Optional[int], quarter: Optional[int], report_type: Optional[str] = None) -> Optional[int]:
+    """Chronologically sortable integer key for a reporting period"""
+    try:
+        year = int(year) if year is not None else None
+        quarter = int(quarter) if quarter is not None else None
+    except (TypeError, ValueError):
+        return None
+
+    if not year:
+        return None
+    if quarter and 1 <= quarter <= 4:
+        return year * 10 + quarter
+    if report_type == "annual":
+        return year * 10 + ANNUAL_SLOT
+    return year * 10
+
+
+def split_period_ordinal(ordinal: int) -> Tuple[int, Optional[int]]:
+    """(year, quarter) for an ordinal; quarter is None for annual/year-only periods"""
+    year, slot = divmod(ordinal, 10)
+    return year, slot if 1 <= slot <= 4 else None
+
+
+def period_label(ordinal: Optional[int]) -> str:
+    """Label like "Q1 2024" or "2024" """
+    if ordinal is None:
+        return "-"
+    year, quarter = split_period_ordinal(ordinal)
+    return f"Q{quarter} {year}" if quarter else f"{year}"
+
+
+def parse_period_label(label: Optional[str]) -> Optional[int]:
+    """Inverse of period_label: "Q1 2024" / "2024Q1" -> 20241, "2024" / "FY2024" -> annual"""
+    if not label:
+        return None
+    label = label.strip()
+    match = _QUARTER_LABEL.match(label)
+    if match:
+        quarter = match.group(1) or match.group(4)
+        year = match.group(2) or match.group(3)
+        return period_ordinal(int(year), int(quarter))
+    match = _YEAR_LABEL.match(label)
+    if match:
+        return period_ordinal(int(match.group(1)), None, "annual")
+    return None
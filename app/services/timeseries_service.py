@@ -0,0 +1,338 @@
+from typing import List, Dict, Any, Optional, Iterable, Sequence
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import ReportMetric
+from app.services.periods import ANNUAL_SLOT
+
+# Wielkości okresowe (sumują się w roku) vs stany na koniec okresu (bilans)
+FLOW_METRICS = ("revenue", "net_income", "operating_income")
+STOCK_METRICS = ("total_assets", "total_liabilities", "equity")
+MARGINS = {
+    "net_margin": ("net_income", "revenue"),
+    "operating_margin": ("operating_income", "revenue"),
+}
+
+
+def _shifted_change(values: np.ndarray, lag: int) -> np.ndarray:
+    """(x[t] - x[t-lag]) / |x[t-lag]| along the period axis; NaN where undefined"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] <= lag:
+        return out
+    previous = values[..., :-lag]
+    current = values[..., lag:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[..., lag:] = np.where(previous != 0, (current - previous) / np.abs(previous), np.nan)
+    return out
+
+
+def _rolling(values: np.ndarray, window: int, reducer) -> np.ndarray:
+    """Trailing window reduction; NaN until a full window of data is available"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < window:
+        return out
+    windows = sliding_window_view(values, window, axis=-1)
+    out[..., window - 1:] = reducer(windows, axis=-1)
+    return out
+
+
+class TimeSeriesPanel:
+    """Panel firm x kwartałów (oraz firm x lat) dla wybranych metryk.
+
+    Kwartały tworzą ciągłą siatkę od Q1 pierwszego do Q4 ostatniego roku
+    w danych, więc przesunięcia o 1/4 kolumny to zawsze QoQ/YoY.
+    """
+
+    def __init__(self, company_ids: List[int], first_year: int, n_years: int,
+                 quarterly: Dict[str, np.ndarray], annual: Dict[str, np.ndarray]):
+        self.company_ids = company_ids
+        self.first_year = first_year
+        self.n_years = n_years
+        self.quarterly = quarterly
+        self.annual = annual
+        self._index = {company_id: i for i, company_id in enumerate(company_ids)}
+        self._derive_fourth_quarters()
+
+    @classmethod
+    def from_points(cls, rows: Iterable[Sequence[Any]], metrics: Optional[Iterable[str]] = None) -> "TimeSeriesPanel":
+        """Build from (company_id, period_ordinal, metric_name, value) rows in chronological order"""
+        rows = [r for r in rows if r[1] is not None and r[1] % 10 != 0]
+        metric_names = sorted(set(metrics) if metrics is not None else {r[2] for r in rows})
+        company_ids = sorted({r[0] for r in rows})
+        if not rows:
+            return cls(company_ids, 0, 0, {m: np.empty((0, 0)) for m in metric_names},
+                       {m: np.empty((0, 0)) for m in metric_names})
+
+        company_idx = np.array([r[0] for r in rows])
+        ordinals = np.array([r[1] for r in rows])
+        names = np.array([r[2] for r in rows])
+        values = np.array([r[3] for r in rows], dtype=float)
+
+        years, slots = np.divmod(ordinals, 10)
+        first_year = int(years.min())
+        n_years = int(years.max()) - first_year + 1
+        rows_idx = np.searchsorted(company_ids, company_idx)
+        year_idx = years - first_year
+        is_annual = slots == ANNUAL_SLOT
+
+        quarterly, annual = {}, {}
+        for metric in metric_names:
+            q = np.full((len(company_ids), n_years * 4), np.nan)
+            a = np.full((len(company_ids), n_years), np.nan)
+            mask = names == metric
+            quarter_mask = mask & ~is_annual
+            annual_mask = mask & is_annual
+            # Kolejne wiersze nadpisują wcześniejsze (późniejszy raport za ten sam okres wygrywa)
+            q[rows_idx[quarter_mask], year_idx[quarter_mask] * 4 + slots[quarter_mask] - 1] = values[quarter_mask]
+            a[rows_idx[annual_mask], year_idx[annual_mask]] = values[annual_mask]
+            quarterly[metric], annual[metric] = q, a
+
+        return cls(company_ids, first_year, n_years, quarterly, annual)
+
+    def _derive_fourth_quarters(self) -> None:
+        """Fill missing Q4 from annual reports; complete missing annual values from quarters"""
+        for metric, q in self.quarterly.items():
+            a = self.annual[metric]
+            if not q.size:
+                continue
+            by_year = q.reshape(len(self.company_ids), self.n_years, 4)
+            q4 = by_year[:, :, 3]
+            if metric in STOCK_METRICS:
+                # Stan na koniec roku = stan na koniec Q4
+                derived = a
+                np.copyto(a, q4, where=np.isnan(a))
+            else:
+                # Q4 = rok - (Q1 + Q2 + Q3)
+                derived = a - by_year[:, :, :3].sum(axis=2)
+                np.copyto(a, by_year.sum(axis=2), where=np.isnan(a))
+            np.copyto(q4, derived, where=np.isnan(q4))
+
+    @property
+    def quarter_ordinals(self) -> List[int]:
+        return [(self.first_year + i // 4) * 10 + i % 4 + 1 for i in range(self.n_years * 4)]
+
+    @property
+    def year_ordinals(self) -> List[int]:
+        return [(self.first_year + i) * 10 + ANNUAL_SLOT for i in range(self.n_years)]
+
+    def row(self, company_id: int) -> Optional[int]:
+        return self._index.get(company_id)
+
+    def values(self, metric: str) -> np.ndarray:
+        q = self.quarterly.get(metric)
+        return q if q is not None else np.full((len(self.company_ids), self.n_years * 4), np.nan)
+
+    def qoq(self, metric: str) -> np.ndarray:
+        return _shifted_change(self.values(metric), 1)
+
+    def yoy(self, metric: str) -> np.ndarray:
+        return _shifted_change(self.values(metric), 4)
+
+    def ttm(self, metric: str) -> np.ndarray:
+        """Trailing twelve months sum (flows only - NaN if any of 4 quarters is missing)"""
+        return _rolling(self.values(metric), 4, np.sum)
+
+    def margin(self, name: str) -> np.ndarray:
+        numerator, denominator = MARGINS[name]
+        num, den = self.values(numerator), self.values(denominator)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(den != 0, num / den, np.nan)
+
+    def rolling_mean(self, metric: str, window: int = 4) -> np.ndarray:
+        return _rolling(self.values(metric), window, np.mean)
+
+    def rolling_std(self, metric: str, window: int = 4) -> np.ndarray:
+        if window < 2:
+            return np.full(self.values(metric).shape, np.nan)
+        return _rolling(self.values(metric), window, lambda w, axis: np.std(w, axis=axis, ddof=1))
+
+    def cagr(self, metric: str) -> np.ndarray:
+        """Compound annual growth between the first and last positive full-year value"""
+        a = self.annual.get(metric)
+        if a is None or not a.size:
+            return np.full(len(self.company_ids), np.nan)
+        valid = ~np.isnan(a) & (a > 0)
+        has_data = valid.any(axis=1)
+        first = valid.argmax(axis=1)
+        last = a.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+        years = last - first
+        rows = np.arange(a.shape[0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = (a[rows, last] / a[rows, first]) ** (1.0 / np.where(years > 0, years, 1)) - 1
+        return np.where(has_data & (years > 0), growth, np.nan)
+
+    def latest(self, values: np.ndarray) -> tuple:
+        """Last non-NaN value of every company row and its quarter column (-1 if none)"""
+        if not values.size:
+            return np.full(len(self.company_ids), np.nan), np.full(len(self.company_ids), -1)
+        valid = ~np.isnan(values)
+        column = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+        has_data = valid.any(axis=1)
+        latest = values[np.arange(values.shape[0]), column]
+        return np.where(has_data, latest, np.nan), np.where(has_data, column, -1)
+
+    def annual_values(self, metric: str) -> np.ndarray:
+        """Full-year values (reported or completed from quarters); margins from full-year amounts"""
+        if metric in MARGINS:
+            numerator, denominator = (self.annual_values(m) for m in MARGINS[metric])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(denominator != 0, numerator / denominator, np.nan)
+        a = self.annual.get(metric)
+        return a if a is not None else np.full((len(self.company_ids), self.n_years), np.nan)
+
+    def quarter_values(self, metric: str) -> np.ndarray:
+        return self.margin(metric) if metric in MARGINS else self.values(metric)
+
+    def value_at(self, company_id: int, metric: str, ordinal: int) -> Optional[float]:
+        """Single value of a company for a quarter or year ordinal (None if unavailable)"""
+        row = self.row(company_id)
+        year, slot = divmod(ordinal, 10)
+        if row is None or not 0 <= year - self.first_year < self.n_years or slot not in (1, 2, 3, 4, ANNUAL_SLOT):
+            return None
+        if slot == ANNUAL_SLOT:
+            value = self.annual_values(metric)[row, year - self.first_year]
+        else:
+            value = self.quarter_values(metric)[row, (year - self.first_year) * 4 + slot - 1]
+        return None if np.isnan(value) else float(value)
+
+    def latest_value(self, company_id: int, metric: str) -> tuple:
+        """(value, ordinal) of the most recent quarter or year with data, (None, None) if none"""
+        row = self.row(company_id)
+        if row is None or not self.n_years:
+            return None, None
+        candidates = []
+        for values, ordinals in ((self.quarter_values(metric), self.quarter_ordinals),
+                                 (self.annual_values(metric), self.year_ordinals)):
+            latest, column = self.latest(values[row:row + 1])
+            if column[0] >= 0:
+                candidates.append((ordinals[column[0]], float(latest[0])))
+        if not candidates:
+            return None, None
+        ordinal, value = max(candidates)
+        return value, ordinal
+
+    def derive_all(self, window: int = 4) -> Dict[str, np.ndarray]:
+        """All quarterly derived series, each of shape (companies, quarters)"""
+        derived = {}
+        for metric in self.quarterly:
+            derived[metric] = self.values(metric)
+            derived[f"{metric}_qoq"] = self.qoq(metric)
+            derived[f"{metric}_yoy"] = self.yoy(metric)
+            derived[f"{metric}_rolling_mean"] = self.rolling_mean(metric, window)
+            derived[f"{metric}_rolling_std"] = self.rolling_std(metric, window)
+            if metric in FLOW_METRICS:
+                derived[f"{metric}_ttm"] = self.ttm(metric)
+        for name, (numerator, denominator) in MARGINS.items():
+            if numerator in self.quarterly and denominator in self.quarterly:
+                derived[name] = self.margin(name)
+        return derived
+
+
+def _to_json_list(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+class TimeSeriesService:
+    """Ładowanie paneli metryk i formatowanie metryk pochodnych"""
+
+    def __init__(self):
+        pass
+
+    async def load_panel(self, db: AsyncSession, company_ids: Iterable[int], metrics: Optional[Iterable[str]] = None,
+                         years: Optional[Iterable[int]] = None) -> TimeSeriesPanel:
+        """One indexed query for all companies (optionally only some years), then a vectorized panel"""
+        metrics = list(metrics) if metrics is not None else None
+        query = (
+            select(ReportMetric.company_id, ReportMetric.period_ordinal, ReportMetric.metric_name, ReportMetric.value)
+            .where(ReportMetric.company_id.in_(list(company_ids)))
+            .where(ReportMetric.period_ordinal.is_not(None))
+            .order_by(ReportMetric.period_ordinal, ReportMetric.report_id)
+        )
+        if metrics is not None:
+            query = query.where(ReportMetric.metric_name.in_(metrics))
+        if years is not None:
+            query = query.where(or_(*(
+                ReportMetric.period_ordinal.between(year * 10, year * 10 + 9) for year in years
+            )))
+        result = await db.execute(query)
+        return TimeSeriesPanel.from_points(result.all(), metrics)
+
+    def company_series(self, panel: TimeSeriesPanel, company_id: int, window: int = 4) -> Dict[str, Any]:
+        """Derived series of one company trimmed to the quarters where it has data"""
+        row = panel.row(company_id)
+        if row is None:
+            return {"periods": [], "series": {}, "summary": {}}
+
+        derived = panel.derive_all(window)
+        base = np.array([panel.values(m)[row] for m in panel.quarterly])
+        has_data = ~np.isnan(base).all(axis=0) if base.size else np.array([], dtype=bool)
+        columns = np.flatnonzero(has_data)
+        if not columns.size:
+            return {"periods": [], "series": {}, "summary": {}}
+        span = slice(columns[0], columns[-1] + 1)
+
+        ordinals = panel.quarter_ordinals[span]
+        series = {name: _to_json_list(values[row, span]) for name, values in derived.items()}
+        summary = {
+            f"{metric}_cagr": _to_json_list(panel.cagr(metric)[row:row + 1])[0]
+            for metric in panel.annual
+        }
+        return {"periods": ordinals, "series": series, "summary": summary}
+
+    def compare(self, panel: TimeSeriesPanel, metrics: Iterable[str], rankings: Iterable[str]) -> Dict[str, Any]:
+        """Peer comparison on the quarter grid shared by all companies of the panel.
+
+        Returns the common periods, per-metric series keyed by company_id
+        (same shape as ChartDataService series) and rankings of the latest
+        value of each ranking metric (CAGR for *_cagr names).
+        """
+        derived = panel.derive_all()
+        base = [panel.values(m) for m in panel.quarterly]
+        if not base or not base[0].size:
+            return {"periods": [], "series": {}, "rankings": {name: [] for name in rankings}}
+
+        has_data = ~np.isnan(np.stack(base)).all(axis=(0, 1))
+        columns = np.flatnonzero(has_data)
+        ordinals = panel.quarter_ordinals
+        periods = [ordinals[c] for c in columns]
+
+        series = {}
+        for metric in metrics:
+            values = derived.get(metric)
+            if values is None:
+                continue
+            series[metric] = {
+                company_id: {ordinals[c]: float(values[row, c]) for c in columns if not np.isnan(values[row, c])}
+                for row, company_id in enumerate(panel.company_ids)
+            }
+
+        ranking_tables = {}
+        for name in rankings:
+            if name.endswith("_cagr"):
+                values, columns_idx = panel.cagr(name[:-len("_cagr")]), None
+            elif name in derived:
+                values, columns_idx = panel.latest(derived[name])
+            else:
+                ranking_tables[name] = []
+                continue
+            order = np.argsort(np.where(np.isnan(values), np.inf, -values), kind="stable")
+            ranking_tables[name] = [
+                {
+                    "company_id": panel.company_ids[row],
+                    "value": None if np.isnan(values[row]) else float(values[row]),
+                    "period": None if columns_idx is None or columns_idx[row] < 0 else ordinals[columns_idx[row]],
+                }
+                for row in order
+            ]
+        return {"periods": periods, "series": series, "rankings": ranking_tables}
+
+    def chart_series(self, company_series: Dict[str, Any]) -> tuple:
+        """Convert company_series output to the (periods, series) grid used by ChartDataService"""
+        periods = company_series["periods"]
+        series = {
+            name: {ordinal: value for ordinal, value in zip(periods, values) if value is not None}
+            for name, values in company_series["series"].items()
+        }
+        return periods, series
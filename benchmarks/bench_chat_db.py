@@ -0,0 +1,154 @@
+"""
+Benchmark - czas pracy bazy danych na jedną turę czatu (POST /api/chat/)
+Porównuje dawną sekwencję zapytań (5 SELECT + 3-4 COMMIT) z obecną
+(_load_chat_context + jeden COMMIT na końcu tury). Wywołanie LLM jest pominięte.
+
+Uruchom z katalogu głównego repozytorium: python benchmarks/bench_chat_db.py [--turns 200]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_chat_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("UPLOAD_FOLDER", os.path.join(DB_DIR, "reports"))
+
+from sqlalchemy import select  # noqa: E402
+
+from app.database.database import (  # noqa: E402
+    async_session_maker, engine, init_db, Company, Report, ChatSession, ChatHistory
+)
+from app.models.schemas import MessageRole  # noqa: E402
+from app.api.chat import _load_chat_context, _add_turn_messages  # noqa: E402
+from app.services.container import services  # noqa: E402
+
+
+async def seed(reports_count: int) -> int:
+    async with async_session_maker() as db:
+        company = Company(name="Benchmark SA", industry="Benchmark")
+        db.add(company)
+        await db.flush()
+        for i in range(reports_count):
+            db.add(Report(
+                filename=f"bench_{i}.pdf",
+                original_filename=f"bench_{i}.pdf",
+                company_id=company.id,
+                company_name=company.name,
+                report_period=f"Q{i % 4 + 1} {2020 + i // 4}",
+                report_year=2020 + i // 4,
+                report_quarter=i % 4 + 1,
+                report_type="quarterly",
+                file_size=1000,
+                file_path="",
+                extracted_text="Przychody ze sprzedaży 1 234 mln PLN. " * 200,
+                key_metrics={"revenue": 1000.0 + i, "net_income": 100.0 + i},
+                status="processed"
+            ))
+        await db.commit()
+        return company.id
+
+
+async def legacy_turn(session_id, company_id: int, message: str) -> str:
+    """Dawny przebieg endpointu czatu (bez wywołania LLM)"""
+    async with async_session_maker() as db:
+        if not session_id:
+            session_id = str(uuid.uuid4())
+            db.add(ChatSession(session_id=session_id, company_id=company_id))
+            await db.commit()
+        else:
+            result = await db.execute(select(ChatSession).where(ChatSession.session_id == session_id))
+            session = result.scalar_one_or_none()
+            if session and session.company_id != company_id:
+                session.company_id = company_id
+                await db.commit()
+
+        session_result = await db.execute(select(ChatSession).where(ChatSession.session_id == session_id))
+        session_result.scalar_one_or_none()
+        company_res = await db.execute(select(Company).where(Company.id == company_id))
+        company_res.scalar_one_or_none()
+        report_res = await db.execute(
+            select(Report)
+            .where(Report.company_id == company_id)
+            .where(Report.status == "processed")
+            .order_by(Report.upload_date.desc())
+        )
+        report_res.scalars().all()
+        history_result = await db.execute(
+            select(ChatHistory)
+            .where(ChatHistory.session_id == session_id)
+            .order_by(ChatHistory.timestamp.asc())
+        )
+        history_result.scalars().all()
+
+        db.add(ChatHistory(session_id=session_id, role=MessageRole.USER.value, content=message))
+        await db.commit()
+        db.add(ChatHistory(session_id=session_id, role=MessageRole.ASSISTANT.value, content="odpowiedź"))
+        await db.commit()
+        return session_id
+
+
+async def current_turn(session_id, company_id: int, message: str) -> str:
+    """Obecny przebieg: trzy zapytania i jeden COMMIT"""
+    async with async_session_maker() as db:
+        user_timestamp = datetime.utcnow()
+        context = await _load_chat_context(db, services, session_id, company_id)
+        _add_turn_messages(db, context["session_id"], message, user_timestamp, "odpowiedź")
+        await db.commit()
+        return context["session_id"]
+
+
+async def run(turn_fn, company_id: int, turns: int, turns_per_session: int) -> float:
+    timings = []
+    session_id = None
+    for i in range(turns):
+        if i % turns_per_session == 0:
+            session_id = None
+        start = time.perf_counter()
+        session_id = await turn_fn(session_id, company_id, f"Pytanie {i}")
+        timings.append(time.perf_counter() - start)
+    return sum(timings) / len(timings) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Chat turn DB benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--reports", type=int, default=12)
+    parser.add_argument("--turns-per-session", type=int, default=10)
+    args = parser.parse_args()
+
+    await init_db()
+    company_id = await seed(args.reports)
+
+    # Rozgrzewka (połączenia, kompilacja zapytań)
+    await run(legacy_turn, company_id, 10, args.turns_per_session)
+    await run(current_turn, company_id, 10, args.turns_per_session)
+
+    legacy_ms = await run(legacy_turn, company_id, args.turns, args.turns_per_session)
+    current_ms = await run(current_turn, company_id, args.turns, args.turns_per_session)
+
+    print("=" * 60)
+    print("CHAT TURN - DB TIME PER TURN")
+    print("=" * 60)
+    print(f"Turns: {args.turns}, reports: {args.reports}, turns/session: {args.turns_per_session}")
+    print(f"Legacy  (5 SELECT, 3-4 COMMIT): {legacy_ms:8.2f} ms/turn")
+    print(f"Current (<=3 SELECT, 1 COMMIT): {current_ms:8.2f} ms/turn")
+    if current_ms > 0:
+        print(f"Speedup: {legacy_ms / current_ms:.2f}x")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    finally:
+        shutil.rmtree(DB_DIR, ignore_errors=True)
@@ -0,0 +1,263 @@
+"""
+Test obciążeniowy całego API - asyncio + httpx, mieszanka operacji jak
+w realnym ruchu: lista firm, szczegóły firmy, dane wykresów, tury czatu
+i upload raportów PDF (syntetycznych, benchmarks/pdf_corpus.py).
+
+Tryby:
+  - w procesie (domyślnie): aplikacja przez httpx.ASGITransport, świeża baza
+    w katalogu tymczasowym, LLM_BACKEND=stub z opóźnieniem --llm-latency-ms;
+  - po HTTP (--url): działający serwer, uruchomiony z LLM_BACKEND=stub.
+
+Raport: przepustowość i opóźnienia p50/p95/p99 per operacja oraz błędy.
+Wynik można zapisać (--json) i porównywać między wersjami / liczbą workerów.
+
+Uruchom z katalogu głównego repozytorium:
+    python benchmarks/bench_load.py [--concurrency 20] [--duration 30] [--mix list=40,chart=25,chat=20,company=10,upload=5]
+    LLM_BACKEND=stub uvicorn app.main:app --workers 4 & python benchmarks/bench_load.py --url http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+
+from pdf_corpus import NUMBER_FORMATS, make_report_pdf  # noqa: E402
+
+DEFAULT_MIX = "list=40,chart=25,chat=20,company=10,upload=5"
+CHAT_MESSAGES = (
+    "Pokaż wykres przychodów",           # odpowiedź lokalna (bez LLM)
+    "Jaki był zysk netto w ostatnim kwartale?",
+    "Jak oceniasz sytuację finansową spółki?",
+    "Porównaj wyniki z poprzednim rokiem",
+)
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip():
+            mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"unknown operations: {', '.join(sorted(unknown))} (known: {', '.join(OPERATIONS)})")
+    return mix
+
+
+class LoadState:
+    """Firmy utworzone na starcie i sesje czatu per worker"""
+
+    def __init__(self, company_ids: list, seed: int):
+        self.company_ids = company_ids
+        self.sessions = {}
+        self.upload_seq = 0
+        self.rng = random.Random(seed)
+
+
+async def op_list(client, state, worker):
+    return await client.get("/api/companies/", params={"limit": 50})
+
+
+async def op_company(client, state, worker):
+    return await client.get(f"/api/companies/{state.rng.choice(state.company_ids)}")
+
+
+async def op_chart(client, state, worker):
+    return await client.get(f"/api/analytics/chart-data/{state.rng.choice(state.company_ids)}")
+
+
+async def op_chat(client, state, worker):
+    company_id = state.rng.choice(state.company_ids)
+    payload = {"message": state.rng.choice(CHAT_MESSAGES), "company_id": company_id}
+    session_id = state.sessions.get((worker, company_id))
+    if session_id:
+        payload["session_id"] = session_id
+    response = await client.post("/api/chat/", json=payload)
+    if response.status_code == 200:
+        state.sessions[(worker, company_id)] = response.json().get("session_id")
+    return response
+
+
+async def op_upload(client, state, worker):
+    state.upload_seq += 1
+    pdf, _ = make_report_pdf(
+        pages=state.rng.choice((2, 5, 10)), tables_per_page=1,
+        number_format=state.rng.choice(NUMBER_FORMATS), seed=state.upload_seq
+    )
+    return await client.post(
+        "/api/reports/upload",
+        files={"file": (f"load_{state.upload_seq}.pdf", pdf, "application/pdf")},
+        data={"company_id": str(state.rng.choice(state.company_ids))},
+    )
+
+
+OPERATIONS = {
+    "list": op_list,
+    "company": op_company,
+    "chart": op_chart,
+    "chat": op_chat,
+    "upload": op_upload,
+}
+
+
+async def seed_companies(client, count: int, reports_per_company: int) -> list:
+    """Companies with a few quarterly reports each, so charts and chat have data"""
+    run_id = int(time.time())
+    company_ids = []
+    for i in range(count):
+        response = await client.post("/api/companies/", json={"name": f"Load Test {run_id}-{i}", "industry": "Przemysł"})
+        response.raise_for_status()
+        company_id = response.json()["id"]
+        company_ids.append(company_id)
+        for seed in range(reports_per_company):
+            pdf, _ = make_report_pdf(pages=2, tables_per_page=0, number_format="dot", seed=i * 100 + seed)
+            response = await client.post(
+                "/api/reports/upload",
+                files={"file": (f"seed_{i}_{seed}.pdf", pdf, "application/pdf")},
+                data={"company_id": str(company_id)},
+            )
+            response.raise_for_status()
+    return company_ids
+
+
+async def worker(worker_id: int, client, state, mix: dict, deadline: float, budget: list, samples: dict):
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        if budget is not None:
+            if budget[0] <= 0:
+                return
+            budget[0] -= 1
+        name = state.rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await OPERATIONS[name](client, state, worker_id)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        samples[name].append((time.perf_counter() - start, ok))
+
+
+@asynccontextmanager
+async def make_client(args):
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+            yield client
+        return
+
+    # W procesie: świeża baza i stub LLM, ustawione przed importem aplikacji
+    with tempfile.TemporaryDirectory(prefix="bench_load_") as workdir:
+        async with _in_process_client(args, workdir) as client:
+            yield client
+
+
+@asynccontextmanager
+async def _in_process_client(args, workdir: str):
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(workdir, 'load.db')}"
+    os.environ["UPLOAD_FOLDER"] = os.path.join(workdir, "reports")
+    os.environ["LLM_BACKEND"] = "stub"
+    os.environ["LLM_STUB_LATENCY_MS"] = str(args.llm_latency_ms)
+    from app.main import app
+
+    # Wolne zapytania i blokady pętli pod obciążeniem zalałyby raport - tu liczą się /metrics
+    logging.getLogger("app.monitoring").setLevel(logging.ERROR)
+    async with app.router.lifespan_context(app):
+        # Wyjątki aplikacji jako odpowiedzi 500 (błąd w raporcie), a nie przerwanie testu
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=args.timeout) as client:
+            yield client
+
+
+def report(samples: dict, elapsed: float, args) -> dict:
+    results = {}
+    for name, entries in sorted(samples.items()):
+        latencies = sorted(seconds for seconds, _ in entries)
+        errors = sum(1 for _, ok in entries if not ok)
+        results[name] = {
+            "requests": len(entries),
+            "errors": errors,
+            "rps": len(entries) / elapsed,
+            "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+            **{f"p{q}_ms": percentile(latencies, q) * 1000 for q in (50, 95, 99)},
+            "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        }
+    total = sum(r["requests"] for r in results.values())
+    total_errors = sum(r["errors"] for r in results.values())
+
+    target = args.url or f"in-process (stub LLM {args.llm_latency_ms:g} ms)"
+    print("=" * 88)
+    print(f"Load test: {target}, concurrency {args.concurrency}, {elapsed:.1f} s")
+    print("=" * 88)
+    print(f"{'operation':<10} {'requests':>9} {'errors':>7} {'req/s':>8} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['requests']:>9} {r['errors']:>7} {r['rps']:>8.1f} {r['mean_ms']:>7.1f}ms "
+              f"{r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms {r['p99_ms']:>7.1f}ms {r['max_ms']:>7.1f}ms")
+    print("-" * 88)
+    print(f"{'total':<10} {total:>9} {total_errors:>7} {total / elapsed:>8.1f}")
+    return {"target": target, "concurrency": args.concurrency, "elapsed_s": elapsed, "operations": results}
+
+
+async def run(args) -> dict:
+    mix = parse_mix(args.mix)
+    async with make_client(args) as client:
+        company_ids = await seed_companies(client, args.companies, args.reports)
+        state = LoadState(company_ids, args.seed)
+        samples = defaultdict(list)
+        budget = [args.requests] if args.requests else None
+        start = time.perf_counter()
+        deadline = start + args.duration if not args.requests else float("inf")
+        await asyncio.gather(*(
+            worker(i, client, state, mix, deadline, budget, samples) for i in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+    return report(samples, elapsed, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async load test of the API with a stub LLM")
+    parser.add_argument("--url", default=None, help="drive a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests instead of --duration")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--companies", type=int, default=5, help="companies created before the test")
+    parser.add_argument("--reports", type=int, default=4, help="reports uploaded per company before the test")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="stub LLM latency (in-process mode)")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, metavar="PATH", help="write results as JSON")
+    args = parser.parse_args()
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
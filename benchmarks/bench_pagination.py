@@ -0,0 +1,125 @@
+"""
+Benchmark - stronicowanie offset vs keyset (cursor) dla GET /api/reports/
+i GET /api/chat/history/{session_id} przy dużej liczbie wierszy.
+
+Uruchom z katalogu głównego repozytorium:
+    python benchmarks/bench_pagination.py [--reports 100000] [--messages 200000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_pagination_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("UPLOAD_FOLDER", os.path.join(DB_DIR, "reports"))
+
+import sqlite3  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.api.pagination import encode_cursor  # noqa: E402
+
+BATCH = 10000
+
+
+def seed(db_path: str, reports: int, messages: int) -> None:
+    conn = sqlite3.connect(db_path)
+    start = datetime(2020, 1, 1)
+    conn.executemany(
+        "INSERT INTO companies (id, name) VALUES (?, ?)",
+        [(i, f"Company {i:05d}") for i in range(1, 101)]
+    )
+    for offset in range(0, reports, BATCH):
+        conn.executemany(
+            "INSERT INTO reports (company_id, filename, original_filename, upload_date, "
+            "file_size, file_path, status, report_year, report_quarter, period_ordinal) "
+            "VALUES (?, 'f.pdf', 'f.pdf', ?, 1000, '', 'processed', ?, ?, ?)",
+            [
+                (i % 100 + 1, (start + timedelta(minutes=i)).isoformat(" "),
+                 2000 + i % 25, i % 4 + 1, (2000 + i % 25) * 10 + i % 4 + 1)
+                for i in range(offset, min(offset + BATCH, reports))
+            ]
+        )
+    conn.execute("INSERT INTO chat_sessions (session_id, company_id) VALUES ('bench', 1)")
+    for offset in range(0, messages, BATCH):
+        conn.executemany(
+            "INSERT INTO chat_history (session_id, role, content, timestamp) VALUES ('bench', ?, ?, ?)",
+            [
+                ("user" if i % 2 == 0 else "assistant", f"Wiadomość {i}",
+                 (start + timedelta(seconds=i)).isoformat(" "))
+                for i in range(offset, min(offset + BATCH, messages))
+            ]
+        )
+    conn.commit()
+    conn.close()
+
+
+def timed_get(client: TestClient, url: str, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        best = min(best, time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+    return best * 1000
+
+
+def row_at_depth(db_path: str, query: str, depth: int):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(query + " LIMIT 1 OFFSET ?", (depth - 1,)).fetchone()
+    conn.close()
+    return datetime.fromisoformat(row[0]), row[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offset vs keyset pagination benchmark")
+    parser.add_argument("--reports", type=int, default=100000)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    db_path = os.path.join(DB_DIR, "bench.db")
+    with TestClient(app) as client:
+        seed(db_path, args.reports, args.messages)
+
+        print("=" * 60)
+        print(f"GET /api/reports/ - {args.reports} reports, page size {args.limit}")
+        print("=" * 60)
+        print(f"{'depth':>10} {'offset ms':>12} {'keyset ms':>12}")
+        for depth in (args.limit, args.reports // 10, args.reports // 2, args.reports - args.limit):
+            offset_ms = timed_get(client, f"/api/reports/?limit={args.limit}&skip={depth}")
+            cursor = encode_cursor(*row_at_depth(
+                db_path, "SELECT upload_date, id FROM reports ORDER BY upload_date DESC, id DESC", depth
+            ))
+            keyset_ms = timed_get(client, f"/api/reports/?limit={args.limit}&cursor={cursor}")
+            print(f"{depth:>10} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+
+        print()
+        print("=" * 60)
+        print(f"GET /api/chat/history/ - {args.messages} messages, page size {args.limit}")
+        print("=" * 60)
+        print(f"{'depth':>10} {'keyset ms':>12}")
+        for depth in (args.limit, args.messages // 2, args.messages - args.limit):
+            cursor = encode_cursor(*row_at_depth(
+                db_path,
+                "SELECT timestamp, id FROM chat_history WHERE session_id = 'bench' "
+                "ORDER BY timestamp DESC, id DESC",
+                depth
+            ))
+            keyset_ms = timed_get(client, f"/api/chat/history/bench?limit={args.limit}&cursor={cursor}")
+            print(f"{depth:>10} {keyset_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        shutil.rmtree(DB_DIR, ignore_errors=True)
@@ -0,0 +1,226 @@
+"""
+Benchmark - ingestia PDF (PDFProcessor.process_report) na syntetycznym
+korpusie polskich raportów (benchmarks/pdf_corpus.py).
+
+Dla każdego scenariusza (liczba stron, gęstość tabel) i formatu liczb:
+przepustowość (dokumenty/s, strony/s, MB/s), czas na dokument z podziałem
+na etapy (pdf_parse, regex_extract, pdf_tables - metryki z app.monitoring),
+szczytowa pamięć (tracemalloc, osobny przebieg na jednym dokumencie) oraz
+poprawność ekstrakcji wskaźników i okresu względem wartości wpisanych do PDF.
+
+Wyniki można zapisać jako bazowe i porównywać z nimi kolejne przebiegi -
+regresja (czas/pamięć gorsze o więcej niż --tolerance lub spadek
+poprawności) kończy skrypt kodem 1.
+
+Uruchom z katalogu głównego repozytorium:
+    python benchmarks/bench_pdf_ingestion.py [--quick] [--save-baseline benchmarks/baselines/pdf_ingestion.json]
+    python benchmarks/bench_pdf_ingestion.py --baseline benchmarks/baselines/pdf_ingestion.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_corpus import NUMBER_FORMATS, make_report_pdf  # noqa: E402
+
+from app.monitoring.metrics import STAGE_LATENCY  # noqa: E402
+from app.services.pdf_processor import PDFProcessor  # noqa: E402
+
+# nazwa -> (strony, tabele na stronę)
+SCENARIOS = {
+    "short": (2, 0),
+    "quarterly": (10, 1),
+    "table-heavy": (10, 4),
+    "annual": (40, 2),
+}
+STAGES = ("pdf_parse", "regex_extract", "pdf_tables")
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "pdf_ingestion.json")
+
+# Kierunek porównania z wynikiem bazowym; poprawność nie może spaść wcale
+LOWER_IS_BETTER = ("ms_per_doc", "peak_kib", *(f"{stage}_ms" for stage in STAGES))
+HIGHER_IS_BETTER = ("pages_per_s",)
+ACCURACY = ("metrics_accuracy", "period_accuracy")
+
+
+def build_corpus(directory: str, pages: int, tables: int, docs_per_format: int, formats) -> list:
+    """[(path, number_format, expected)] written to directory"""
+    corpus = []
+    for number_format in formats:
+        for seed in range(docs_per_format):
+            pdf, expected = make_report_pdf(pages, tables, number_format, seed=seed)
+            path = os.path.join(directory, f"{pages}p_{tables}t_{number_format}_{seed}.pdf")
+            with open(path, "wb") as f:
+                f.write(pdf)
+            corpus.append((path, number_format, expected))
+    return corpus
+
+
+def stage_totals() -> dict:
+    return {stage: STAGE_LATENCY.total(stage=stage) for stage in STAGES}
+
+
+def check(result: dict, expected: dict) -> tuple:
+    """(correct metrics, expected metrics, period correct)"""
+    correct = sum(
+        1 for name, value in expected["metrics"].items()
+        if result["metrics"].get(name) is not None and abs(result["metrics"][name] - value) <= abs(value) * 1e-6
+    )
+    return correct, len(expected["metrics"]), result["report_period"] == expected["period"]
+
+
+def run_scenario(processor: PDFProcessor, corpus: list, repeat: int) -> tuple:
+    total_bytes = sum(os.path.getsize(path) for path, _, _ in corpus)
+    total_pages = sum(expected["pages"] for _, _, expected in corpus)
+
+    # Czas: mediana z powtórzeń całego korpusu, bez tracemalloc; poprawność z pierwszego przebiegu
+    runs, stage_runs, accuracy = [], [], {}
+    for run in range(repeat):
+        before = stage_totals()
+        start = time.perf_counter()
+        results = [processor.process_report(path) for path, _, _ in corpus]
+        runs.append(time.perf_counter() - start)
+        after = stage_totals()
+        stage_runs.append({stage: after[stage] - before[stage] for stage in STAGES})
+        if run == 0:
+            for (_, number_format, expected), result in zip(corpus, results):
+                correct, total, period_ok = check(result, expected)
+                stats = accuracy.setdefault(number_format, [0, 0, 0, 0])
+                stats[0] += correct
+                stats[1] += total
+                stats[2] += period_ok
+                stats[3] += 1
+    seconds = statistics.median(runs)
+    stage_seconds = {stage: statistics.median(run[stage] for run in stage_runs) for stage in STAGES}
+
+    # Pamięć: osobny przebieg pod tracemalloc (kilkukrotnie wolniejszy) na jednym dokumencie
+    tracemalloc.start()
+    try:
+        processor.process_report(corpus[0][0])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    docs = len(corpus)
+    summary = {
+        "docs": docs,
+        "pages": total_pages,
+        "ms_per_doc": seconds / docs * 1000,
+        "pages_per_s": total_pages / seconds,
+        "mb_per_s": total_bytes / seconds / 1_000_000,
+        "peak_kib": peak / 1024,
+        **{f"{stage}_ms": stage_seconds[stage] / docs * 1000 for stage in STAGES},
+        "metrics_accuracy": sum(s[0] for s in accuracy.values()) / sum(s[1] for s in accuracy.values()),
+        "period_accuracy": sum(s[2] for s in accuracy.values()) / sum(s[3] for s in accuracy.values()),
+    }
+    by_format = {fmt: s[0] / s[1] for fmt, s in accuracy.items()}
+    return summary, by_format
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Human-readable regressions of results against a baseline file"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        for metric in LOWER_IS_BETTER:
+            if base.get(metric) and current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {base[metric]:.2f} -> {current[metric]:.2f}")
+        for metric in HIGHER_IS_BETTER:
+            if base.get(metric) and current[metric] < base[metric] * (1 - tolerance):
+                regressions.append(f"{name}: {metric} {base[metric]:.2f} -> {current[metric]:.2f}")
+        for metric in ACCURACY:
+            if metric in base and current[metric] < base[metric] - 1e-9:
+                regressions.append(f"{name}: {metric} {base[metric]:.0%} -> {current[metric]:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF ingestion benchmark on a synthetic report corpus")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated: " + ", ".join(SCENARIOS))
+    parser.add_argument("--formats", default=",".join(NUMBER_FORMATS), help="number formats in the corpus")
+    parser.add_argument("--docs", type=int, default=2, help="documents per scenario and number format")
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--quick", action="store_true", help="1 document per format, 1 repeat")
+    parser.add_argument("--baseline", default=None, help=f"compare with a stored baseline (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", default=None, metavar="PATH", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown / memory growth (0.25 = 25%%)")
+    args = parser.parse_args()
+    if args.quick:
+        args.docs, args.repeat = 1, 1
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS] + [fmt for fmt in formats if fmt not in NUMBER_FORMATS]
+    if unknown:
+        parser.error(f"unknown scenario/format: {', '.join(unknown)}")
+
+    processor = PDFProcessor()
+    results, accuracy_by_format = {}, {}
+    with tempfile.TemporaryDirectory(prefix="bench_pdf_") as workdir:
+        # Rozgrzewka - import PyPDF2/pdfplumber poza pomiarem
+        warmup = build_corpus(workdir, 1, 1, 1, ["space"])
+        processor.process_report(warmup[0][0])
+
+        for name in scenarios:
+            pages, tables = SCENARIOS[name]
+            corpus = build_corpus(workdir, pages, tables, args.docs, formats)
+            results[name], accuracy_by_format[name] = run_scenario(processor, corpus, args.repeat)
+
+    print("=" * 100)
+    print(f"PDF ingestion - {args.docs} doc(s) per format x {len(formats)} formats, median of {args.repeat}")
+    print("=" * 100)
+    print(f"{'scenario':<12} {'pages':>6} {'ms/doc':>9} {'pages/s':>9} {'MB/s':>7} {'peak KiB':>9} "
+          f"{'parse':>8} {'regex':>8} {'tables':>8} {'metrics':>8} {'period':>7}")
+    for name, r in results.items():
+        pages, tables = SCENARIOS[name]
+        print(f"{name:<12} {pages:>6} {r['ms_per_doc']:>9.1f} {r['pages_per_s']:>9.1f} {r['mb_per_s']:>7.2f} "
+              f"{r['peak_kib']:>9.0f} {r['pdf_parse_ms']:>8.1f} {r['regex_extract_ms']:>8.2f} "
+              f"{r['pdf_tables_ms']:>8.1f} {r['metrics_accuracy']:>8.0%} {r['period_accuracy']:>7.0%}")
+    print()
+    print("Metric extraction accuracy by number format:")
+    for name, by_format in accuracy_by_format.items():
+        print(f"  {name:<12} " + "  ".join(f"{fmt}: {value:.0%}" for fmt, value in by_format.items()))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "docs": args.docs,
+                "formats": formats,
+                "scenarios": results,
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(f"baseline not found: {args.baseline}")
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if not os.path.exists(baseline_path):
+        print(f"\nNo baseline at {baseline_path} - regression check skipped (create one with --save-baseline)")
+    elif os.path.abspath(baseline_path) != os.path.abspath(args.save_baseline or ""):
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"\nCompared with {baseline_path} (tolerance {args.tolerance:.0%}):")
+        if regressions:
+            for line in regressions:
+                print(f"  REGRESSION {line}")
+            sys.exit(1)
+        print("  no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark - serializacja dużych list: dotychczasowa ścieżka (obiekty ORM ->
+model pydantic na wiersz -> walidacja i serializacja przez response_model)
+vs szybka ścieżka (krotki kolumn -> dict -> bajty JSON, app/api/serialization.py).
+
+Obie ścieżki liczone razem z odczytem z bazy, bez warstwy HTTP.
+
+Uruchom z katalogu głównego repozytorium:
+    python benchmarks/bench_serialization.py [--rows 1000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_serialization_")
+DB_PATH = os.path.join(DB_DIR, "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("UPLOAD_FOLDER", os.path.join(DB_DIR, "reports"))
+
+import sqlite3  # noqa: E402
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.database.database import init_db, async_session_maker, Company, Report, ChatHistory  # noqa: E402
+from app.models.schemas import CompanyResponse, ReportInfo, ChatMessage, MessageRole  # noqa: E402
+from app.api import serialization  # noqa: E402
+from app.api.serialization import (  # noqa: E402
+    COMPANY_COLUMNS, REPORT_INFO_COLUMNS, CHAT_MESSAGE_COLUMNS,
+    company_row, report_info_row, chat_message_row, dumps
+)
+from app.services.periods import period_label  # noqa: E402
+
+METRICS = {"revenue": 1234567.0, "net_income": 234567.5, "operating_income": 345678.25, "total_assets": 9876543.0}
+
+
+def seed(rows: int) -> None:
+    conn = sqlite3.connect(DB_PATH)
+    start = datetime(2020, 1, 1)
+    conn.executemany(
+        "INSERT INTO companies (id, name, ticker, industry, description, created_at, updated_at, "
+        "reports_count, latest_period_ordinal, latest_key_metrics, last_upload_at) "
+        "VALUES (?, ?, ?, 'Tech', 'Spółka testowa', ?, ?, 4, 20244, ?, ?)",
+        [
+            (i, f"Company {i:05d}", f"C{i}", start.isoformat(" "), start.isoformat(" "),
+             str(METRICS).replace("'", '"'), start.isoformat(" "))
+            for i in range(1, rows + 1)
+        ]
+    )
+    conn.executemany(
+        "INSERT INTO reports (company_id, filename, original_filename, upload_date, file_size, file_path, "
+        "status, report_type, report_period, report_year, report_quarter, period_ordinal) "
+        "VALUES (?, 'f.pdf', 'raport.pdf', ?, 1000, '', 'processed', 'quarterly', ?, ?, ?, ?)",
+        [
+            (i % 100 + 1, (start + timedelta(minutes=i)).isoformat(" "), f"Q{i % 4 + 1} {2000 + i % 25}",
+             2000 + i % 25, i % 4 + 1, (2000 + i % 25) * 10 + i % 4 + 1)
+            for i in range(rows)
+        ]
+    )
+    conn.execute("INSERT INTO chat_sessions (session_id, company_id) VALUES ('bench', 1)")
+    conn.executemany(
+        "INSERT INTO chat_history (session_id, role, content, timestamp) VALUES ('bench', ?, ?, ?)",
+        [
+            ("user" if i % 2 == 0 else "assistant", f"Wiadomość {i}: " + "Przychody wzrosły o 12% r/r. " * 10,
+             (start + timedelta(seconds=i)).isoformat(" "))
+            for i in range(rows)
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+
+def serialize_response_model(adapter: TypeAdapter, models: list) -> bytes:
+    """What FastAPI does with a response_model: validate, then dump to JSON"""
+    return adapter.dump_json(adapter.validate_python(models))
+
+
+async def current_companies(db, adapter):
+    companies = (await db.execute(select(Company).order_by(Company.name))).scalars().all()
+    models = [
+        CompanyResponse(
+            id=c.id, name=c.name, ticker=c.ticker, description=c.description, industry=c.industry,
+            created_at=c.created_at, updated_at=c.updated_at, reports_count=c.reports_count or 0,
+            latest_period=period_label(c.latest_period_ordinal) if c.latest_period_ordinal else None,
+            latest_key_metrics=c.latest_key_metrics, last_upload_at=c.last_upload_at
+        )
+        for c in companies
+    ]
+    return serialize_response_model(adapter, models)
+
+
+async def fast_companies(db, adapter):
+    rows = (await db.execute(select(*COMPANY_COLUMNS).order_by(Company.name))).all()
+    return dumps([company_row(row) for row in rows])
+
+
+async def current_reports(db, adapter):
+    reports = (await db.execute(select(Report).order_by(Report.upload_date.desc(), Report.id.desc()))).scalars().all()
+    models = [
+        ReportInfo(
+            id=r.id, company_id=r.company_id, filename=r.original_filename, report_type=r.report_type,
+            report_period=r.report_period, report_year=r.report_year, report_quarter=r.report_quarter,
+            upload_date=r.upload_date, file_size=r.file_size, status=r.status
+        )
+        for r in reports
+    ]
+    return serialize_response_model(adapter, models)
+
+
+async def fast_reports(db, adapter):
+    rows = (await db.execute(
+        select(*REPORT_INFO_COLUMNS).order_by(Report.upload_date.desc(), Report.id.desc())
+    )).all()
+    return dumps([report_info_row(row) for row in rows])
+
+
+async def current_history(db, adapter):
+    history = (await db.execute(
+        select(ChatHistory).where(ChatHistory.session_id == "bench")
+        .order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc())
+    )).scalars().all()
+    models = [
+        ChatMessage(role=MessageRole(m.role), content=m.content, timestamp=m.timestamp)
+        for m in reversed(history)
+    ]
+    return serialize_response_model(adapter, models)
+
+
+async def fast_history(db, adapter):
+    rows = (await db.execute(
+        select(*CHAT_MESSAGE_COLUMNS).where(ChatHistory.session_id == "bench")
+        .order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc())
+    )).all()
+    return dumps([chat_message_row(row) for row in reversed(rows)])
+
+
+async def best_of(fn, adapter, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        async with async_session_maker() as db:
+            start = time.perf_counter()
+            await fn(db, adapter)
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def run(rows: int, repeat: int) -> None:
+    await init_db()
+    seed(rows)
+
+    cases = [
+        ("companies", TypeAdapter(List[CompanyResponse]), current_companies, fast_companies),
+        ("reports", TypeAdapter(List[ReportInfo]), current_reports, fast_reports),
+        ("chat history", TypeAdapter(List[ChatMessage]), current_history, fast_history),
+    ]
+    encoder = "orjson" if serialization.orjson is not None else "json (stdlib fallback)"
+    print("=" * 64)
+    print(f"{rows} rows per list, best of {repeat}, encoder: {encoder}")
+    print("=" * 64)
+    print(f"{'list':<16} {'current':>12} {'fast':>12} {'speedup':>10}")
+    for name, adapter, current, fast in cases:
+        async with async_session_maker() as db:
+            assert await current(db, adapter) == await fast(db, adapter), f"{name}: outputs differ"
+        current_ms = await best_of(current, adapter, repeat)
+        fast_ms = await best_of(fast, adapter, repeat)
+        print(f"{name:<16} {current_ms:>9.2f} ms {fast_ms:>9.2f} ms {current_ms / fast_ms:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List endpoint serialization benchmark")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        shutil.rmtree(DB_DIR, ignore_errors=True)
@@ -0,0 +1,102 @@
+"""
+Benchmark - czas startu aplikacji: import app.main w świeżym interpreterze,
+start (lifespan) + pierwsze żądanie oraz moduły o najdłuższym imporcie.
+
+Ciężkie zależności (google.generativeai, biblioteki PDF) powinny być
+importowane dopiero przy pierwszym użyciu - skrypt sprawdza, czy nie
+zostały załadowane przy starcie. Działa bez GEMINI_API_KEY.
+
+Uruchom z katalogu głównego repozytorium:
+    python benchmarks/bench_startup.py [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ("google.generativeai", "pdfplumber", "PyPDF2")
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+print(",".join(m for m in {lazy!r} if m in sys.modules))
+"""
+
+FIRST_REQUEST_SNIPPET = """
+import time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+with TestClient(app) as client:
+    client.get("/health")
+    elapsed = time.perf_counter() - start
+print(elapsed)
+"""
+
+
+def run_python(code: str, env: dict, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def bench_env(workdir: str) -> dict:
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    env["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}"
+    env["UPLOAD_FOLDER"] = os.path.join(workdir, "reports")
+    return env
+
+
+def top_imports(env: dict, top: int) -> list:
+    """(cumulative ms, module) of the slowest top-level imports under app.main"""
+    stderr = run_python("import app.main", env, "-X", "importtime").stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        if "." not in name or name.startswith("app."):
+            rows.append((int(cumulative_us) / 1000, name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Application startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as workdir:
+        env = bench_env(workdir)
+
+        import_times, loaded = [], set()
+        for _ in range(args.runs):
+            seconds, modules = run_python(IMPORT_SNIPPET.format(lazy=LAZY_MODULES), env).stdout.splitlines()[-2:]
+            import_times.append(float(seconds) * 1000)
+            loaded.update(filter(None, modules.split(",")))
+
+        ready_times = [
+            float(run_python(FIRST_REQUEST_SNIPPET, env).stdout.splitlines()[-1]) * 1000
+            for _ in range(args.runs)
+        ]
+        slowest = top_imports(env, args.top)
+
+    print("=" * 60)
+    print(f"Startup, median of {args.runs} fresh interpreters (no GEMINI_API_KEY)")
+    print("=" * 60)
+    print(f"{'import app.main':<32} {statistics.median(import_times):>10.1f} ms")
+    print(f"{'startup + first request':<32} {statistics.median(ready_times):>10.1f} ms")
+    print(f"{'heavy modules loaded at import':<32} {', '.join(sorted(loaded)) or 'none':>10}")
+    print()
+    print("Slowest imports (cumulative):")
+    for ms, name in slowest:
+        print(f"  {name:<40} {ms:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark - silnik szeregów czasowych (TimeSeriesPanel) dla wielu firm naraz:
+budowa panelu z punktów metryk + wszystkie metryki pochodne + CAGR.
+
+Uruchom z katalogu głównego repozytorium:
+    python benchmarks/bench_timeseries.py [--companies 500] [--years 10]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from app.services.timeseries_service import TimeSeriesPanel  # noqa: E402
+
+METRICS = ("revenue", "net_income", "operating_income", "total_assets", "equity")
+
+
+def make_points(companies: int, years: int) -> list:
+    """(company_id, period_ordinal, metric_name, value) in chronological order; every 4th year annual-only Q4"""
+    rng = random.Random(42)
+    points = []
+    for year in range(2015, 2015 + years):
+        for slot in (1, 2, 3, 4, 5):
+            for company_id in range(1, companies + 1):
+                if slot == 4 and year % 4 == 0:
+                    continue
+                for metric in METRICS:
+                    scale = 4 if slot == 5 and metric in ("revenue", "net_income", "operating_income") else 1
+                    points.append((company_id, year * 10 + slot, metric, rng.uniform(50, 150) * company_id * scale))
+    return points
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized time-series engine benchmark")
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    points = make_points(args.companies, args.years)
+    panel = TimeSeriesPanel.from_points(points)
+
+    build_ms = best_of(lambda: TimeSeriesPanel.from_points(points))
+    derive_ms = best_of(lambda: panel.derive_all())
+    cagr_ms = best_of(lambda: [panel.cagr(metric) for metric in METRICS])
+
+    print("=" * 60)
+    print(f"{args.companies} companies x {args.years * 4} quarters x {len(METRICS)} metrics "
+          f"({len(points)} points)")
+    print("=" * 60)
+    print(f"{'build panel':<24} {build_ms:>10.2f} ms")
+    print(f"{'derive_all':<24} {derive_ms:>10.2f} ms")
+    print(f"{'cagr (all metrics)':<24} {cagr_ms:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Generator syntetycznych raportów finansowych PDF (po polsku) dla benchmarków.
+
+Bez zależności - PDF składany ręcznie: czcionka Helvetica z kodowaniem
+WinAnsi + /Differences dla polskich liter, tabele rysowane liniami (tak,
+żeby pdfplumber wykrył je jako tabele). Generator jest deterministyczny
+(seed) i zwraca wartości wskaźników wpisane do raportu, więc benchmark
+może sprawdzić także poprawność ekstrakcji.
+
+    from pdf_corpus import make_report_pdf
+    pdf_bytes, expected = make_report_pdf(pages=10, tables_per_page=1, number_format="space")
+"""
+import random
+from typing import Dict, List, Tuple
+
+NUMBER_FORMATS = ("space", "dot", "comma", "plain")
+UNITS = {"": 1, "tys": 1_000, "mln": 1_000_000, "mld": 1_000_000_000}
+
+_POLISH = "ąćęłńśźżĄĆĘŁŃŚŹŻ"
+_GLYPHS = (
+    "aogonek cacute eogonek lslash nacute sacute zacute zdotaccent "
+    "Aogonek Cacute Eogonek Lslash Nacute Sacute Zacute Zdotaccent"
+).split()
+_ENCODING = {char: bytes([0x80 + i]) for i, char in enumerate(_POLISH)}
+_ENCODING.update({"ó": b"\xf3", "Ó": b"\xd3"})  # są w WinAnsi
+_FONT = (
+    "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding << /Type /Encoding "
+    "/BaseEncoding /WinAnsiEncoding /Differences [128 " + " ".join("/" + g for g in _GLYPHS) + "] >> >>"
+).encode("ascii")
+
+_PAGE_WIDTH, _PAGE_HEIGHT = 595, 842
+_MARGIN, _LEADING = 50, 13
+
+COMPANIES = ("Mostostal", "Polimex", "Zakłady Azotowe", "Żywiec", "Energa", "Łódzkie Młyny", "Ślęża Invest")
+QUARTER_NAMES = {1: "I kwartał", 2: "II kwartał", 3: "III kwartał", 4: "IV kwartał"}
+# Tekst wypełniający - bez słów, na które reagują wzorce wskaźników
+FILLER = (
+    "W okresie sprawozdawczym Grupa kontynuowała realizację strategii rozwoju.",
+    "Zarząd ocenia sytuację płynnościową jako stabilną, a zadłużenie jako bezpieczne.",
+    "Istotne zdarzenia po dniu bilansowym zostały opisane w nocie objaśniającej.",
+    "Ryzyko kursowe jest ograniczane przez zabezpieczenia walutowe (forward, opcje).",
+    "Spółka zależna zakończyła inwestycję w nową linię produkcyjną w Łodzi.",
+    "Nakłady inwestycyjne zostały sfinansowane ze środków własnych oraz kredytu.",
+    "Wskaźnik rotacji należności uległ poprawie w porównaniu z poprzednim okresem.",
+    "Pracownicy zostali objęci programem szkoleń z zakresu bezpieczeństwa.",
+)
+TABLE_ROWS = ("Koszty sprzedanych produktów", "Koszty ogólnego zarządu", "Pozostałe koszty operacyjne",
+              "Przepływy z działalności operacyjnej", "Należności handlowe", "Zapasy")
+
+
+def _encode(text: str) -> bytes:
+    out = bytearray()
+    for char in text:
+        encoded = _ENCODING.get(char) or char.encode("ascii")
+        if encoded in (b"(", b")", b"\\"):
+            out += b"\\"
+        out += encoded
+    return bytes(out)
+
+
+def format_number(value: float, number_format: str) -> str:
+    """1234567.8 -> '1 234 567,8' (space), '1.234.567,8' (dot), '1,234,567.8' (comma), '1234567.8' (plain)"""
+    grouped = f"{value:,.1f}"
+    if number_format == "space":
+        return grouped.replace(",", " ").replace(".", ",")
+    if number_format == "dot":
+        return grouped.replace(",", "_").replace(".", ",").replace("_", ".")
+    if number_format == "comma":
+        return grouped
+    return f"{value:.1f}"
+
+
+def _metric_line(label: str, rng: random.Random, number_format: str, unit: str) -> Tuple[str, float]:
+    value = round(rng.uniform(100, 999_999), 1)
+    unit_text = f" {unit}" if unit else ""
+    return f"{label}: {format_number(value, number_format)}{unit_text} PLN", value * UNITS[unit]
+
+
+def _text_block(lines: List[str], top: float, size: int = 10) -> bytes:
+    body = b"".join(b"(" + _encode(line) + b") '\n" for line in lines)
+    return b"BT /F1 %d Tf %d %d Td %d TL\n" % (size, _MARGIN, top + _LEADING, _LEADING) + body + b"ET\n"
+
+
+def _table(rows: List[List[str]], top: float) -> bytes:
+    """Ruled grid with one text object per cell"""
+    widths = (230, 120, 120)
+    height = 18
+    x_edges = [_MARGIN]
+    for width in widths:
+        x_edges.append(x_edges[-1] + width)
+    bottom = top - height * len(rows)
+    out = bytearray(b"0.5 w\n")
+    for r in range(len(rows) + 1):
+        out += b"%d %d m %d %d l S\n" % (x_edges[0], top - r * height, x_edges[-1], top - r * height)
+    for x in x_edges:
+        out += b"%d %d m %d %d l S\n" % (x, top, x, bottom)
+    for r, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            out += b"BT /F1 8 Tf %d %d Td (" % (x_edges[c] + 4, top - r * height - 12) + _encode(cell) + b") Tj ET\n"
+    return bytes(out)
+
+
+def _table_rows(rng: random.Random, number_format: str, year: int) -> List[List[str]]:
+    rows = [["Pozycja (tys PLN)", str(year), str(year - 1)]]
+    for label in rng.sample(TABLE_ROWS, 4):
+        rows.append([label, format_number(rng.uniform(1_000, 99_999), number_format),
+                     format_number(rng.uniform(1_000, 99_999), number_format)])
+    return rows
+
+
+def _build_pdf(contents: List[bytes]) -> bytes:
+    page_count = len(contents)
+    font_id = 3
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(page_count))
+        + b"] /Count %d >>" % page_count,
+        _FONT,
+    ]
+    for i, content in enumerate(contents):
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 %d 0 R >> >> "
+            b"/Contents %d 0 R >>" % (_PAGE_WIDTH, _PAGE_HEIGHT, font_id, 5 + 2 * i)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_report_pdf(
+    pages: int = 5,
+    tables_per_page: int = 1,
+    number_format: str = "space",
+    seed: int = 0
+) -> Tuple[bytes, Dict]:
+    """Synthetic quarterly report -> (PDF bytes, expected values written into it)"""
+    if number_format not in NUMBER_FORMATS:
+        raise ValueError(f"number_format must be one of {NUMBER_FORMATS}")
+    rng = random.Random(seed)
+    company = rng.choice(COMPANIES)
+    year, quarter = rng.randint(2018, 2025), rng.randint(1, 4)
+    unit = rng.choice(tuple(UNITS))
+
+    revenue_line, revenue = _metric_line("Przychody ze sprzedaży", rng, number_format, unit)
+    income_line, net_income = _metric_line("Zysk netto", rng, number_format, unit)
+    assets_line, total_assets = _metric_line("Aktywa razem", rng, number_format, unit)
+    expected = {
+        "company": f"{company} S.A.",
+        "period": f"Q{quarter} {year}",
+        "pages": pages,
+        "tables": pages * tables_per_page,
+        "metrics": {"revenue": revenue, "net_income": net_income, "total_assets": total_assets},
+    }
+
+    lines_per_page = (_PAGE_HEIGHT - 2 * _MARGIN) // _LEADING
+    table_height = 5 * 18 + 2 * _LEADING
+    contents = []
+    for page in range(pages):
+        if page == 0:
+            header = [
+                f"Raport kwartalny {company} S.A.",
+                f"Spółka: {company} S.A.",
+                f"Okres: {QUARTER_NAMES[quarter]} Q{quarter} {year}",
+                "",
+                "Wybrane dane finansowe:",
+                revenue_line,
+                income_line,
+                assets_line,
+                "",
+            ]
+        else:
+            header = [f"{company} S.A. - raport za Q{quarter} {year}, strona {page + 1}", ""]
+
+        top = _PAGE_HEIGHT - _MARGIN
+        content = bytearray(_text_block(header, top))
+        top -= _LEADING * len(header)
+        for _ in range(tables_per_page):
+            content += _table(_table_rows(rng, number_format, year), top)
+            top -= table_height
+        filler_lines = max(int(lines_per_page - (_PAGE_HEIGHT - _MARGIN - top) / _LEADING), 0)
+        content += _text_block([rng.choice(FILLER) for _ in range(filler_lines)], top)
+        contents.append(bytes(content))
+
+    return _build_pdf(contents), expected
@@ -0,0 +1,33 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Ustawienia są czytane przy imporcie app.config - osobna baza, katalogi i stub LLM
+TEST_DIR = tempfile.mkdtemp(prefix="financial_chatbot_tests_")
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{os.path.join(TEST_DIR, 'test.db')}",
+    UPLOAD_FOLDER=os.path.join(TEST_DIR, "reports"),
+    PROFILING_DIR=os.path.join(TEST_DIR, "profiles"),
+    LLM_BACKEND="stub",
+    LOOP_WATCHDOG_ENABLED="false",
+)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def company(client, request):
+    """A fresh company named after the test"""
+    response = client.post("/api/companies/", json={"name": request.node.name, "industry": "Testy"})
+    assert response.status_code == 201
+    return response.json()
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import pytest
+
+from app.api import chat
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def _chat(client, company_id, turns):
+    session_id = None
+    for turn in range(turns):
+        payload = {"message": f"Jak oceniasz sytuację spółki? ({turn})", "company_id": company_id}
+        if session_id:
+            payload["session_id"] = session_id
+        response = client.post("/api/chat/", json=payload)
+        assert response.status_code == 200
+        session_id = response.json()["session_id"]
+    return session_id
+
+
+@pytest.fixture
+def session_id(client, company):
+    return _chat(client, company["id"], 3)
+
+
+def test_history_defaults_to_whole_session(client, company):
+    # Więcej niż jedna strona (HISTORY_PAGE_SIZE) - bez limit i cursor nic nie jest obcinane
+    session_id = _chat(client, company["id"], chat.HISTORY_PAGE_SIZE // 2 + 1)
+
+    response = client.get(f"/api/chat/history/{session_id}")
+
+    assert response.status_code == 200
+    assert len(response.json()) == chat.HISTORY_PAGE_SIZE + 2
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_history_cursor_round_trip(client, session_id):
+    full = client.get(f"/api/chat/history/{session_id}").json()
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/api/chat/history/{session_id}", params=params)
+        assert response.status_code == 200
+        pages.insert(0, response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert [len(page) for page in pages] == [2, 4]
+    assert [message for page in pages for message in page] == full
+
+
+def test_cursor_without_limit_pages(client, session_id, monkeypatch):
+    monkeypatch.setattr(chat, "HISTORY_PAGE_SIZE", 2)
+    first = client.get(f"/api/chat/history/{session_id}", params={"limit": 2})
+
+    response = client.get(f"/api/chat/history/{session_id}", params={"cursor": first.headers[NEXT_CURSOR_HEADER]})
+
+    assert len(response.json()) == 2
+    assert NEXT_CURSOR_HEADER in response.headers
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(1, 2, 3), encode_cursor({"x": 1}, 1)])
+def test_bad_cursor_is_400(client, session_id, cursor):
+    response = client.get(f"/api/chat/history/{session_id}", params={"cursor": cursor, "limit": 2})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_encodes_datetimes():
+    stamp = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(stamp, 7), 2) == [stamp, 7]
@@ -0,0 +1,37 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database.database import AppCounter, Base, Company
+from app.services.company_stats_service import COMPANIES_VERSION_COUNTER, CompanyStatsService
+
+
+async def _touch_company():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    stats = CompanyStatsService()
+    version = select(AppCounter.value).where(AppCounter.name == COMPANIES_VERSION_COUNTER)
+    try:
+        async with session_maker() as db:
+            await stats.ensure_counters(db)
+            company = Company(name="ACME SA")
+            db.add(company)
+            await db.commit()
+            before = (await db.scalar(version), company.reports_version)
+
+            await stats.touch_company(db, company.id)
+            await db.commit()
+            await db.refresh(company)
+            return before, (await db.scalar(version), company.reports_version)
+    finally:
+        await engine.dispose()
+
+
+def test_touch_company_bumps_company_list_version():
+    (version_before, reports_before), (version_after, reports_after) = asyncio.run(_touch_company())
+
+    assert reports_after == reports_before + 1
+    assert version_after == version_before + 1
@@ -0,0 +1,134 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware
+
+ETAG = '"abc123"'
+PAYLOADS = {
+    "application/json": json.dumps([{"id": i, "name": f"Spółka {i} SA", "industry": "Przemysł"} for i in range(200)]).encode(),
+    "text/csv": "\n".join(f"{i},Spółka {i} SA,revenue,{i * 1000.5}" for i in range(500)).encode(),
+}
+CSV_CHUNKS = [f"company,period,metric,value\n{i},Q1 2024,revenue,{i * 10}\n".encode() * 20 for i in range(3)]
+
+
+def _client(body: bytes) -> TestClient:
+    async def endpoint(request):
+        if request.headers.get("if-none-match"):
+            return Response(status_code=304, headers={"ETag": ETAG})
+        return Response(body, media_type="application/json", headers={"ETag": ETAG})
+
+    app = Starlette(routes=[Route("/", endpoint)])
+    return TestClient(CompressionMiddleware(app, minimum_size=100, enable_brotli=False))
+
+
+def test_compressed_body_gets_weak_etag():
+    response = _client(b'{"x": "' + b"a" * 500 + b'"}').get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == "W/" + ETAG
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_identity_body_keeps_strong_etag_and_varies():
+    response = _client(b'{"x": "' + b"a" * 500 + b'"}').get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == ETAG
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_small_body_still_varies():
+    response = _client(b'{"x": 1}').get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_not_modified_matches_compressed_validator():
+    response = _client(b"{}").get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": "W/" + ETAG})
+    assert response.status_code == 304
+    assert response.headers["etag"] == "W/" + ETAG
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def _asgi_app(body: bytes, media_type: str, chunks=None):
+    async def endpoint(request):
+        if chunks is not None:
+            async def stream():
+                for chunk in chunks:
+                    yield chunk
+            return StreamingResponse(stream(), media_type=media_type)
+        return Response(body, media_type=media_type)
+
+    middleware = CompressionMiddleware(
+        Starlette(routes=[Route("/", endpoint)]),
+        minimum_size=1024, content_types=(*PAYLOADS, "text/event-stream"), enable_brotli=False,
+    )
+    return middleware
+
+
+def _wire(app, accept_encoding: str = "gzip"):
+    """Raw ASGI messages as sent to the server - bytes on the wire, one entry per body message"""
+    scope = {
+        "type": "http", "method": "GET", "path": "/", "raw_path": b"/", "root_path": "", "scheme": "http",
+        "query_string": b"", "headers": [(b"accept-encoding", accept_encoding.encode())],
+        "server": ("test", 80), "client": ("test", 1234), "http_version": "1.1",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},  # 2.4: strumień bez nasłuchu rozłączenia
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    headers = {key.decode().lower(): value.decode() for key, value in messages[0]["headers"]}
+    return headers, [message for message in messages[1:] if message["type"] == "http.response.body"]
+
+
+@pytest.mark.parametrize("media_type", list(PAYLOADS))
+def test_large_bodies_are_smaller_on_the_wire(media_type):
+    raw = PAYLOADS[media_type]
+    headers, bodies = _wire(_asgi_app(raw, media_type))
+    compressed = b"".join(message["body"] for message in bodies)
+
+    assert headers["content-encoding"] == "gzip"
+    assert int(headers["content-length"]) == len(compressed)
+    assert len(compressed) < len(raw)
+    assert gzip.decompress(compressed) == raw
+
+
+def test_body_under_minimum_size_is_not_compressed():
+    raw = b'{"id": 1}'
+    headers, bodies = _wire(_asgi_app(raw, "application/json"))
+
+    assert "content-encoding" not in headers
+    assert b"".join(message["body"] for message in bodies) == raw
+
+
+def test_streamed_body_is_flushed_per_chunk():
+    headers, bodies = _wire(_asgi_app(b"", "text/csv", chunks=CSV_CHUNKS))
+    decoder = zlib.decompressobj(zlib.MAX_WBITS | 16)
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    # Każdy wysłany kawałek dekoduje się od razu do odpowiadającego mu kawałka eksportu
+    decoded = [decoder.decompress(message["body"]) for message in bodies if message.get("more_body")]
+    assert decoded == CSV_CHUNKS
+    assert decoder.decompress(bodies[-1]["body"]) + decoder.flush() == b""
+    assert decoder.eof
+
+
+def test_event_stream_passes_through_uncompressed():
+    events = [b"data: {\"n\": %d}\n\n" % i * 100 for i in range(3)]
+    headers, bodies = _wire(_asgi_app(b"", "text/event-stream", chunks=events))
+
+    assert "content-encoding" not in headers
+    assert [message["body"] for message in bodies if message["body"]] == events
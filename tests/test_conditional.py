@@ -0,0 +1,83 @@
+import io
+
+OLD_DATE = "Mon, 01 Jan 2001 00:00:00 GMT"
+
+
+def _import(client, company_name, quarters):
+    rows = "\n".join(f"{company_name},Q{q % 4 + 1} {2020 + q // 4},{100.0 + q}" for q in range(quarters))
+    csv = f"company,period,revenue\n{rows}\n".encode()
+    response = client.post("/api/import/metrics", files={"file": ("metrics.csv", io.BytesIO(csv), "text/csv")})
+    assert response.status_code == 200, response.text
+
+
+def test_if_none_match_takes_precedence(client, company):
+    url = f"/api/companies/{company['id']}"
+    first = client.get(url)
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+    # Niepasujący ETag wygrywa z aktualną datą i odwrotnie
+    assert client.get(url, headers={"If-None-Match": 'W/"other"', "If-Modified-Since": last_modified}).status_code == 200
+    assert client.get(url, headers={"If-None-Match": etag, "If-Modified-Since": OLD_DATE}).status_code == 304
+
+
+def test_not_modified_has_no_body_and_cache_control(client, company):
+    url = f"/api/companies/{company['id']}"
+    etag = client.get(url).headers["etag"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert response.headers["etag"] == etag
+
+
+def test_weak_etag_matches_after_compression(client, company):
+    _import(client, company["name"], 12)
+    url = f"/api/companies/{company['id']}"
+    first = client.get(url, headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert etag.startswith("W/")
+    for candidate in (etag, etag.removeprefix("W/"), f'W/"other", {etag}'):
+        response = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": candidate})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+
+def test_company_changes_after_reports_version_bump(client, company):
+    url = f"/api/companies/{company['id']}"
+    etag = client.get(url).headers["etag"]
+
+    _import(client, company["name"], 1)
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()["reports"]) == 1
+
+
+def test_company_list_changes_after_version_bump(client, company):
+    url = "/api/companies/"
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.put(f"/api/companies/{company['id']}", json={"description": "Nowy opis"}).status_code == 200
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert any(row["description"] == "Nowy opis" for row in response.json())
+
+
+def test_report_not_modified(client, company):
+    _import(client, company["name"], 1)
+    report_id = client.get(f"/api/companies/{company['id']}").json()["reports"][0]["id"]
+    url = f"/api/reports/{report_id}"
+    first = client.get(url)
+
+    assert client.get(url, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": OLD_DATE}).status_code == 200
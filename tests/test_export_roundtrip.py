@@ -0,0 +1,60 @@
+import io
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.database.database import ReportMetric, async_session_maker
+
+METRICS_CSV = (
+    "company,period,revenue,net_income,total_assets\n"
+    "{name},Q1 2023,1234567.89,-12.5,0.1\n"
+    "{name},Q2 2023,1500000,33.25,\n"
+    "{name},2023,6000000.5,120,98765432.1\n"
+)
+
+
+def _import(client, content, filename):
+    response = client.post("/api/import/metrics", files={"file": (filename, io.BytesIO(content), "text/plain")})
+    assert response.status_code == 200, response.text
+    assert response.json()["errors"] == []
+    return response.json()
+
+
+def _metric_rows(client, company_id):
+    async def fetch():
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(
+                    ReportMetric.id, ReportMetric.report_id, ReportMetric.period_ordinal,
+                    ReportMetric.metric_name, ReportMetric.value, ReportMetric.source
+                ).where(ReportMetric.company_id == company_id).order_by(ReportMetric.id)
+            )
+            return [tuple(row) for row in result.all()]
+
+    return client.portal.call(fetch)
+
+
+def _as_import(client, export_format, company_id):
+    """Exported metrics re-encoded as an import file (Parquet goes in as NDJSON)"""
+    parquet = pytest.importorskip("pyarrow.parquet") if export_format == "parquet" else None
+    response = client.get("/api/export/metrics", params={"format": export_format, "company_id": company_id})
+    assert response.status_code == 200
+    if parquet is None:
+        return response.content, f"metrics.{export_format}"
+    rows = parquet.read_table(io.BytesIO(response.content)).to_pylist()
+    return "\n".join(json.dumps(row) for row in rows).encode(), "metrics.ndjson"
+
+
+@pytest.mark.parametrize("export_format", ["csv", "ndjson", "parquet"])
+def test_metrics_export_reimports_unchanged(client, company, export_format):
+    _import(client, METRICS_CSV.format(name=company["name"]).encode(), "metrics.csv")
+    before = _metric_rows(client, company["id"])
+    content, filename = _as_import(client, export_format, company["id"])
+
+    result = _import(client, content, filename)
+
+    assert len(before) == 8
+    assert result["values_imported"] == len(before)
+    assert result["reports_created"] == result["companies_created"] == 0
+    assert _metric_rows(client, company["id"]) == before
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database.database import Base, Company, Report, ReportMetric
+from app.services.company_stats_service import CompanyStatsService
+from app.services.import_service import ImportService, _parse_value
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("1.234,5", 1234.5),
+    ("1 234,5", 1234.5),
+    ("65 622,2", 65622.2),
+    ("65 622,2", 65622.2),
+    ("1,234.5", 1234.5),
+    ("1.234.567", 1234567.0),
+    ("1,234,567", 1234567.0),
+    ("1234,5", 1234.5),
+    ("1234.5", 1234.5),
+    ("-12,5", -12.5),
+    (42, 42.0),
+    ("", None),
+    (None, None),
+])
+def test_parse_value(raw, expected):
+    assert _parse_value(raw) == expected
+
+
+def test_parse_value_rejects_text():
+    with pytest.raises(ValueError):
+        _parse_value("n/a")
+
+
+async def _import_into_existing_report():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with session_maker() as db:
+            await CompanyStatsService().ensure_counters(db)
+            company = Company(name="ACME SA")
+            db.add(company)
+            await db.flush()
+            db.add(Report(
+                company_id=company.id, filename="q1.pdf", original_filename="q1.pdf", report_type="quarterly",
+                report_period="Q1 2024", report_year=2024, report_quarter=1, period_ordinal=20241,
+                file_size=100, file_path="/tmp/q1.pdf", key_metrics={"revenue": 10.0}, status="processed",
+            ))
+            await db.commit()
+
+            result = await ImportService().import_rows(db, [
+                (1, {"company": "ACME SA", "period": "Q1 2024", "net_income": "1.234,5"}),
+                (2, {"company": "ACME SA", "period": "Q2 2024", "net_income": "2 000,0"}),
+            ])
+            reports = (await db.execute(select(Report.period_ordinal, Report.status, Report.key_metrics)
+                                        .order_by(Report.period_ordinal))).all()
+            metrics = (await db.execute(select(ReportMetric.period_ordinal, ReportMetric.value)
+                                        .where(ReportMetric.metric_name == "net_income")
+                                        .order_by(ReportMetric.period_ordinal))).all()
+            return result, reports, metrics
+    finally:
+        await engine.dispose()
+
+
+def test_import_attaches_metrics_to_existing_report():
+    result, reports, metrics = asyncio.run(_import_into_existing_report())
+
+    assert result["reports_created"] == 1
+    assert [(ordinal, status) for ordinal, status, _ in reports] == [(20241, "processed"), (20242, "imported")]
+    assert reports[0][2] == {"revenue": 10.0, "net_income": 1234.5}
+    assert metrics == [(20241, 1234.5), (20242, 2000.0)]
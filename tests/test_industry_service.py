@@ -0,0 +1,66 @@
+import asyncio
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database.database import Base, Company, IndustryAggregate, Report, ReportMetric
+from app.services.industry_service import IndustryAggregatesService
+
+
+async def _add_report(db, company, ordinal, revenue):
+    report = Report(
+        company=company, filename=f"{company.name}_{ordinal}.pdf", original_filename="r.pdf",
+        report_type="quarterly", report_year=ordinal // 10, report_quarter=ordinal % 10,
+        period_ordinal=ordinal, file_size=1, file_path="/tmp/r.pdf", status="processed",
+    )
+    db.add(report)
+    await db.flush()
+    db.add(ReportMetric(report_id=report.id, company_id=company.id, period_ordinal=ordinal,
+                        metric_name="revenue", value=revenue, source="regex"))
+    await db.flush()
+    return report
+
+
+async def _refresh_scenario():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    service = IndustryAggregatesService()
+    cells = select(IndustryAggregate.period_ordinal, IndustryAggregate.median).where(
+        IndustryAggregate.metric_name == "revenue"
+    ).order_by(IndustryAggregate.period_ordinal)
+    try:
+        async with session_maker() as db:
+            first, second = Company(name="A SA", industry="Tech"), Company(name="B SA", industry=" tech")
+            db.add_all([first, second])
+            await _add_report(db, first, 20241, 100.0)
+            await _add_report(db, second, 20241, 300.0)
+            removed = await _add_report(db, second, 20242, 50.0)
+            await service.refresh(db, "Tech")
+            await db.commit()
+            initial = (await db.execute(cells)).all()
+
+            # Równoległa ingestia tej samej branży zapisała już te komórki po naszym DELETE
+            upsert = service._upsert
+
+            async def concurrent_upsert(session, rows):
+                await session.execute(insert(IndustryAggregate), [row for row in rows if row["period_ordinal"] == 20243])
+                await upsert(session, rows)
+
+            service._upsert = concurrent_upsert
+            await db.execute(delete(ReportMetric).where(ReportMetric.report_id == removed.id))
+            await db.delete(removed)
+            await _add_report(db, first, 20243, 200.0)
+            await service.refresh(db, "TECH", [2024])
+            await db.commit()
+            return initial, (await db.execute(cells)).all()
+    finally:
+        await engine.dispose()
+
+
+def test_refresh_upserts_cells_and_drops_vanished_ones():
+    initial, refreshed = asyncio.run(_refresh_scenario())
+
+    assert initial == [(20241, 200.0), (20242, 50.0)]
+    assert refreshed == [(20241, 200.0), (20243, 200.0)]
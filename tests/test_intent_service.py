@@ -0,0 +1,36 @@
+import pytest
+
+from app.services.intent_service import IntentService
+
+
+@pytest.mark.parametrize("message, metric, period", [
+    ("Jakie były przychody ze sprzedaży w 2023?", "revenue", 20235),
+    ("Ile wynosiła sprzedaż w Q2 2024?", "revenue", 20242),
+    ("Jakie były obroty w 2023?", "revenue", 20235),
+    ("Jaki był zysk netto w Q2 2024", "net_income", 20242),
+    ("Ile wynosiły aktywa w 2023?", "total_assets", 20235),
+    ("Jaki był kapitał własny w III kw. 2023?", "equity", 20233),
+    ("Jaka jest ostatnia marża netto?", "net_margin", None),
+])
+def test_value_questions(message, metric, period):
+    assert IntentService().match(message) == {"intent": "value", "metrics": [metric], "period": period}
+
+
+def test_chart_question():
+    assert IntentService().match("Pokaż wykres słupkowy przychodów") == {
+        "intent": "chart", "metrics": ["revenue"], "chart_type": "bar",
+    }
+
+
+@pytest.mark.parametrize("message", [
+    "Jaki był zysk ze sprzedaży w 2023?",
+    "Ile wynosiła strata na sprzedaży w Q1 2024?",
+    "Ile wynosiły aktywa obrotowe w 2023?",
+    "Jaki był kapitał obrotowy w Q3 2023?",
+    "Ile wynosiły przychody i zysk netto w 2023?",
+    "Pokaż wykres przychodów i zysku netto",
+    "Dlaczego spadły przychody w 2023?",
+    "Jakie były przychody w 2023 i 2024?",
+])
+def test_ambiguous_questions_go_to_llm(message):
+    assert IntentService().match(message) is None
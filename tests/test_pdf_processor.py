@@ -0,0 +1,27 @@
+import pytest
+
+from app.services.pdf_processor import PDFProcessor
+
+
+@pytest.mark.parametrize("text, expected", [
+    (
+        "Przychody ze sprzedaży: 258 990,6 PLN\nZysk netto: 511 323,1 PLN\nAktywa razem: 404 993,2 PLN",
+        {"revenue": 258990.6, "net_income": 511323.1, "total_assets": 404993.2},
+    ),
+    (
+        "Przychody ze sprzedaży: 258.990,6 PLN\nZysk netto: 511.323,1 PLN\nAktywa razem: 404.993,2 PLN",
+        {"revenue": 258990.6, "net_income": 511323.1, "total_assets": 404993.2},
+    ),
+    (
+        "Przychody: 65 622,2 mln PLN\nZysk netto za okres: 1 234 567 tys PLN\nAktywa razem: 12 345,6 mln PLN",
+        {"revenue": 65622.2e6, "net_income": 1234567e3, "total_assets": 12345.6e6},
+    ),
+    (
+        "Zysk netto: 45,5 mln PLN",
+        {"net_income": 45.5e6, "revenue": None},
+    ),
+])
+def test_extract_financial_metrics(text, expected):
+    metrics = PDFProcessor().extract_financial_metrics(text)
+
+    assert {name: metrics[name] for name in expected} == pytest.approx(expected)
@@ -0,0 +1,110 @@
+import asyncio
+import cProfile
+import os
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import profiles
+from app.config import settings
+from app.monitoring.profiling import PROFILE_ID_HEADER, PROFILE_TOKEN_HEADER, ProfileStore, ProfilingMiddleware
+from app.services.container import get_services
+
+TOKEN = "secret"
+
+
+def _app(store):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, token=TOKEN)
+    app.include_router(profiles.router)
+    app.dependency_overrides[get_services] = lambda: SimpleNamespace(profiles=store)
+
+    @app.get("/work")
+    async def work():
+        await asyncio.sleep(0.05)
+        return {"total": sum(range(1000))}
+
+    return app
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(str(tmp_path), max_profiles=3)
+
+
+@pytest.fixture
+def profiled(store, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_token", TOKEN)
+    monkeypatch.setattr(settings, "profile_all_requests", False)
+    with TestClient(_app(store)) as client:
+        yield client
+
+
+def test_only_requests_with_token_are_profiled(profiled, store):
+    assert PROFILE_ID_HEADER not in profiled.get("/work").headers
+    assert PROFILE_ID_HEADER not in profiled.get("/work", headers={PROFILE_TOKEN_HEADER: "wrong"}).headers
+
+    profile_id = profiled.get("/work", headers={PROFILE_TOKEN_HEADER: TOKEN}).headers[PROFILE_ID_HEADER]
+
+    summary = store.get(profile_id)
+    assert summary["path"] == "/work" and summary["status"] == 200
+    assert summary["wall_seconds"] >= summary["awaiting_seconds"] > 0
+    assert [profile["id"] for profile in store.list()] == [profile_id]
+
+
+def test_one_profile_at_a_time(store):
+    async def concurrent():
+        transport = httpx.ASGITransport(app=_app(store))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(client.get("/work", headers={PROFILE_TOKEN_HEADER: TOKEN}) for _ in range(3))
+            )
+
+    responses = asyncio.run(concurrent())
+
+    assert all(response.status_code == 200 for response in responses)
+    assert sum(PROFILE_ID_HEADER in response.headers for response in responses) == 1
+    assert len(store.list()) == 1
+
+
+def test_store_keeps_newest_profiles(store):
+    ids = []
+    for age in range(5, 0, -1):
+        profile_id = store.new_id()
+        store.save(profile_id, cProfile.Profile(), {"id": profile_id, "created_at": str(age)})
+        # Starszy czas modyfikacji niż kolejne zapisy - bez czekania na rozdzielczość mtime
+        for extension in ("json", "prof"):
+            os.utime(os.path.join(store.directory, f"{profile_id}.{extension}"), (1000 - age, 1000 - age))
+        ids.append(profile_id)
+
+    store.save(ids[-1], cProfile.Profile(), {"id": ids[-1], "created_at": "0"})
+
+    kept = set(ids[-store.max_profiles:])
+    assert {profile["id"] for profile in store.list()} == kept
+    assert {name.split(".")[0] for name in os.listdir(store.directory)} == kept
+    assert store.raw_path(ids[0]) is None
+
+
+def test_profile_routes_require_token(profiled):
+    profile_id = profiled.get("/work", headers={PROFILE_TOKEN_HEADER: TOKEN}).headers[PROFILE_ID_HEADER]
+    auth = {PROFILE_TOKEN_HEADER: TOKEN}
+
+    for path in ("/api/profiles/", f"/api/profiles/{profile_id}", f"/api/profiles/{profile_id}/raw"):
+        assert profiled.get(path).status_code == 403
+        assert profiled.get(path, headers={PROFILE_TOKEN_HEADER: "wrong"}).status_code == 403
+        assert profiled.get(path, headers=auth).status_code == 200
+    assert profiled.get(f"/api/profiles/{profile_id}", headers=auth).json()["id"] == profile_id
+    assert profiled.get("/api/profiles/0123456789abcdef", headers=auth).status_code == 404
+    assert profiled.get("/api/profiles/not-an-id/raw", headers=auth).status_code == 404
+
+
+def test_profile_routes_hidden_when_profiling_disabled(profiled, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_token", None)
+
+    response = profiled.get("/api/profiles/")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Profiling is disabled"
@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import literal, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.monitoring import db as db_monitoring
+from app.monitoring.db import instrument_engine
+from app.monitoring.metrics import N_PLUS_ONE, SLOW_QUERIES
+from app.monitoring.middleware import DB_COMMITS_HEADER, DB_QUERIES_HEADER, SQLAccountingMiddleware
+
+THRESHOLD = 3
+
+
+@pytest.fixture
+def accounting_client(monkeypatch):
+    # instrument_engine ustawia globalny próg wolnych zapytań - monkeypatch przywróci próg aplikacji
+    monkeypatch.setattr(db_monitoring, "_slow_query_seconds", db_monitoring._slow_query_seconds)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine)
+    session_maker = async_sessionmaker(engine)
+
+    app = FastAPI()
+    app.add_middleware(SQLAccountingMiddleware, n_plus_one_threshold=THRESHOLD)
+
+    @app.get("/selects/{count}")
+    async def selects(count: int):
+        async with session_maker() as db:
+            for _ in range(count):
+                await db.execute(select(literal(1)))
+            await db.commit()
+        return {}
+
+    with TestClient(app) as client:
+        yield client
+        client.portal.call(engine.dispose)
+
+
+def test_headers_count_queries_and_commits(accounting_client):
+    response = accounting_client.get("/selects/2")
+
+    assert response.headers[DB_QUERIES_HEADER] == "2"
+    assert response.headers[DB_COMMITS_HEADER] == "1"
+
+
+def test_n_plus_one_warning_at_threshold(accounting_client, caplog):
+    before = N_PLUS_ONE.value(route="/selects/{count}")
+
+    with caplog.at_level(logging.WARNING, logger="app.monitoring.middleware"):
+        accounting_client.get(f"/selects/{THRESHOLD - 1}")
+        assert not caplog.records
+        accounting_client.get(f"/selects/{THRESHOLD}")
+
+    assert N_PLUS_ONE.value(route="/selects/{count}") == before + 1
+    assert len(caplog.records) == 1
+    assert f"identical SELECT issued {THRESHOLD} times" in caplog.records[0].getMessage()
+
+
+def test_slow_query_is_logged_with_parameters(accounting_client, caplog, monkeypatch):
+    monkeypatch.setattr(db_monitoring, "_slow_query_seconds", 0.0)
+    before = SLOW_QUERIES.value()
+
+    with caplog.at_level(logging.WARNING, logger="app.monitoring.db"):
+        accounting_client.get("/selects/1")
+
+    assert SLOW_QUERIES.value() == before + 1
+    message = caplog.records[0].getMessage()
+    assert message.startswith("Slow query") and "parameters: (1,)" in message
+
+
+def test_app_reports_db_headers(client):
+    response = client.post("/api/companies/", json={"name": "SQL Accounting SA"})
+
+    assert int(response.headers[DB_QUERIES_HEADER]) >= 1
+    assert int(response.headers[DB_COMMITS_HEADER]) >= 1
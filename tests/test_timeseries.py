@@ -0,0 +1,43 @@
+from app.services.chart_data_service import ChartDataService
+from app.services.timeseries_service import TimeSeriesPanel, TimeSeriesService
+
+
+def _quarters(company_id, metric, year, values):
+    return [(company_id, year * 10 + quarter, metric, value) for quarter, value in enumerate(values, start=1)]
+
+
+def test_first_yoy_point_is_null():
+    rows = _quarters(1, "revenue", 2023, [100.0, 110.0, 120.0, 130.0]) + _quarters(1, "revenue", 2024, [150.0])
+    panel = TimeSeriesPanel.from_points(rows)
+    service = TimeSeriesService()
+    periods, series = service.chart_series(service.company_series(panel, 1))
+
+    chart = ChartDataService().chart_from_series(periods, series, ["revenue_yoy"], "bar", "r/r", trim_empty=False)
+
+    data = chart.data.datasets[0].data
+    assert len(data) == 5
+    assert data[:4] == [None, None, None, None]
+    assert abs(data[4] - 0.5) < 1e-9
+
+
+def test_missing_points_are_null_not_zero():
+    periods = [20231, 20232, 20233]
+    series = {"revenue": {20231: 10.0, 20233: 30.0}, "net_income": {20232: 2.0}}
+
+    chart = ChartDataService().chart_from_series(periods, series, ["revenue", "net_income"])
+
+    assert chart.data.datasets[0].data == [10.0, None, 30.0]
+    assert chart.data.datasets[1].data == [None, 2.0, None]
+
+
+def test_compare_leaves_unreported_periods_null():
+    rows = _quarters(1, "revenue", 2023, [100.0, 110.0, 120.0, 130.0]) + _quarters(1, "revenue", 2024, [140.0])
+    rows += [(2, 20241, "revenue", 90.0)]
+    panel = TimeSeriesPanel.from_points(rows)
+    comparison = TimeSeriesService().compare(panel, ["revenue"], [])
+    by_company = {str(cid): points for cid, points in comparison["series"]["revenue"].items()}
+
+    chart = ChartDataService().chart_from_series(comparison["periods"], by_company, list(by_company))
+
+    assert chart.data.datasets[0].data == [100.0, 110.0, 120.0, 130.0, 140.0]
+    assert chart.data.datasets[1].data == [None, None, None, None, 90.0]
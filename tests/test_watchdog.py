@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+from app.monitoring.metrics import LOOP_BLOCKS
+from app.monitoring.watchdog import LoopWatchdog
+
+THRESHOLD = 0.1
+
+
+def _block_loop():
+    time.sleep(THRESHOLD * 2)
+
+
+async def _watched_block():
+    watchdog = LoopWatchdog(interval=0.01, threshold=THRESHOLD)
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.05)
+        _block_loop()
+        # Puls po odblokowaniu - wątek zdążył już zgłosić blokadę
+        await asyncio.sleep(0.05)
+    finally:
+        watchdog.stop()
+
+
+def _blocks():
+    return {labels["location"]: value for _, labels, value in LOOP_BLOCKS.samples()}
+
+
+def test_watchdog_reports_blocking_frame():
+    before = _blocks()
+
+    asyncio.run(_watched_block())
+
+    new = {location: count - before.get(location, 0) for location, count in _blocks().items()}
+    blocked = [location for location, count in new.items() if count]
+    assert len(blocked) == 1
+    assert blocked[0].startswith("tests/test_watchdog.py:")
+    assert blocked[0].endswith("(_block_loop)")